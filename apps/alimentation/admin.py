@@ -1,5 +1,6 @@
 # Register your models here.
 from django.contrib import admin
+from apps.core.admin_actions import recompute_emissions_action
 from .models import FoodEmissionFactor, FoodEntry
 
 @admin.register(FoodEmissionFactor)
@@ -8,6 +9,7 @@ class FoodEmissionFactorAdmin(admin.ModelAdmin):
     list_editable = ("kg_co2_per_meal",)
     search_fields = ('code', 'label')
     ordering = ('label',)
+    actions = [recompute_emissions_action('food')]
 
 @admin.register(FoodEntry)
 class FoodEntryAdmin(admin.ModelAdmin):
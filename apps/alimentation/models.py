@@ -35,6 +35,16 @@ class FoodEntry(models.Model):
     """
     YEAR_CHOICES = [(y, y) for y in range(2020, 2036)]
 
+    # Champ de nombre de repas -> code du FoodEmissionFactor appliqué
+    MEAL_FACTOR_CODES = {
+        "beef_meals": "beef",
+        "pork_meals": "pork",
+        "poultry_fish_meals": "poultry_fish",
+        "vegetarian_meals": "vegetarian",
+        "picnic_no_meat_meals": "picnic_veg",
+        "picnic_meat_meals": "picnic_meat",
+    }
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Groupe")
     service = models.CharField(max_length=150)
@@ -64,6 +74,7 @@ class FoodEntry(models.Model):
         max_digits=12, decimal_places=3,
         null=True, blank=True
     )
+    factor_revision = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Version des facteurs", help_text="Dernière version de l'historique des facteurs utilisée (vide = facteurs courants)")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -73,6 +84,11 @@ class FoodEntry(models.Model):
         verbose_name_plural = "Données alimentation"
         ordering = ["-year", "service"]
         unique_together = ("service", "year")
+        # Listes par groupe triées par année / date, statistiques et agrégats par année
+        indexes = [
+            models.Index(fields=["group", "year", "created_at"], name="food_group_year_created"),
+            models.Index(fields=["year", "created_at"], name="food_year_created"),
+        ]
 
     def __str__(self):
         return f"{self.service} - {self.year} ({self.total_meals()} repas)"
@@ -88,19 +104,15 @@ class FoodEntry(models.Model):
             self.picnic_meat_meals
         )
 
-    def calculate_impact(self):
-        factors = {f.code: f.kg_co2_per_meal for f in FoodEmissionFactor.objects.all()}
-
-        def f(code):
-            return factors.get(code, 0)
+    def calculate_impact(self, snapshot=None):
+        from apps.core.services.factor_registry import get_snapshot
+        year_factors = (snapshot or get_snapshot()).for_year(self.year)
+        factors = year_factors.values('alimentation.FoodEmissionFactor', 'kg_co2_per_meal')
+        self.factor_revision = year_factors.revision('food')
 
-        total = (
-            self.beef_meals * f("beef")
-            + self.pork_meals * f("pork")
-            + self.poultry_fish_meals * f("poultry_fish")
-            + self.vegetarian_meals * f("vegetarian")
-            + self.picnic_no_meat_meals * f("picnic_veg")
-            + self.picnic_meat_meals * f("picnic_meat")
+        total = sum(
+            getattr(self, meal_field) * factors.get(code, 0)
+            for meal_field, code in self.MEAL_FACTOR_CODES.items()
         )
         self.total_co2_kg = total
         return total
@@ -2,23 +2,26 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.db import models
 
-from .models import FoodEntry, FoodEmissionFactor
+from apps.core.services.factor_registry import get_factors, get_factor_values
+from apps.core.services.user_groups import get_group_ids, get_primary_group_id
+
+from .models import FoodEntry
 from .forms import FoodEntryForm
 
 
 @login_required
 def foodentry_create(request):
-    factors_dict = {f.code: f.kg_co2_per_meal for f in FoodEmissionFactor.objects.all()}
-    emission_factors = FoodEmissionFactor.objects.all()
+    factors_dict = get_factor_values('alimentation.FoodEmissionFactor', 'kg_co2_per_meal')
+    emission_factors = get_factors('alimentation.FoodEmissionFactor')
     
     if request.method == "POST":
         form = FoodEntryForm(request.POST, user=request.user)
         if form.is_valid():
             entry = form.save(commit=False)
             entry.user = request.user
-            user_group = request.user.groups.first()
-            if user_group:
-                entry.group = user_group
+            group_id = get_primary_group_id(request.user)
+            if group_id:
+                entry.group_id = group_id
             entry.save()
             return redirect("food_list")
     else:
@@ -32,18 +35,21 @@ def foodentry_create(request):
 
 @login_required
 def foodentry_list(request):
+    from apps.core.services.listing import EntryListPage
+
     if request.user.is_staff or request.user.is_superuser:
-        entries = FoodEntry.objects.all().order_by("-year", "-created_at")
+        entries = FoodEntry.objects.all()
     else:
-        entries = FoodEntry.objects.filter(group__in=request.user.groups.all()).order_by("-year", "-created_at")
+        entries = FoodEntry.objects.filter(group_id__in=get_group_ids(request.user))
 
-    total_co2 = sum(e.total_co2_kg or 0 for e in entries)
-    count = entries.count()
+    # Filtres, tri et pagination par clé ; totaux calculés en base
+    page = EntryListPage(request, entries, search_field="service")
 
     context = {
-        "entries": entries,
-        "total_co2": total_co2,
-        "count": count,
+        "entries": page,
+        "page": page,
+        "total_co2": page.totals["total_co2_kg"],
+        "count": page.count,
     }
     return render(request, "alimentation/list.html", context)
 
@@ -53,9 +59,9 @@ def foodentry_update(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         entry = get_object_or_404(FoodEntry, pk=pk)
     else:
-        entry = get_object_or_404(FoodEntry, pk=pk, group__in=request.user.groups.all())
-    factors_dict = {f.code: f.kg_co2_per_meal for f in FoodEmissionFactor.objects.all()}
-    emission_factors = FoodEmissionFactor.objects.all()
+        entry = get_object_or_404(FoodEntry, pk=pk, group_id__in=get_group_ids(request.user))
+    factors_dict = get_factor_values('alimentation.FoodEmissionFactor', 'kg_co2_per_meal')
+    emission_factors = get_factors('alimentation.FoodEmissionFactor')
 
     if request.method == "POST":
         form = FoodEntryForm(request.POST, instance=entry, user=request.user)
@@ -77,7 +83,7 @@ def foodentry_detail(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         entry = get_object_or_404(FoodEntry, pk=pk)
     else:
-        entry = get_object_or_404(FoodEntry, pk=pk, group__in=request.user.groups.all())
+        entry = get_object_or_404(FoodEntry, pk=pk, group_id__in=get_group_ids(request.user))
     return render(request, "alimentation/foodentry_detail.html", {"object": entry})
 
 
@@ -86,7 +92,7 @@ def foodentry_delete(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         entry = get_object_or_404(FoodEntry, pk=pk)
     else:
-        entry = get_object_or_404(FoodEntry, pk=pk, group__in=request.user.groups.all())
+        entry = get_object_or_404(FoodEntry, pk=pk, group_id__in=get_group_ids(request.user))
     if request.method == "POST":
         entry.delete()
         return redirect("food_list")
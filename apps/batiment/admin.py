@@ -1,4 +1,5 @@
 from django.contrib import admin
+from apps.core.admin_actions import recompute_emissions_action
 from .models import BuildingEnergyData, BuildingEmissionFactor
 
 @admin.register(BuildingEmissionFactor)
@@ -6,6 +7,8 @@ class BuildingEmissionFactorAdmin(admin.ModelAdmin):
     list_display = ('type_energie', 'facteur', 'unit', 'source')
     list_editable = ('facteur',)
     search_fields = ('type_energie', 'source')
+    # Le facteur ELEC sert aussi au calcul de l'usage des équipements numériques
+    actions = [recompute_emissions_action('buildings', 'numerique')]
 
 @admin.register(BuildingEnergyData)
 class BuildingEnergyDataAdmin(admin.ModelAdmin):
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("batiment", "0003_buildingenergydata_group"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="buildingenergydata",
+            name="factor_revision",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                help_text="Dernière version de l'historique des facteurs utilisée (vide = facteurs courants)",
+                null=True,
+                verbose_name="Version des facteurs",
+            ),
+        ),
+    ]
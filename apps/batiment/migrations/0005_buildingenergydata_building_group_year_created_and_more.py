@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("batiment", "0004_buildingenergydata_factor_revision"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="buildingenergydata",
+            index=models.Index(
+                fields=["group", "year", "created_at"],
+                name="building_group_year_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="buildingenergydata",
+            index=models.Index(
+                fields=["year", "created_at"], name="building_year_created"
+            ),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import Group
@@ -24,6 +26,21 @@ class BuildingEmissionFactor(models.Model):
         verbose_name_plural = "Facteurs Émission Bâtiment"
 
 class BuildingEnergyData(models.Model):
+    # Code du facteur -> champ du facteur conservé sur la saisie
+    FACTOR_FIELDS = {
+        'ELEC': 'electricity_factor',
+        'GAZ': 'gas_factor',
+        'HEAT': 'heating_network_factor',
+        'COOL': 'cooling_factor',
+    }
+    # Facteurs utilisés si BuildingEmissionFactor n'a pas le type d'énergie
+    DEFAULT_FACTORS = {
+        'ELEC': Decimal('0.052'),
+        'GAZ': Decimal('0.227'),
+        'HEAT': Decimal('0.150'),
+        'COOL': Decimal('0.052'),
+    }
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Groupe")
     year = models.PositiveIntegerField(verbose_name="Année")
@@ -45,6 +62,7 @@ class BuildingEnergyData(models.Model):
     cooling_factor = models.DecimalField(max_digits=10, decimal_places=6, default=0)
 
     total_co2_kg = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    factor_revision = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Version des facteurs", help_text="Dernière version de l'historique des facteurs utilisée (vide = facteurs courants)")
 
     notes = models.TextField(blank=True, verbose_name="Notes")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -58,38 +76,59 @@ class BuildingEnergyData(models.Model):
                 (self.cooling_kwh * self.cooling_factor)
         return total
 
-    def save(self, *args, **kwargs):
+    def calculate_impact(self, snapshot=None):
+        """
+        Renseigne les facteurs manquants et calcule le total.
+        snapshot : instantané du registre des facteurs (imports en masse), sinon l'instantané courant
+        """
         # Récupérer les facteurs en base s'ils sont à 0 (nouveau ou update)
         # On essaie de les remplir dynamiquement
         try:
-            # BuildingEmissionFactor est défini dans ce fichier, on peut l'utiliser directement
-            factors = {f.type_energie: f.facteur for f in BuildingEmissionFactor.objects.all()}
+            from apps.core.services.factor_registry import get_snapshot
+            year_factors = (snapshot or get_snapshot()).for_year(self.year)
+            factors = year_factors.values('batiment.BuildingEmissionFactor', 'facteur')
+            self.factor_revision = year_factors.revision('buildings')
+
+            # Une version de l'historique couvrant l'année fait foi, même sur un facteur déjà fixé
+            versioned = year_factors.versioned('batiment.BuildingEmissionFactor', 'facteur')
+            for code, field in self.FACTOR_FIELDS.items():
+                if code in versioned:
+                    setattr(self, field, versioned[code])
             
             # Si le facteur n'est pas déjà fixé (ou si on veut le mettre à jour ? 
             # Pour l'instant, on met à jour si c'est 0, pour garder l'historique sur les vieux enregistrements)
             if self.electricity_factor == 0:
-                self.electricity_factor = factors.get('ELEC', 0.052) # Fallback hardcoded if missing
+                self.electricity_factor = factors.get('ELEC', self.DEFAULT_FACTORS['ELEC']) # Fallback hardcoded if missing
             
             if self.gas_factor == 0:
-                self.gas_factor = factors.get('GAZ', 0.227)
+                self.gas_factor = factors.get('GAZ', self.DEFAULT_FACTORS['GAZ'])
                 
             if self.heating_network_factor == 0:
-                self.heating_network_factor = factors.get('HEAT', 0.150)
+                self.heating_network_factor = factors.get('HEAT', self.DEFAULT_FACTORS['HEAT'])
                 
             if self.cooling_factor == 0:
-                self.cooling_factor = factors.get('COOL', 0.052)
+                self.cooling_factor = factors.get('COOL', self.DEFAULT_FACTORS['COOL'])
                 
         except Exception:
             # Fallback total si table pas encore prête (migration)
             pass
 
         self.total_co2_kg = self.compute_total()
+        return self.total_co2_kg
+
+    def save(self, *args, **kwargs):
+        self.calculate_impact()
         super().save(*args, **kwargs)
     
     class Meta:
         verbose_name = "Donnée bâtiment"
         verbose_name_plural = "Données bâtiment"
         ordering = ['-year', '-created_at']
+        # Listes par groupe triées par année / date, statistiques et agrégats par année
+        indexes = [
+            models.Index(fields=['group', 'year', 'created_at'], name='building_group_year_created'),
+            models.Index(fields=['year', 'created_at'], name='building_year_created'),
+        ]
 
     def __str__(self):
         return f"{self.year} - {self.site_name} ({self.total_co2_kg} kgCO2e)"
@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from apps.core.services.user_groups import get_group_ids, get_primary_group_id
 
 from .models import BuildingEnergyData
 from .forms import BuildingEnergyForm
@@ -18,9 +19,9 @@ def batiment_form_view(request):
             data.user = request.user
             
             # Assign Group
-            user_group = request.user.groups.first()
-            if user_group:
-                data.group = user_group
+            group_id = get_primary_group_id(request.user)
+            if group_id:
+                data.group_id = group_id
             elif not request.user.is_superuser:
                  messages.error(request, "Votre compte n'est associé à aucun groupe.")
                  return redirect('batiment_list')
@@ -48,8 +49,8 @@ def batiment_form_view(request):
         form = BuildingEnergyForm()
 
     # Récupérer les facteurs pour affichage dans le tableau
-    from .models import BuildingEmissionFactor
-    emission_factors = BuildingEmissionFactor.objects.all()
+    from apps.core.services.factor_registry import get_factors
+    emission_factors = get_factors('batiment.BuildingEmissionFactor')
     
     context = {"form": form, "emission_factors": emission_factors}
     return render(request, "batiment/form.html", context)
@@ -57,17 +58,20 @@ def batiment_form_view(request):
 
 @login_required
 def batiment_list_view(request):
-    """Vue de la liste des données bâtiments"""
+    """Vue de la liste des données bâtiments (filtrée, paginée par clé)"""
+    from apps.core.services.listing import EntryListPage
+
     if request.user.is_staff or request.user.is_superuser:
-        rows = BuildingEnergyData.objects.all().order_by("-year", "-created_at")
+        rows = BuildingEnergyData.objects.all()
     else:
-        rows = BuildingEnergyData.objects.filter(group__in=request.user.groups.all()).order_by("-year", "-created_at")
-    total_co2 = sum(float(r.total_co2_kg or 0) for r in rows)
+        rows = BuildingEnergyData.objects.filter(group_id__in=get_group_ids(request.user))
+    page = EntryListPage(request, rows, search_field="site_name")
 
     context = {
-        "rows": rows,
-        "total_co2": total_co2,
-        "count": rows.count(),
+        "rows": page,
+        "page": page,
+        "total_co2": float(page.totals["total_co2_kg"]),
+        "count": page.count,
     }
     return render(request, "batiment/list.html", context)
 
@@ -78,7 +82,7 @@ def batiment_form_update(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         row = get_object_or_404(BuildingEnergyData, pk=pk)
     else:
-        row = get_object_or_404(BuildingEnergyData, pk=pk, group__in=request.user.groups.all())
+        row = get_object_or_404(BuildingEnergyData, pk=pk, group_id__in=get_group_ids(request.user))
     
     if request.method == "POST":
         form = BuildingEnergyForm(request.POST, instance=row)
@@ -99,8 +103,8 @@ def batiment_form_update(request, pk):
         form = BuildingEnergyForm(instance=row)
 
     # Récupérer les facteurs pour affichage
-    from .models import BuildingEmissionFactor
-    emission_factors = BuildingEmissionFactor.objects.all()
+    from apps.core.services.factor_registry import get_factors
+    emission_factors = get_factors('batiment.BuildingEmissionFactor')
 
     context = {"form": form, "emission_factors": emission_factors}
     return render(request, "batiment/form.html", context)
@@ -112,7 +116,7 @@ def batiment_detail_view(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         row = get_object_or_404(BuildingEnergyData, pk=pk)
     else:
-        row = get_object_or_404(BuildingEnergyData, pk=pk, group__in=request.user.groups.all())
+        row = get_object_or_404(BuildingEnergyData, pk=pk, group_id__in=get_group_ids(request.user))
     return render(request, "batiment/detail.html", {"row": row})
 
 
@@ -122,7 +126,7 @@ def batiment_delete_view(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         row = get_object_or_404(BuildingEnergyData, pk=pk)
     else:
-        row = get_object_or_404(BuildingEnergyData, pk=pk, group__in=request.user.groups.all())
+        row = get_object_or_404(BuildingEnergyData, pk=pk, group_id__in=get_group_ids(request.user))
 
     if request.method == "POST":
         row.delete()
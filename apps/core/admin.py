@@ -10,7 +10,7 @@ class ADEMEConfigurationAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Source des données', {
-            'fields': ('csv_url', 'csv_version'),
+            'fields': ('csv_url', 'csv_version', 'csv_etag', 'csv_last_modified', 'csv_sha256'),
             'description': 'URL et version du fichier CSV ADEME Base Carbone'
         }),
         ('Paramètres de mise à jour', {
@@ -27,7 +27,7 @@ class ADEMEConfigurationAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ('last_update', 'csv_version', 'created_at', 'updated_at')
+    readonly_fields = ('last_update', 'csv_version', 'csv_etag', 'csv_last_modified', 'csv_sha256', 'created_at', 'updated_at')
     
     list_display = ('__str__', 'csv_version', 'update_frequency_months', 'enable_notifications')
     
@@ -77,3 +77,69 @@ class ReminderTemplateAdmin(admin.ModelAdmin):
         
     def has_delete_permission(self, request, obj=None):
         return False
+
+from .models import EmissionRollup
+
+@admin.register(EmissionRollup)
+class EmissionRollupAdmin(admin.ModelAdmin):
+    """
+    Agrégats en lecture seule (maintenus automatiquement, voir rebuild_rollups).
+    """
+    list_display = ('sector', 'year', 'group', 'subcategory', 'total_co2_kg', 'entry_count', 'updated_at')
+    list_filter = ('sector', 'year', 'group')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+from .models import ExportJob
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """
+    Suivi des exports générés par la commande run_export_jobs.
+    """
+    list_display = ('__str__', 'kind', 'status', 'progress', 'scope', 'requested_by', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('data_version', 'started_at', 'finished_at', 'created_at')
+
+from .models import ReminderCampaign, ReminderDelivery
+
+
+class ReminderDeliveryInline(admin.TabularInline):
+    model = ReminderDelivery
+    fields = ('email', 'user', 'status', 'error', 'sent_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ReminderCampaign)
+class ReminderCampaignAdmin(admin.ModelAdmin):
+    """
+    Suivi des envois de rappels (statut par destinataire).
+    """
+    list_display = ('__str__', 'status', 'sent_count', 'failed_count', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('subject', 'status', 'created_by', 'sent_count', 'failed_count', 'created_at', 'started_at', 'finished_at')
+    inlines = [ReminderDeliveryInline]
+
+    def has_add_permission(self, request):
+        return False
+
+from .models import EmissionFactorVersion
+
+@admin.register(EmissionFactorVersion)
+class EmissionFactorVersionAdmin(admin.ModelAdmin):
+    """
+    Historique des facteurs : l'enregistrement d'une version recalcule
+    les saisies des années couvertes (ancienne et nouvelle plage).
+    """
+    list_display = ('factor_key', 'factor_model', 'value_field', 'value', 'valid_from_year', 'valid_to_year', 'source', 'created_at')
+    list_filter = ('factor_model', 'valid_from_year')
+    search_fields = ('factor_key', 'source')
@@ -0,0 +1,24 @@
+"""
+Actions d'administration partagées par les modèles de facteurs.
+"""
+
+from django.contrib import admin, messages
+
+
+def recompute_emissions_action(*sectors):
+    """
+    Action recalculant les saisies des secteurs qui utilisent le facteur
+    (tout le secteur : les totaux dépendent de l'ensemble des facteurs).
+    """
+    @admin.action(description="🔄 Recalculer les émissions des saisies (secteur entier)")
+    def recompute(modeladmin, request, queryset):
+        from apps.core.services.recompute import recompute_emissions
+
+        updated = recompute_emissions(sectors=sectors)
+        modeladmin.message_user(
+            request,
+            f"{sum(updated.values())} saisie(s) recalculée(s) : "
+            + ', '.join(f"{sector} ({count})" for sector, count in updated.items()),
+            messages.SUCCESS,
+        )
+    return recompute
@@ -0,0 +1,8 @@
+from functools import partial
+
+from apps.core.services.user_groups import get_group_names
+
+
+def user_groups(request):
+    """Noms des groupes de l'utilisateur connecté (menu latéral), lus seulement si le gabarit les utilise."""
+    return {'user_group_names': partial(get_group_names, request.user)}
@@ -0,0 +1,166 @@
+"""
+Commande Django de mesure du parsing ADEME sur un fichier Base Carbone synthétique.
+Usage: python manage.py benchmark_ademe_parser [--rows 200000] [--workers 4] [--keep-file]
+"""
+
+import csv
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from apps.core.services.ademe_csv_parser import ADEMECSVParser
+
+
+# Colonnes lues par ADEMECSVParser._extract_factor_from_row
+HEADERS = [
+    'Nom base français',
+    'Unité français',
+    'Total poste non décomposé',
+    "Statut de l'élément",
+    'Localisation géographique',
+    "Catégorie de l'élément",
+]
+
+# Noms proches de ceux de la Base Carbone (la plupart ne correspondent à aucun critère)
+NAMES = [
+    'Essence à la pompe', 'Gazole routier', 'Gazole non routier', 'Biogazole',
+    'Voiture particulière thermique moyenne', 'Voiture particulière électrique',
+    'Voiture électrique', 'Voiture particulière hybride', 'Autobus thermique',
+    'Électricité réseau', 'Gaz naturel', 'Fioul domestique', 'Béton armé',
+    'Acier', 'Papier recyclé', 'Ordinateur portable', 'Repas végétarien',
+    'Repas à dominante de boeuf', 'Train grandes lignes', 'Avion court courrier',
+]
+UNITS = ['kgCO2e/litre', 'kgCO2e/km', 'kgCO2e/kWh PCI', 'kgCO2e/tonne', 'kgCO2e/unité', 'kgCO2e/repas', 'kgCO2e/passager.km']
+LOCATIONS = ['France continentale', 'France métropolitaine', 'Europe', '']
+STATUSES = ['Valide générique', 'Valide spécifique', 'Archivé']
+
+
+def reference_match(criteria_by_key, name, unit):
+    """Recherche de sous-chaînes critère par critère (comportement historique)."""
+    name_lower = name.lower()
+    unit_lower = unit.lower()
+    for factor_key, criteria in criteria_by_key.items():
+        if criteria['unit'] not in unit_lower:
+            continue
+        if not all(kw.lower() in name_lower for kw in criteria['all_keywords']):
+            continue
+        if 'any_of' in criteria and not any(kw.lower() in name_lower for kw in criteria['any_of']):
+            continue
+        if any(excl.lower() in name_lower for excl in criteria['exclude']):
+            continue
+        return (factor_key, criteria['max_results'])
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Mesure le classement des facteurs ADEME (mots-clés compilés vs recherche naïve) sur un CSV synthétique'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=200000,
+            help='Nombre de lignes du fichier synthétique (défaut: 200000)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Graine du générateur aléatoire (défaut: 42)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=min(4, multiprocessing.cpu_count()),
+            help='Nombre de processus du parsing parallèle comparé au parsing en série (défaut: 4)'
+        )
+        parser.add_argument(
+            '--keep-file',
+            action='store_true',
+            help='Conserve le fichier CSV généré'
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        path = self._generate_file(rows, options['seed'])
+        self.stdout.write(f"📄 Fichier synthétique: {rows} lignes ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+
+        try:
+            parser = ADEMECSVParser(csv_url='')
+            sectors = list(parser.ESSENTIAL_FACTORS.keys())
+
+            with open(path, encoding=parser.encoding, newline='') as csv_file:
+                factors = [f for f in map(parser._extract_factor_from_row, csv.DictReader(csv_file, delimiter=';')) if f]
+            self.stdout.write(f"   {len(factors)} ligne(s) retenue(s) après filtrage statut/localisation/valeur")
+
+            # Classement seul : recherche naïve vs critères compilés
+            start = time.perf_counter()
+            expected = [
+                {
+                    sector: match
+                    for sector in sectors
+                    if (match := reference_match(parser.ESSENTIAL_FACTORS[sector], f['name'], f['unit']))
+                }
+                for f in factors
+            ]
+            naive_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            matcher = parser.get_matcher()
+            actual = [matcher.classify(f['name'], f['unit'], sectors) for f in factors]
+            compiled_time = time.perf_counter() - start
+
+            if actual != expected:
+                mismatches = sum(1 for a, e in zip(actual, expected) if a != e)
+                self.stdout.write(self.style.ERROR(f"❌ {mismatches} classement(s) différent(s) de la référence"))
+            else:
+                self.stdout.write(self.style.SUCCESS("✅ Classements identiques à la recherche naïve"))
+
+            self.stdout.write(f"⏱️ Recherche naïve:    {naive_time * 1000:8.1f} ms")
+            self.stdout.write(f"⏱️ Critères compilés:  {compiled_time * 1000:8.1f} ms (x{naive_time / compiled_time:.1f})")
+
+            # Parsing complet du fichier : série puis parallèle
+            start = time.perf_counter()
+            result = parser.parse_file(path)
+            parse_time = time.perf_counter() - start
+            found = sum(len(v) for v in result.values())
+            self.stdout.write(f"⏱️ parse_file série:   {parse_time * 1000:8.1f} ms ({rows / parse_time:,.0f} lignes/s, {found} facteur(s))")
+
+            workers = options['workers']
+            if workers > 1:
+                start = time.perf_counter()
+                parallel_result = parser.parse_file(path, workers=workers)
+                parallel_time = time.perf_counter() - start
+                self.stdout.write(
+                    f"⏱️ parse_file {workers} proc: {parallel_time * 1000:8.1f} ms "
+                    f"({rows / parallel_time:,.0f} lignes/s, x{parse_time / parallel_time:.1f})"
+                )
+                if parallel_result == result:
+                    self.stdout.write(self.style.SUCCESS("✅ Résultat parallèle identique au parsing en série"))
+                else:
+                    self.stdout.write(self.style.ERROR("❌ Résultat parallèle différent du parsing en série"))
+        finally:
+            if options['keep_file']:
+                self.stdout.write(f"📁 {path}")
+            else:
+                os.unlink(path)
+
+    def _generate_file(self, rows, seed):
+        rng = random.Random(seed)
+        handle, path = tempfile.mkstemp(suffix='.csv', prefix='base_carbone_')
+        with os.fdopen(handle, 'w', encoding='latin-1', newline='') as csv_file:
+            writer = csv.writer(csv_file, delimiter=';')
+            writer.writerow(HEADERS)
+            for i in range(rows):
+                writer.writerow([
+                    f"{rng.choice(NAMES)} {rng.choice(['', 'moyen', 'France', 'bio', 'mix'])} #{i}".strip(),
+                    rng.choice(UNITS),
+                    f"{rng.uniform(0.01, 50):.4f}".replace('.', ','),
+                    rng.choice(STATUSES),
+                    rng.choice(LOCATIONS),
+                    'Synthétique',
+                ])
+        return path
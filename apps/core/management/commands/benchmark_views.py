@@ -0,0 +1,158 @@
+"""
+Commande Django de mesure des pages et API principales sur des jeux de données de taille fixe.
+Usage: python manage.py benchmark_views [--sizes 1k 100k 1M] [--iterations 20] [--baseline benchmarks/baseline.json] [--save-baseline]
+
+Les données sont générées dans une base de test créée pour l'occasion (comme
+`manage.py test`) : la base configurée n'est pas modifiée. La commande échoue si
+une mesure régresse par rapport à la référence enregistrée.
+"""
+
+import json
+import os
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from apps.core.services.benchmarks import (
+    SCENARIOS, compare_to_baseline, environment, parse_size, run_benchmarks, seed_dataset, size_label,
+)
+
+
+class Command(BaseCommand):
+    help = 'Mesure latences, requêtes SQL et mémoire des vues principales (1k / 100k / 1M saisies) et compare à une référence'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            default=['1k', '100k'],
+            help='Tailles des jeux de données en saisies : 1k, 100k, 1M ou un entier (défaut: 1k 100k)'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Appels mesurés par scénario après le premier appel (défaut: 20)'
+        )
+        parser.add_argument(
+            '--scenarios',
+            nargs='+',
+            help=f"Scénarios mesurés (défaut: tous). Choix: {', '.join(SCENARIOS)}"
+        )
+        parser.add_argument(
+            '--groups',
+            type=int,
+            default=20,
+            help='Nombre de groupes des jeux de données (défaut: 20)'
+        )
+        parser.add_argument(
+            '--years',
+            type=int,
+            default=5,
+            help="Nombre d'années des jeux de données, jusqu'à l'année en cours (défaut: 5)"
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Graine du générateur de données (défaut: 42)'
+        )
+        parser.add_argument(
+            '--baseline',
+            default=str(settings.BASE_DIR / 'benchmarks' / 'baseline.json'),
+            help='Fichier JSON de référence (défaut: benchmarks/baseline.json)'
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Enregistre les mesures comme nouvelle référence au lieu de comparer'
+        )
+        parser.add_argument(
+            '--output',
+            help='Écrit aussi les mesures dans ce fichier JSON'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Hausse relative tolérée de la latence p95 et du pic mémoire (défaut: 0.25)'
+        )
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'] or list(SCENARIOS)
+        unknown = [s for s in scenarios if s not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Scénario(s) inconnu(s): {', '.join(unknown)}")
+        if options['iterations'] < 1:
+            raise CommandError("--iterations doit être supérieur ou égal à 1")
+        try:
+            sizes = sorted({parse_size(size) for size in options['sizes']})
+        except ValueError as e:
+            raise CommandError(f"Taille invalide: {e}")
+
+        current_year = timezone.now().year
+        years = list(range(current_year - options['years'] + 1, current_year + 1))
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            call_command('init_factors', stdout=StringIO())
+
+            results = {}
+            for rows in sizes:
+                label = size_label(rows)
+                self.stdout.write(f"🏭 Jeu de données {label} ({options['groups']} groupes, {len(years)} ans)...")
+                created = seed_dataset(rows, options['groups'], years, options['seed'])
+                self.stdout.write(f"   {created:,} saisie(s) générée(s)")
+                self.stdout.write(f"   {'scénario':<28}{'froid':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'SQL':>6}{'mémoire':>12}")
+
+                def progress(name, m):
+                    self.stdout.write(
+                        f"   {name:<28}{m['cold_ms']:>8.1f}ms{m['p50_ms']:>8.1f}ms{m['p95_ms']:>8.1f}ms"
+                        f"{m['p99_ms']:>8.1f}ms{m['queries']:>6}{m['peak_memory_kb']:>10.0f}Ko"
+                        + ('' if m['status'] == 200 else f"  ⚠️ HTTP {m['status']}")
+                    )
+
+                results[label] = run_benchmarks(options['iterations'], scenarios, current_year, progress)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {'environment': environment(), 'iterations': options['iterations'], 'results': results}
+        if options['output']:
+            self._write(options['output'], report)
+
+        baseline_path = options['baseline']
+        if options['save_baseline']:
+            self._write(baseline_path, report)
+            self.stdout.write(self.style.SUCCESS(f"✅ Référence enregistrée: {baseline_path}"))
+            return
+
+        if not os.path.exists(baseline_path):
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ Pas de référence ({baseline_path}) : relancer avec --save-baseline pour l'enregistrer"
+            ))
+            return
+
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(
+            results, baseline.get('results', {}),
+            latency_tolerance=options['tolerance'], memory_tolerance=options['tolerance'],
+        )
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(f"❌ {line}"))
+            raise CommandError(f"{len(regressions)} régression(s) par rapport à {baseline_path}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Aucune régression par rapport à {baseline_path}"))
+
+    def _write(self, path, report):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
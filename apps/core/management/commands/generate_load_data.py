@@ -0,0 +1,100 @@
+"""
+Commande Django de génération de données de charge (tests de performance, mesures).
+Usage: python manage.py generate_load_data [--scale 100] [--years 2020 2021 ...] [--groups 20] [--seed 42]
+
+Remplace les groupes « Charge ... » générés précédemment et leurs saisies ;
+les autres données ne sont pas modifiées.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.services.load_data import ROWS_PER_GROUP_YEAR, generate_load_data
+from apps.core.services.rollups import SECTORS
+
+
+class Command(BaseCommand):
+    help = 'Génère un jeu de saisies synthétiques déterministe et volumineux (bulk_create) pour les tests de charge'
+
+    def add_arguments(self, parser):
+        current_year = timezone.now().year
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1,
+            help=(
+                "Multiplicateur des saisies par groupe et par année (défaut: 1 = "
+                + ', '.join(f"{count} {sector}" for sector, count in ROWS_PER_GROUP_YEAR.items()) + ")"
+            )
+        )
+        parser.add_argument(
+            '--years',
+            nargs='+',
+            type=int,
+            default=list(range(current_year - 4, current_year + 1)),
+            help='Années générées (défaut: les 5 dernières)'
+        )
+        parser.add_argument(
+            '--groups',
+            type=int,
+            default=20,
+            help='Nombre de groupes, avec un agent par groupe (défaut: 20)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Graine du générateur aléatoire (défaut: 42)'
+        )
+        parser.add_argument(
+            '--sectors',
+            nargs='+',
+            help=f"Secteurs générés (défaut: tous). Choix: {', '.join(SECTORS)}"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Taille des lots de bulk_create (défaut: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        sectors = options['sectors'] or SECTORS
+        unknown = [s for s in sectors if s not in SECTORS]
+        if unknown:
+            raise CommandError(f"Secteur(s) inconnu(s): {', '.join(unknown)}")
+        if options['groups'] < 1 or options['scale'] <= 0:
+            raise CommandError("--groups et --scale doivent être positifs")
+
+        per_sector = {
+            sector: max(1, round(ROWS_PER_GROUP_YEAR[sector] * options['scale'])) * options['groups'] * len(options['years'])
+            for sector in sectors
+        }
+        self.stdout.write(
+            f"🏭 Génération de {sum(per_sector.values()):,} saisie(s) : {options['groups']} groupe(s), "
+            f"années {', '.join(map(str, sorted(options['years'])))}, graine {options['seed']}"
+        )
+
+        start = time.perf_counter()
+
+        def progress(sector, count):
+            if count == per_sector[sector] or count % (options['batch_size'] * 20) == 0:
+                self.stdout.write(f"   {sector}: {count:,} / {per_sector[sector]:,}")
+
+        created = generate_load_data(
+            scale=options['scale'],
+            years=options['years'],
+            groups=options['groups'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            sectors=sectors,
+            progress=progress,
+        )
+        elapsed = time.perf_counter() - start
+
+        total = sum(created.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {total:,} saisie(s) créée(s) en {elapsed:.1f}s ({total / elapsed:,.0f} lignes/s), agrégats reconstruits"
+        ))
@@ -0,0 +1,138 @@
+"""
+Commande Django de test de charge « fin de campagne » contre un serveur démarré.
+Usage: python manage.py load_test [--base-url http://127.0.0.1:8000] [--users 200] [--duration 120] [--ramp-up 30]
+                                  [--think-time 0.5 2] [--output rapport.json]
+
+Prérequis : des comptes agents, générés par `python manage.py generate_load_data`
+(mot de passe 'password'), dans la base utilisée par le serveur.
+"""
+
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.services.load_data import USERNAME_PREFIX
+from apps.core.services.load_test import run_load_test
+
+
+class Command(BaseCommand):
+    help = 'Simule des agents concurrents (connexion, saisies, listes, tableau de bord, statistiques, exports) contre un serveur démarré'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            default='http://127.0.0.1:8000',
+            help='Adresse du serveur testé (défaut: http://127.0.0.1:8000)'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=200,
+            help='Nombre d\'agents simulés simultanés (défaut: 200)'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=120,
+            help='Durée du test après la montée en charge, en secondes (défaut: 120)'
+        )
+        parser.add_argument(
+            '--ramp-up',
+            type=float,
+            default=30,
+            help='Durée de démarrage progressif des agents, en secondes (défaut: 30)'
+        )
+        parser.add_argument(
+            '--think-time',
+            type=float,
+            nargs=2,
+            default=[0.5, 2.0],
+            metavar=('MIN', 'MAX'),
+            help='Pause aléatoire entre deux actions d\'un agent, en secondes (défaut: 0.5 2)'
+        )
+        parser.add_argument(
+            '--username-prefix',
+            default=USERNAME_PREFIX,
+            help=f'Préfixe des comptes agents utilisés (défaut: {USERNAME_PREFIX}, voir generate_load_data)'
+        )
+        parser.add_argument(
+            '--password',
+            default='password',
+            help='Mot de passe des comptes agents (défaut: password)'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Délai maximum d\'une requête, en secondes (défaut: 60)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Graine du tirage des parcours (défaut: 42)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Écrit le rapport dans ce fichier JSON'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError("--users doit être supérieur ou égal à 1")
+        accounts = list(
+            User.objects.filter(username__startswith=options['username_prefix'], is_active=True, is_staff=False)
+            .order_by('username').values_list('username', flat=True)
+        )
+        if not accounts:
+            raise CommandError(
+                f"Aucun compte '{options['username_prefix']}*' : lancer d'abord python manage.py generate_load_data"
+            )
+
+        self.stdout.write(self.style.SUCCESS("\n🚦 Test de charge"))
+        self.stdout.write(f"Serveur: {options['base_url']}")
+        self.stdout.write(
+            f"Agents: {options['users']} ({len(accounts)} compte(s)), montée en charge {options['ramp_up']:.0f}s, "
+            f"durée {options['duration']:.0f}s\n"
+        )
+
+        def progress(elapsed, total):
+            if total:
+                self.stdout.write(
+                    f"   {elapsed:>6.0f}s  {total['requests']:>7} requêtes  {total['throughput_rps']:>7.1f} req/s  "
+                    f"erreurs {total['error_rate']:.1%}  p95 {total['p95_ms']:.0f}ms"
+                )
+
+        report = run_load_test(
+            options['base_url'], accounts, options['password'], users=options['users'],
+            duration=options['duration'], ramp_up=options['ramp_up'], think_time=options['think_time'],
+            seed=options['seed'], timeout=options['timeout'], progress=progress,
+        )
+
+        self.stdout.write(f"\n📊 Résultats ({report['elapsed_s']:.0f}s)")
+        self.stdout.write(
+            f"   {'point d accès':<32}{'requêtes':>9}{'req/s':>9}{'erreurs':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+        )
+        for endpoint, m in report['endpoints'].items():
+            line = (
+                f"   {endpoint:<32}{m['requests']:>9}{m['throughput_rps']:>9.1f}{m['error_rate']:>9.1%}"
+                f"{m['p50_ms']:>7.0f}ms{m['p95_ms']:>7.0f}ms{m['p99_ms']:>7.0f}ms{m['max_ms']:>7.0f}ms"
+            )
+            self.stdout.write(self.style.ERROR(line) if m['error_rate'] else line)
+        for endpoint, sample in report['errors'].items():
+            self.stdout.write(self.style.WARNING(f"⚠️ {endpoint} : {sample}"))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump({'options': {k: options[k] for k in ('base_url', 'users', 'duration', 'ramp_up', 'think_time')},
+                           **report}, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"📄 Rapport JSON: {options['output']}")
+
+        total = report['endpoints'].get('TOTAL')
+        if not total:
+            self.stdout.write(self.style.ERROR("❌ Aucune requête effectuée"))
+        elif total['error_rate']:
+            self.stdout.write(self.style.WARNING(f"⚠️ Taux d'erreur global: {total['error_rate']:.1%}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ Aucune erreur"))
@@ -0,0 +1,34 @@
+"""
+Commande Django pour reconstruire la table d'agrégats d'émissions.
+Usage: python manage.py rebuild_rollups [--sectors vehicles food] [--years 2025 2026]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.services.rollups import SECTORS, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit les agrégats d\'émissions (EmissionRollup) depuis les tables de saisie'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sectors',
+            nargs='+',
+            help=f"Secteurs à reconstruire (défaut: tous). Choix: {', '.join(SECTORS)}"
+        )
+        parser.add_argument(
+            '--years',
+            nargs='+',
+            type=int,
+            help='Années à reconstruire (défaut: toutes)'
+        )
+
+    def handle(self, *args, **options):
+        sectors = options['sectors'] or SECTORS
+        unknown = [s for s in sectors if s not in SECTORS]
+        if unknown:
+            raise CommandError(f"Secteur(s) inconnu(s): {', '.join(unknown)}")
+
+        self.stdout.write(f"🔄 Reconstruction des agrégats: {', '.join(sectors)}")
+        written = rebuild_rollups(sectors=sectors, years=options['years'])
+        self.stdout.write(self.style.SUCCESS(f"✅ {written} ligne(s) d'agrégats écrites"))
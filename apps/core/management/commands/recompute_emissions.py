@@ -0,0 +1,48 @@
+"""
+Commande Django pour recalculer les émissions des saisies avec les facteurs courants.
+Usage: python manage.py recompute_emissions [--sectors vehicles purchases] [--years 2025 2026] [--groups 3 4]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.services.recompute import recompute_emissions
+from apps.core.services.rollups import SECTORS
+
+
+class Command(BaseCommand):
+    help = 'Recalcule total_co2_kg des saisies avec les facteurs courants (un UPDATE par secteur)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sectors',
+            nargs='+',
+            help=f"Secteurs à recalculer (défaut: tous). Choix: {', '.join(SECTORS)}"
+        )
+        parser.add_argument(
+            '--years',
+            nargs='+',
+            type=int,
+            help='Années à recalculer (défaut: toutes)'
+        )
+        parser.add_argument(
+            '--groups',
+            nargs='+',
+            type=int,
+            help='Identifiants des groupes à recalculer (défaut: tous)'
+        )
+
+    def handle(self, *args, **options):
+        sectors = options['sectors'] or SECTORS
+        unknown = [s for s in sectors if s not in SECTORS]
+        if unknown:
+            raise CommandError(f"Secteur(s) inconnu(s): {', '.join(unknown)}")
+
+        self.stdout.write(f"🔄 Recalcul des émissions: {', '.join(sectors)}")
+        start = time.perf_counter()
+        updated = recompute_emissions(sectors=sectors, years=options['years'], group_ids=options['groups'])
+        elapsed = time.perf_counter() - start
+
+        for sector, count in updated.items():
+            self.stdout.write(f"   {sector}: {count} saisie(s)")
+        self.stdout.write(self.style.SUCCESS(f"✅ {sum(updated.values())} saisie(s) recalculée(s) en {elapsed:.2f}s"))
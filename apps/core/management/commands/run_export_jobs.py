@@ -0,0 +1,49 @@
+"""
+Commande Django pour générer les exports demandés depuis l'interface.
+Usage: python manage.py run_export_jobs [--once] [--interval 5]
+Les exports restés en cours au-delà de EXPORT_JOB_TIMEOUT sont repris.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from apps.core.services.export_jobs import process_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Génère les exports en attente (ExportJob) hors du cycle requête/réponse'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Traite les exports en attente puis s\'arrête (usage cron)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Délai en secondes entre deux scrutations de la file (défaut: 5)'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            self._process()
+            return
+
+        self.stdout.write(f"🔄 En attente d'exports (scrutation toutes les {options['interval']}s)...")
+        try:
+            while True:
+                if not self._process():
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("⏹️ Arrêt")
+
+    def _process(self):
+        jobs = process_pending_jobs()
+        for job in jobs:
+            if job.status == job.STATUS_DONE:
+                self.stdout.write(self.style.SUCCESS(f"✅ {job}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"❌ {job}: {job.error}"))
+        return jobs
@@ -0,0 +1,61 @@
+"""
+Commande Django pour envoyer les campagnes de rappel en attente.
+Usage: python manage.py send_reminders [--once] [--interval 30] [--rate 5] [--batch-size 50]
+Les campagnes restées en cours au-delà de REMINDER_CAMPAIGN_TIMEOUT sont reprises.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from apps.core.services.reminders import claim_next_campaign, dispatch_campaign
+
+
+class Command(BaseCommand):
+    help = 'Envoie les emails de rappel en attente (ReminderCampaign) avec une connexion SMTP réutilisée'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Envoie les campagnes en attente puis s\'arrête (usage cron)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30,
+            help='Délai en secondes entre deux scrutations de la file (défaut: 30)'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            help='Débit maximum en messages/seconde (défaut: REMINDER_EMAIL_RATE_LIMIT)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Taille des lots (défaut: REMINDER_EMAIL_BATCH_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            self._process(options)
+            return
+
+        self.stdout.write(f"🔄 En attente de rappels (scrutation toutes les {options['interval']}s)...")
+        try:
+            while True:
+                if not self._process(options):
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("⏹️ Arrêt")
+
+    def _process(self, options):
+        processed = 0
+        while True:
+            campaign = claim_next_campaign()
+            if campaign is None:
+                return processed
+            self.stdout.write(f"📧 {campaign}")
+            dispatch_campaign(campaign, batch_size=options['batch_size'], rate_limit=options['rate'])
+            self.stdout.write(self.style.SUCCESS(f"✅ {campaign.sent_count} envoyé(s), {campaign.failed_count} échec(s)"))
+            processed += 1
@@ -1,14 +1,19 @@
 """
 Commande Django pour mettre à jour les facteurs ADEME depuis le CSV.
-Usage: python manage.py update_ademe_factors [--dry-run] [--sectors vehicles buildings]
+Usage: python manage.py update_ademe_factors [--dry-run] [--sectors vehicles buildings] [--from-file chemin.csv] [--force]
+                                            [--report rapport.json] [--workers 4] [--recompute]
 """
 
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from apps.core.models import ADEMEConfiguration
 from apps.core.services.ademe_csv_parser import ADEMECSVParser
-from apps.vehicles.models import EmissionFactor
-from decimal import Decimal
+from apps.core.services.ademe_import import SECTOR_TARGETS, apply_factor_diff, compute_factor_diff, diff_report
+from apps.core.services.metrics import ADEME_IMPORT_DURATION, ADEME_IMPORT_ROWS
+from apps.core.services.recompute import recompute_emissions
+from pathlib import Path
+import json
 
 
 class Command(BaseCommand):
@@ -25,6 +30,30 @@ class Command(BaseCommand):
             nargs='+',
             help='Secteurs à mettre à jour (sinon, utilise active_sectors de la config)'
         )
+        parser.add_argument(
+            '--from-file',
+            help='Importe un fichier CSV local au lieu de télécharger (rejeu hors ligne)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Importe même si le fichier Base Carbone n\'a pas changé depuis le dernier import'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Nombre de processus pour le parsing du CSV (défaut: 1, parsing en série)'
+        )
+        parser.add_argument(
+            '--recompute',
+            action='store_true',
+            help='Recalcule les émissions des saisies des secteurs dont des facteurs ont changé'
+        )
+        parser.add_argument(
+            '--report',
+            help='Chemin du rapport JSON des changements (défaut: <ADEME_CACHE_DIR>/reports/)'
+        )
     
     def handle(self, *args, **options):
         dry_run = options['dry_run']
@@ -41,8 +70,15 @@ class Command(BaseCommand):
             if not sectors:
                 raise CommandError("Aucun secteur actif configuré. Utilisez l'admin ou --sectors")
         
+        known_sectors = [key for key, _label in ADEMEConfiguration.SECTORS_CHOICES if key in SECTOR_TARGETS]
+        unknown = [s for s in sectors if s not in known_sectors]
+        if unknown:
+            raise CommandError(f"Secteur(s) inconnu(s): {', '.join(unknown)}. Choix: {', '.join(known_sectors)}")
+        
+        from_file = options['from_file']
+        
         self.stdout.write(self.style.SUCCESS(f"\n🌱 Mise à jour ADEME"))
-        self.stdout.write(f"URL CSV: {config.csv_url}")
+        self.stdout.write(f"Fichier CSV: {from_file}" if from_file else f"URL CSV: {config.csv_url}")
         self.stdout.write(f"Secteurs: {', '.join(sectors)}")
         if dry_run:
             self.stdout.write(self.style.WARNING("Mode DRY-RUN activé\n"))
@@ -51,42 +87,88 @@ class Command(BaseCommand):
         parser = ADEMECSVParser(config.csv_url)
         
         try:
-            # Télécharger et parser le CSV
-            self.stdout.write("📥 Téléchargement du CSV...")
-            csv_content = parser.download_csv()
-            self.stdout.write(self.style.SUCCESS("✅ CSV téléchargé\n"))
+            fetched = None
+            if from_file:
+                csv_path = from_file
+            else:
+                # Téléchargement conditionnel vers le cache local
+                self.stdout.write("📥 Téléchargement du CSV...")
+                with ADEME_IMPORT_DURATION.labels(phase='download').time():
+                    fetched = parser.download_to_cache(
+                        settings.ADEME_CACHE_DIR,
+                        etag=config.csv_etag,
+                        last_modified=config.csv_last_modified,
+                        known_sha256=config.csv_sha256,
+                    )
+                if fetched['status'] != 'downloaded' and not options['force']:
+                    self.stdout.write(self.style.SUCCESS("✅ Base Carbone inchangée depuis le dernier import, rien à faire"))
+                    if not dry_run:
+                        config.last_update = timezone.now()
+                        # Contenu identique mais ETag / Last-Modified éventuellement changés :
+                        # les mémoriser pour que la prochaine requête conditionnelle aboutisse
+                        config.csv_etag = fetched['etag']
+                        config.csv_last_modified = fetched['last_modified']
+                        config.csv_sha256 = fetched['sha256']
+                        config.save()
+                    return
+                if fetched['status'] == 'downloaded':
+                    self.stdout.write(self.style.SUCCESS("✅ CSV téléchargé\n"))
+                else:
+                    self.stdout.write(self.style.WARNING("♻️ CSV inchangé, réimport forcé depuis le cache\n"))
+                csv_path = fetched['path']
             
-            self.stdout.write("🔍 Parsing du CSV...")
-            factors_by_sector = parser.parse_csv(csv_content, sectors=sectors)
+            self.stdout.write("🔍 Parsing du CSV (un seul passage pour tous les secteurs)...")
+            with ADEME_IMPORT_DURATION.labels(phase='parse').time():
+                factors_by_sector = parser.parse_file(csv_path, sectors=sectors, workers=options['workers'])
             self.stdout.write(self.style.SUCCESS("✅ Parsing terminé\n"))
             
-            # Statistiques globales
-            total_created = 0
-            total_updated = 0
+            # Différentiel calculé en mémoire (une requête par secteur), appliqué en une transaction
+            with ADEME_IMPORT_DURATION.labels(phase='diff').time():
+                diff = compute_factor_diff(factors_by_sector)
+            if not dry_run:
+                with ADEME_IMPORT_DURATION.labels(phase='apply').time():
+                    apply_factor_diff(diff)
+                for sector, sector_diff in diff.items():
+                    for outcome in ('created', 'updated', 'unchanged', 'skipped'):
+                        ADEME_IMPORT_ROWS.labels(sector=sector, outcome=outcome).inc(len(sector_diff[outcome]))
             
-            # Traiter chaque secteur
-            for sector, factors in factors_by_sector.items():
+            for sector, sector_diff in diff.items():
                 self.stdout.write(f"\n📊 Secteur: {sector.upper()}")
-                self.stdout.write(f"   Facteurs trouvés: {len(factors)}")
-                
-                created, updated = self._process_sector_factors(
-                    sector, factors, dry_run
-                )
-                
-                total_created += created
-                total_updated += updated
-                
-                self.stdout.write(f"   ✨ Créés: {created}")
-                self.stdout.write(f"   🔄 Mis à jour: {updated}")
+                self.stdout.write(f"   Facteurs trouvés: {len(factors_by_sector[sector])}")
+                self.stdout.write(f"   ✨ Créés: {len(sector_diff['created'])}")
+                self.stdout.write(f"   🔄 Mis à jour: {len(sector_diff['updated'])}")
+                self.stdout.write(f"   ⏸️ Inchangés: {len(sector_diff['unchanged'])}")
+                if sector_diff['skipped']:
+                    self.stdout.write(self.style.WARNING(f"   ⚠️ Ignorés: {len(sector_diff['skipped'])}"))
+            
+            report = diff_report(diff, source=str(csv_path), dry_run=dry_run)
+            report_path = self._write_report(report, options['report'])
             
             # Résumé final
             self.stdout.write(self.style.SUCCESS(f"\n✅ Terminé!"))
-            self.stdout.write(f"Total créés: {total_created}")
-            self.stdout.write(f"Total mis à jour: {total_updated}")
+            self.stdout.write(f"Total créés: {report['totals']['created']}")
+            self.stdout.write(f"Total mis à jour: {report['totals']['updated']}")
+            self.stdout.write(f"Total inchangés: {report['totals']['unchanged']}")
+            self.stdout.write(f"📄 Rapport JSON: {report_path}")
+            
+            if options['recompute'] and not dry_run:
+                changed = [s for s, d in diff.items() if d['created'] or d['updated']]
+                if 'buildings' in changed and 'numerique' not in changed:
+                    # Le facteur ELEC sert aussi à l'usage des équipements numériques
+                    changed.append('numerique')
+                if changed:
+                    with ADEME_IMPORT_DURATION.labels(phase='recompute').time():
+                        updated = recompute_emissions(sectors=changed)
+                    self.stdout.write(self.style.SUCCESS(f"🔄 Saisies recalculées: {sum(updated.values())}"))
             
             # Mettre à jour la config (sauf en dry-run)
             if not dry_run:
                 config.last_update = timezone.now()
+                # Mémoriser l'état HTTP du fichier importé pour la prochaine requête conditionnelle
+                if fetched:
+                    config.csv_etag = fetched['etag']
+                    config.csv_last_modified = fetched['last_modified']
+                    config.csv_sha256 = fetched['sha256']
                 # Extraire version du CSV si possible
                 if 'V' in config.csv_url:
                     parts = config.csv_url.split('V')
@@ -98,65 +180,18 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f"Erreur: {e}")
     
-    def _process_sector_factors(self, sector, factors, dry_run):
+    def _write_report(self, report, path=None):
         """
-        Traite les facteurs d'un secteur : création ou mise à jour.
+        Écrit le rapport JSON des changements.
         
         Returns:
-            Tuple (nb_created, nb_updated)
-        """
-        created = 0
-        updated = 0
-        
-        for factor_data in factors:
-            # Créer une clé unique basée sur le nom et l'unité
-            subcategory = self._generate_subcategory(factor_data['name'], sector)
-            
-            # Chercher un facteur existant
-            existing = EmissionFactor.objects.filter(
-                subcategory=subcategory,
-                category=sector
-            ).first()
-            
-            if existing:
-                # Mise à jour si la valeur a changé
-                if existing.factor_value != factor_data['value']:
-                    if not dry_run:
-                        existing.factor_value = factor_data['value']
-                        existing.name = factor_data['name']
-                        existing.is_active = True
-                        existing.save()
-                    updated += 1
-            else:
-                # Création
-                if not dry_run:
-                    EmissionFactor.objects.create(
-                        name=factor_data['name'],
-                        category=sector,
-                        subcategory=subcategory,
-                        unit=factor_data['unit'],
-                        factor_value=factor_data['value'],
-                        source='ADEME Base Carbone',
-                        is_active=True
-                    )
-                created += 1
-        
-        return created, updated
-    
-    def _generate_subcategory(self, name, sector):
+            Chemin du fichier écrit
         """
-        Génère une sous-catégorie unique à partir du nom.
-        """
-        # Nettoyer et normaliser le nom
-        clean_name = name.lower()
-        clean_name = clean_name.replace(' ', '_')
-        clean_name = clean_name.replace('-', '_')
-        clean_name = clean_name.replace('(', '').replace(')', '')
-        clean_name = clean_name.replace('é', 'e').replace('è', 'e')
-        clean_name = clean_name.replace('à', 'a').replace('ô', 'o')
-        
-        # Limiter la longueur
-        if len(clean_name) > 50:
-            clean_name = clean_name[:50]
-        
-        return f"{sector}_{clean_name}"
+        if path:
+            path = Path(path)
+        else:
+            stamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+            path = Path(settings.ADEME_CACHE_DIR) / 'reports' / f"update_ademe_factors_{stamp}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        return path
@@ -0,0 +1,118 @@
+"""
+Middleware de mesure des requêtes HTTP.
+
+Pour une requête échantillonnée (REQUEST_METRICS_SAMPLE_RATE), mesure le nombre et
+la durée des requêtes SQL, les requêtes répétées (N+1) et le temps de rendu des
+gabarits, puis les expose :
+- dans l'en-tête Server-Timing (onglet réseau du navigateur),
+- dans une ligne de journal clé=valeur (logger apps.core.middleware) : INFO,
+  ou WARNING si la requête est lente (REQUEST_METRICS_SLOW_MS) ou répète une
+  même requête SQL (REQUEST_METRICS_DUPLICATE_THRESHOLD).
+
+Les requêtes non échantillonnées ne sont que chronométrées (lentes : WARNING).
+Durées (toutes les requêtes) et nombres de requêtes SQL (requêtes échantillonnées)
+alimentent aussi les histogrammes par vue de apps.core.services.metrics.
+Le SQL exécuté pendant la lecture d'une réponse en streaming n'est pas compté.
+"""
+
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from apps.core.services.instrumentation import record_query, start_metrics, stop_metrics
+from apps.core.services.metrics import REQUEST_LATENCY, REQUEST_QUERIES
+
+logger = logging.getLogger(__name__)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def _view_label(request) -> str:
+    # Nom de route plutôt que chemin : nombre de séries borné
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'non_resolue'
+
+
+def _observe(request, response, seconds: float):
+    REQUEST_LATENCY.labels(
+        view=_view_label(request), method=request.method, status=f"{response.status_code // 100}xx"
+    ).observe(seconds)
+
+
+class RequestMetricsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        rate = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 1.0)
+        slow_ms = getattr(settings, 'REQUEST_METRICS_SLOW_MS', 1000)
+        start = time.perf_counter()
+
+        if rate < 1 and random.random() >= rate:
+            response = self.get_response(request)
+            elapsed = time.perf_counter() - start
+            _observe(request, response, elapsed)
+            duration = _ms(elapsed)
+            if duration >= slow_ms:
+                logger.warning(
+                    f"requete_lente method={request.method} path={request.path} "
+                    f"status={response.status_code} duration_ms={duration} sampled=0"
+                )
+            return response
+
+        metrics, token = start_metrics()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(record_query))
+                response = self.get_response(request)
+        finally:
+            stop_metrics(token)
+        elapsed = time.perf_counter() - start
+        _observe(request, response, elapsed)
+        REQUEST_QUERIES.labels(view=_view_label(request)).observe(metrics.queries)
+        duration = _ms(elapsed)
+        db_ms = _ms(metrics.db_time)
+        template_ms = _ms(metrics.template_time)
+        repeated = metrics.repeated_queries(getattr(settings, 'REQUEST_METRICS_DUPLICATE_THRESHOLD', 5))
+
+        if getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', True):
+            timings = [
+                f'total;dur={duration}',
+                f'db;dur={db_ms};desc="SQL x{metrics.queries}"',
+                f'tpl;dur={template_ms};desc="Gabarits"',
+            ]
+            if repeated:
+                timings.append(f'dup;desc="SQL repetees x{len(repeated)}"')
+            response['Server-Timing'] = ', '.join(timings)
+
+        level = logging.WARNING if duration >= slow_ms or repeated else logging.INFO
+        if logger.isEnabledFor(level):
+            line = (
+                f"requete method={request.method} path={request.path} status={response.status_code} "
+                f"duration_ms={duration} sql_queries={metrics.queries} sql_ms={db_ms} "
+                f"template_ms={template_ms} repeated_queries={len(repeated)} sampled=1"
+            )
+            for sql, count in repeated[:3]:
+                line += f' repeated="{count}x {sql[:120]}"'
+            logger.log(level, line, extra={'request_metrics': {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': duration,
+                'sql_queries': metrics.queries,
+                'sql_ms': db_ms,
+                'template_ms': template_ms,
+                'repeated_queries': [{'sql': sql, 'count': count} for sql, count in repeated],
+            }})
+        return response
@@ -0,0 +1,131 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:12
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+SECTOR_SOURCES = {
+    "vehicles": ("vehicles", "VehicleData", "calculation_method"),
+    "buildings": ("batiment", "BuildingEnergyData", None),
+    "food": ("alimentation", "FoodEntry", None),
+    "purchases": ("purchases", "PurchaseData", "category"),
+    "numerique": ("numerique", "EquipementNumerique", "type_equipement"),
+}
+
+
+def populate_rollups(apps, schema_editor):
+    """Initialise les agrégats à partir des saisies existantes."""
+    EmissionRollup = apps.get_model("core", "EmissionRollup")
+    for sector, (app_label, model_name, field) in SECTOR_SOURCES.items():
+        model = apps.get_model(app_label, model_name)
+        group_by = ["year", "group_id"] + ([field] if field else [])
+        rows = (
+            model.objects.order_by()
+            .values(*group_by)
+            .annotate(total=Sum("total_co2_kg"), count=Count("pk"))
+        )
+        EmissionRollup.objects.bulk_create(
+            [
+                EmissionRollup(
+                    sector=sector,
+                    year=row["year"],
+                    group_id=row["group_id"],
+                    subcategory=(row[field] or "") if field else "",
+                    total_co2_kg=round(Decimal(str(row["total"] or 0)), 3),
+                    entry_count=row["count"],
+                )
+                for row in rows
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("core", "0003_remindertemplate"),
+        ("alimentation", "0004_alter_foodemissionfactor_source"),
+        ("batiment", "0003_buildingenergydata_group"),
+        ("numerique", "0004_alter_numeriqueemissionfactor_source"),
+        ("purchases", "0005_alter_purchasedata_category"),
+        ("vehicles", "0005_alter_emissionfactor_source"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmissionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sector",
+                    models.CharField(
+                        choices=[
+                            ("vehicles", "Véhicules"),
+                            ("buildings", "Bâtiments"),
+                            ("food", "Alimentation"),
+                            ("purchases", "Achats"),
+                            ("numerique", "Numérique"),
+                        ],
+                        max_length=20,
+                        verbose_name="Secteur",
+                    ),
+                ),
+                ("year", models.IntegerField(verbose_name="Année")),
+                (
+                    "subcategory",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Catégorie d'achat, type d'équipement, méthode de calcul... (vide si non applicable)",
+                        max_length=50,
+                        verbose_name="Sous-catégorie",
+                    ),
+                ),
+                (
+                    "total_co2_kg",
+                    models.DecimalField(
+                        decimal_places=3,
+                        default=0,
+                        max_digits=16,
+                        verbose_name="Total CO₂ (kg)",
+                    ),
+                ),
+                (
+                    "entry_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Nombre de saisies"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "group",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="auth.group",
+                        verbose_name="Groupe",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Agrégat d'émissions",
+                "verbose_name_plural": "Agrégats d'émissions",
+                "ordering": ["sector", "year"],
+                "unique_together": {("sector", "year", "group", "subcategory")},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
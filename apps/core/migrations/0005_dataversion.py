@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_emissionrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "version",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Version"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Dernière modification"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Version des données",
+                "verbose_name_plural": "Version des données",
+            },
+        ),
+    ]
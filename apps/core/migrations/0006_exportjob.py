@@ -0,0 +1,115 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_dataversion"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("statistics_xlsx", "Statistiques (Excel)"),
+                            ("data_csv", "Données (CSV)"),
+                            ("data_xlsx", "Données (Excel)"),
+                        ],
+                        max_length=30,
+                        verbose_name="Type d'export",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "En attente"),
+                            ("running", "En cours"),
+                            ("done", "Terminé"),
+                            ("failed", "Échec"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Statut",
+                    ),
+                ),
+                (
+                    "progress",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Progression (%)"
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        default="all",
+                        help_text="'all' (vue globale) ou 'groups:<ids>' pour un export limité aux groupes",
+                        max_length=200,
+                        verbose_name="Périmètre",
+                    ),
+                ),
+                (
+                    "data_version",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Version des données"
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True, upload_to="exports/", verbose_name="Fichier"
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Erreur")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Créé le"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Démarré le"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Terminé le"
+                    ),
+                ),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Demandé par",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Export en tâche de fond",
+                "verbose_name_plural": "Exports en tâche de fond",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
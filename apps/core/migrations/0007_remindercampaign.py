@@ -0,0 +1,145 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_exportjob"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReminderCampaign",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("subject", models.CharField(max_length=200, verbose_name="Sujet")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "En attente"),
+                            ("running", "En cours"),
+                            ("done", "Terminé"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Statut",
+                    ),
+                ),
+                (
+                    "sent_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Envoyés"),
+                ),
+                (
+                    "failed_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Échecs"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Créé le"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Démarré le"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Terminé le"
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="reminder_campaigns",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Envoyé par",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Campagne de rappel",
+                "verbose_name_plural": "Campagnes de rappel",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ReminderDelivery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("email", models.EmailField(max_length=254, verbose_name="Adresse")),
+                ("body", models.TextField(verbose_name="Message")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "En attente"),
+                            ("sent", "Envoyé"),
+                            ("failed", "Échec"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Statut",
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Erreur")),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Envoyé le"
+                    ),
+                ),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="core.remindercampaign",
+                        verbose_name="Campagne",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="reminder_deliveries",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Destinataire",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Envoi de rappel",
+                "verbose_name_plural": "Envois de rappel",
+                "ordering": ["campaign", "pk"],
+            },
+        ),
+    ]
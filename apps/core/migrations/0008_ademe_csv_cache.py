@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_remindercampaign"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ademeconfiguration",
+            name="csv_etag",
+            field=models.CharField(
+                blank=True,
+                help_text="En-tête ETag renvoyé par le serveur lors du dernier import",
+                max_length=200,
+                verbose_name="ETag du CSV",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ademeconfiguration",
+            name="csv_last_modified",
+            field=models.CharField(
+                blank=True,
+                help_text="En-tête Last-Modified renvoyé par le serveur lors du dernier import",
+                max_length=100,
+                verbose_name="Last-Modified du CSV",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ademeconfiguration",
+            name="csv_sha256",
+            field=models.CharField(
+                blank=True,
+                help_text="Empreinte du fichier importé (nom du fichier dans le cache local)",
+                max_length=64,
+                verbose_name="Empreinte SHA-256 du CSV",
+            ),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_ademe_csv_cache"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmissionFactorVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "factor_model",
+                    models.CharField(
+                        choices=[
+                            ("vehicles.EmissionFactor", "Véhicules"),
+                            ("batiment.BuildingEmissionFactor", "Bâtiments"),
+                            ("alimentation.FoodEmissionFactor", "Alimentation"),
+                            ("purchases.PurchaseEmissionFactor", "Achats"),
+                            ("numerique.NumeriqueEmissionFactor", "Numérique"),
+                        ],
+                        max_length=50,
+                        verbose_name="Modèle de facteurs",
+                    ),
+                ),
+                (
+                    "factor_key",
+                    models.CharField(
+                        help_text="Nom (véhicules), type d'énergie (bâtiments), code (alimentation, achats) ou type d'équipement (numérique)",
+                        max_length=100,
+                        verbose_name="Facteur",
+                    ),
+                ),
+                (
+                    "value_field",
+                    models.CharField(
+                        blank=True,
+                        help_text="Valeur remplacée (vide = valeur principale ; numérique : fabrication_kg_co2 ou conso_kwh_an)",
+                        max_length=50,
+                        verbose_name="Champ",
+                    ),
+                ),
+                (
+                    "value",
+                    models.DecimalField(
+                        decimal_places=6, max_digits=14, verbose_name="Valeur"
+                    ),
+                ),
+                (
+                    "valid_from_year",
+                    models.IntegerField(verbose_name="Valide à partir de (année)"),
+                ),
+                (
+                    "valid_to_year",
+                    models.IntegerField(
+                        blank=True,
+                        help_text="Vide = sans limite",
+                        null=True,
+                        verbose_name="Valide jusqu'à (année incluse)",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(blank=True, max_length=200, verbose_name="Source"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Créé le"),
+                ),
+            ],
+            options={
+                "verbose_name": "Version de facteur d'émission",
+                "verbose_name_plural": "Historique des facteurs d'émission",
+                "ordering": ["factor_model", "factor_key", "valid_from_year"],
+            },
+        ),
+    ]
@@ -75,6 +75,28 @@ class ADEMEConfiguration(models.Model):
         help_text="Version du CSV ADEME actuellement utilisée (ex: V23.6)"
     )
     
+    # Cache HTTP du CSV (renseignés après chaque import réussi)
+    csv_etag = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="ETag du CSV",
+        help_text="En-tête ETag renvoyé par le serveur lors du dernier import"
+    )
+    
+    csv_last_modified = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="Last-Modified du CSV",
+        help_text="En-tête Last-Modified renvoyé par le serveur lors du dernier import"
+    )
+    
+    csv_sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name="Empreinte SHA-256 du CSV",
+        help_text="Empreinte du fichier importé (nom du fichier dans le cache local)"
+    )
+    
     # Email de notification
     notification_email = models.EmailField(
         blank=True,
@@ -95,6 +117,7 @@ class ADEMEConfiguration(models.Model):
         ('buildings', 'Bâtiments & Énergies'),
         ('food', 'Alimentation'),
         ('purchases', 'Achats'),
+        ('numerique', 'Numérique'),
     ]
     
     active_sectors = models.JSONField(
@@ -204,3 +227,314 @@ class ReminderTemplate(models.Model):
     def get_template(cls):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
+
+
+class EmissionRollup(models.Model):
+    """
+    Totaux d'émissions pré-agrégés par (secteur, année, groupe, sous-catégorie).
+    Maintenu à chaque écriture par les signaux de apps.core.signals,
+    reconstructible via `python manage.py rebuild_rollups`.
+    """
+    SECTOR_CHOICES = [
+        ('vehicles', 'Véhicules'),
+        ('buildings', 'Bâtiments'),
+        ('food', 'Alimentation'),
+        ('purchases', 'Achats'),
+        ('numerique', 'Numérique'),
+    ]
+
+    sector = models.CharField(max_length=20, choices=SECTOR_CHOICES, verbose_name="Secteur")
+    year = models.IntegerField(verbose_name="Année")
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name="Groupe"
+    )
+    subcategory = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name="Sous-catégorie",
+        help_text="Catégorie d'achat, type d'équipement, méthode de calcul... (vide si non applicable)"
+    )
+    total_co2_kg = models.DecimalField(max_digits=16, decimal_places=3, default=0, verbose_name="Total CO₂ (kg)")
+    entry_count = models.PositiveIntegerField(default=0, verbose_name="Nombre de saisies")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Agrégat d'émissions"
+        verbose_name_plural = "Agrégats d'émissions"
+        ordering = ['sector', 'year']
+        unique_together = [['sector', 'year', 'group', 'subcategory']]
+
+    def __str__(self):
+        return f"{self.get_sector_display()} {self.year} - {self.subcategory or 'total'} ({self.total_co2_kg} kgCO2e)"
+
+
+class DataVersion(models.Model):
+    """
+    Compteur de version des données (singleton).
+    Incrémenté à chaque écriture d'une saisie ou d'un facteur : sert d'ETag
+    aux API JSON et de clé de cache pour leurs réponses.
+    """
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Version")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Dernière modification")
+
+    class Meta:
+        verbose_name = "Version des données"
+        verbose_name_plural = "Version des données"
+
+    def __str__(self):
+        return f"Données v{self.version} ({self.updated_at})"
+
+    def save(self, *args, **kwargs):
+        self.pk = 1
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def get_current(cls):
+        obj, created = cls.objects.get_or_create(pk=1)
+        return obj
+
+    @classmethod
+    def bump(cls):
+        """Incrémente la version de façon atomique (une requête UPDATE)."""
+        from django.db.models import F
+        from django.utils import timezone
+
+        updated = cls.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now())
+        if not updated:
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
+
+
+class ExportJob(models.Model):
+    """
+    Export généré en tâche de fond (commande run_export_jobs).
+    Le fichier produit est réutilisé tant que les données n'ont pas changé
+    (même type, même périmètre, même DataVersion).
+    """
+    KIND_CHOICES = [
+        ('statistics_xlsx', 'Statistiques (Excel)'),
+        ('data_csv', 'Données (CSV)'),
+        ('data_xlsx', 'Données (Excel)'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'En attente'),
+        (STATUS_RUNNING, 'En cours'),
+        (STATUS_DONE, 'Terminé'),
+        (STATUS_FAILED, 'Échec'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES, verbose_name="Type d'export")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Statut")
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="Progression (%)")
+
+    requested_by = models.ForeignKey(
+        'auth.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Demandé par"
+    )
+    scope = models.CharField(
+        max_length=200,
+        default='all',
+        verbose_name="Périmètre",
+        help_text="'all' (vue globale) ou 'groups:<ids>' pour un export limité aux groupes"
+    )
+    data_version = models.PositiveBigIntegerField(default=0, verbose_name="Version des données")
+
+    file = models.FileField(upload_to='exports/', blank=True, verbose_name="Fichier")
+    error = models.TextField(blank=True, verbose_name="Erreur")
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créé le")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Démarré le")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Terminé le")
+
+    class Meta:
+        verbose_name = "Export en tâche de fond"
+        verbose_name_plural = "Exports en tâche de fond"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def group_ids(self):
+        """Groupes du périmètre (None = vue globale)."""
+        if not self.scope.startswith('groups:'):
+            return None
+        ids = self.scope.split(':', 1)[1]
+        return [int(i) for i in ids.split(',') if i]
+
+
+class ReminderCampaign(models.Model):
+    """
+    Envoi groupé d'un email de rappel.
+    Les corps personnalisés sont rendus à la création (ReminderDelivery),
+    l'envoi se fait hors du cycle requête/réponse (voir apps.core.services.reminders).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'En attente'),
+        (STATUS_RUNNING, 'En cours'),
+        (STATUS_DONE, 'Terminé'),
+    ]
+
+    subject = models.CharField(max_length=200, verbose_name="Sujet")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Statut")
+    created_by = models.ForeignKey(
+        'auth.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reminder_campaigns',
+        verbose_name="Envoyé par"
+    )
+    sent_count = models.PositiveIntegerField(default=0, verbose_name="Envoyés")
+    failed_count = models.PositiveIntegerField(default=0, verbose_name="Échecs")
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créé le")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Démarré le")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Terminé le")
+
+    class Meta:
+        verbose_name = "Campagne de rappel"
+        verbose_name_plural = "Campagnes de rappel"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.subject} ({self.created_at:%d/%m/%Y %H:%M})" if self.created_at else self.subject
+
+
+class ReminderDelivery(models.Model):
+    """
+    Statut d'envoi d'un rappel pour un destinataire.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'En attente'),
+        (STATUS_SENT, 'Envoyé'),
+        (STATUS_FAILED, 'Échec'),
+    ]
+
+    campaign = models.ForeignKey(
+        ReminderCampaign,
+        on_delete=models.CASCADE,
+        related_name='deliveries',
+        verbose_name="Campagne"
+    )
+    user = models.ForeignKey(
+        'auth.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reminder_deliveries',
+        verbose_name="Destinataire"
+    )
+    email = models.EmailField(verbose_name="Adresse")
+    body = models.TextField(verbose_name="Message")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Statut")
+    error = models.TextField(blank=True, verbose_name="Erreur")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Envoyé le")
+
+    class Meta:
+        verbose_name = "Envoi de rappel"
+        verbose_name_plural = "Envois de rappel"
+        ordering = ['campaign', 'pk']
+
+    def __str__(self):
+        return f"{self.email} ({self.get_status_display()})"
+
+
+class EmissionFactorVersion(models.Model):
+    """
+    Historique des facteurs d'émission : valeur d'un facteur sur une plage d'années.
+    Une saisie est calculée avec la version couvrant son année, sinon avec la
+    valeur courante du modèle de facteurs. Chaque création / modification /
+    suppression recalcule uniquement les saisies des années concernées.
+    """
+    FACTOR_MODEL_CHOICES = [
+        ('vehicles.EmissionFactor', 'Véhicules'),
+        ('batiment.BuildingEmissionFactor', 'Bâtiments'),
+        ('alimentation.FoodEmissionFactor', 'Alimentation'),
+        ('purchases.PurchaseEmissionFactor', 'Achats'),
+        ('numerique.NumeriqueEmissionFactor', 'Numérique'),
+    ]
+
+    factor_model = models.CharField(max_length=50, choices=FACTOR_MODEL_CHOICES, verbose_name="Modèle de facteurs")
+    factor_key = models.CharField(
+        max_length=100,
+        verbose_name="Facteur",
+        help_text="Nom (véhicules), type d'énergie (bâtiments), code (alimentation, achats) ou type d'équipement (numérique)"
+    )
+    value_field = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="Champ",
+        help_text="Valeur remplacée (vide = valeur principale ; numérique : fabrication_kg_co2 ou conso_kwh_an)"
+    )
+    value = models.DecimalField(max_digits=14, decimal_places=6, verbose_name="Valeur")
+    valid_from_year = models.IntegerField(verbose_name="Valide à partir de (année)")
+    valid_to_year = models.IntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Valide jusqu'à (année incluse)",
+        help_text="Vide = sans limite"
+    )
+    source = models.CharField(max_length=200, blank=True, verbose_name="Source")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créé le")
+
+    class Meta:
+        verbose_name = "Version de facteur d'émission"
+        verbose_name_plural = "Historique des facteurs d'émission"
+        ordering = ['factor_model', 'factor_key', 'valid_from_year']
+
+    def __str__(self):
+        end = self.valid_to_year if self.valid_to_year is not None else '…'
+        return f"{self.factor_key} {self.valid_from_year}-{end} : {self.value}"
+
+    def covers(self, year):
+        """La version s'applique-t-elle à une année de saisie ?"""
+        if year is None or year < self.valid_from_year:
+            return False
+        return self.valid_to_year is None or year <= self.valid_to_year
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from apps.core.services.factor_registry import FACTOR_VALUE_FIELDS
+
+        fields = FACTOR_VALUE_FIELDS.get(self.factor_model, [])
+        if self.value_field and self.value_field not in fields:
+            raise ValidationError({'value_field': f"Champ inconnu pour ce modèle (choix : {', '.join(fields)})"})
+        if self.valid_to_year is not None and self.valid_from_year is not None and self.valid_to_year < self.valid_from_year:
+            raise ValidationError({'valid_to_year': "L'année de fin précède l'année de début"})
+
+        # Pas de chevauchement entre versions d'un même facteur
+        value_field = self.value_field or (fields[0] if fields else '')
+        others = EmissionFactorVersion.objects.filter(
+            factor_model=self.factor_model, factor_key=self.factor_key, value_field=value_field
+        ).exclude(pk=self.pk)
+        if self.valid_to_year is not None:
+            others = others.filter(valid_from_year__lte=self.valid_to_year)
+        others = others.filter(models.Q(valid_to_year__isnull=True) | models.Q(valid_to_year__gte=self.valid_from_year or 0))
+        if others.exists():
+            raise ValidationError(f"Une version de ce facteur couvre déjà une partie de la plage : {others.first()}")
+
+    def save(self, *args, **kwargs):
+        from apps.core.services.factor_registry import FACTOR_VALUE_FIELDS
+
+        if not self.value_field:
+            self.value_field = FACTOR_VALUE_FIELDS[self.factor_model][0]
+        super().save(*args, **kwargs)
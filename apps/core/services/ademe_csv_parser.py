@@ -4,15 +4,145 @@ Télécharge et extrait les facteurs d'émission pour tous les secteurs.
 """
 
 import requests
+import codecs
 import csv
+import hashlib
+import itertools
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal, InvalidOperation
 from io import StringIO
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class KeywordMatcher:
+    """
+    Critères de ESSENTIAL_FACTORS compilés une fois pour toutes.
+    
+    - Mots-clés mis en minuscules une seule fois.
+    - Index inversé : chaque critère a un mot-clé « ancre » (le plus long de ses
+      all_keywords), rangé sous son mot le plus long (clé).
+      Le nom est découpé une fois en mots ; pour chaque mot, les clés qu'il contient
+      sont calculées à la première rencontre puis mémorisées (le vocabulaire de la
+      Base Carbone est réduit), de même que les clés de chaque nom. Seuls les critères
+      des clés trouvées sont examinés : le coût par ligne ne dépend plus du nombre de
+      critères.
+    - Pré-filtre par unité : le plan (clé -> critères candidats) est calculé une fois
+      par libellé d'unité ; une ligne dont l'unité ne correspond à aucun critère est
+      écartée sans examiner son nom.
+    
+    Le résultat est identique à la recherche de sous-chaînes critère par critère
+    (premier critère correspondant pour chaque secteur).
+    """
+    
+    # Noms mémorisés au plus (la Base Carbone compte quelques dizaines de milliers de noms)
+    NAME_CACHE_SIZE = 100_000
+    
+    def __init__(self, essential_factors: Dict[str, Dict[str, Dict]]):
+        self.criteria = []
+        for sector, factors in essential_factors.items():
+            for factor_key, criteria in factors.items():
+                all_keywords = sorted({kw.lower() for kw in criteria['all_keywords']}, key=len, reverse=True)
+                anchor = all_keywords[0] if all_keywords else ''
+                self.criteria.append((
+                    len(self.criteria),  # rang (ordre de déclaration)
+                    sector,
+                    factor_key,
+                    criteria['unit'],
+                    anchor,
+                    tuple(all_keywords[1:]),
+                    tuple(kw.lower() for kw in criteria.get('any_of', [])),
+                    tuple(kw.lower() for kw in criteria['exclude']),
+                    criteria['max_results'],
+                ))
+        self.units = sorted({c[3] for c in self.criteria})
+        # Une ancre présente dans le nom contient sa clé, et la clé (sans espace) tient
+        # dans un seul mot du nom : condition nécessaire, l'ancre est vérifiée ensuite
+        self._keys = sorted({self._key(c[4]) for c in self.criteria if c[4]})
+        self._token_keys = {}
+        self._name_keys = {}
+        self._plans = {}
+    
+    @staticmethod
+    def _key(anchor: str) -> str:
+        return max(anchor.split(), key=len)
+    
+    def _plan_for_unit(self, unit: str):
+        """Critères candidats pour un libellé d'unité (mémorisé) : (clé -> critères, critères sans ancre)."""
+        plan = self._plans.get(unit)
+        if plan is None:
+            unit_lower = unit.lower()
+            by_key, always = {}, []
+            for criterion in self.criteria:
+                if criterion[3] in unit_lower:
+                    if criterion[4]:
+                        by_key.setdefault(self._key(criterion[4]), []).append(criterion)
+                    else:
+                        always.append(criterion)
+            plan = ({key: tuple(criteria) for key, criteria in by_key.items()}, tuple(always))
+            self._plans[unit] = plan
+        return plan
+    
+    def _keys_in(self, name_lower: str) -> frozenset:
+        """
+        Clés contenues dans les mots du nom. Mémorisées par nom (un même nom revient
+        pour plusieurs unités et localisations) et par mot : un mot encore jamais vu
+        est comparé une fois aux clés, un nom déjà vu ne coûte qu'une recherche.
+        """
+        found = self._name_keys.get(name_lower)
+        if found is None:
+            token_keys = self._token_keys
+            keys = set()
+            for token in name_lower.split():
+                token_found = token_keys.get(token)
+                if token_found is None:
+                    token_found = token_keys[token] = tuple(key for key in self._keys if key in token)
+                keys.update(token_found)
+            if len(self._name_keys) >= self.NAME_CACHE_SIZE:
+                self._name_keys.clear()
+            found = self._name_keys[name_lower] = frozenset(keys)
+        return found
+    
+    def classify(self, name: str, unit: str, sectors: Iterable[str]) -> Dict[str, Tuple[str, int]]:
+        """
+        Classe un facteur pour tous les secteurs demandés en un seul passage.
+        
+        Returns:
+            Dictionnaire {secteur: (factor_key, max_results)} des secteurs correspondants
+        """
+        by_key, always = self._plan_for_unit(unit)
+        if not by_key and not always:
+            return {}
+        
+        name_lower = name.lower()
+        candidates = [c for key in self._keys_in(name_lower) if key in by_key for c in by_key[key]]
+        candidates.extend(always)
+        if not candidates:
+            return {}
+        if len(candidates) > 1:
+            candidates.sort()
+        
+        result = {}
+        for _rank, sector, factor_key, _unit, anchor, all_keywords, any_of, exclude, max_results in candidates:
+            if sector in result or sector not in sectors:
+                continue
+            if anchor not in name_lower:
+                continue
+            if not all(kw in name_lower for kw in all_keywords):
+                continue
+            if any_of and not any(kw in name_lower for kw in any_of):
+                continue
+            if any(kw in name_lower for kw in exclude):
+                continue
+            result[sector] = (factor_key, max_results)
+        return result
+
+
 class ADEMECSVParser:
     """
     Parser pour le fichier CSV ADEME Base Carbone.
@@ -48,9 +178,144 @@ class ADEMECSVParser:
                 'unit': 'km',
                 'max_results': 1
             }
+        },
+        'buildings': {
+            'electricite': {
+                'all_keywords': ['mix moyen'],  # "Electricité - mix moyen - consommation"
+                'any_of': ['électricité', 'electricité'],
+                'exclude': ['véhicule', 'recharge'],
+                'unit': 'kwh',
+                'max_results': 1
+            },
+            'gaz_naturel': {
+                'all_keywords': ['gaz naturel'],
+                'exclude': ['liquéfié', 'gnv', 'véhicule', 'amont'],
+                'unit': 'kwh',
+                'max_results': 1
+            },
+            'reseau_chaleur': {
+                'all_keywords': ['réseau de chaleur'],
+                'exclude': [],
+                'unit': 'kwh',
+                'max_results': 1
+            },
+            'reseau_froid': {
+                'all_keywords': ['réseau de froid'],
+                'exclude': [],
+                'unit': 'kwh',
+                'max_results': 1
+            }
+        },
+        'food': {
+            'repas_boeuf': {
+                'all_keywords': ['repas'],
+                'any_of': ['bœuf', 'boeuf'],
+                'exclude': ['végétal', 'végétarien'],
+                'unit': 'repas',
+                'max_results': 1
+            },
+            'repas_porc': {
+                'all_keywords': ['repas', 'porc'],
+                'exclude': ['végétal'],
+                'unit': 'repas',
+                'max_results': 1
+            },
+            'repas_poulet': {
+                'all_keywords': ['repas', 'poulet'],
+                'exclude': ['végétal'],
+                'unit': 'repas',
+                'max_results': 1
+            },
+            'repas_vegetarien': {
+                'all_keywords': ['repas', 'végétarien'],
+                'exclude': [],
+                'unit': 'repas',
+                'max_results': 1
+            }
+        },
+        'purchases': {
+            # Ratios monétaires (kgCO2e/k€ HT)
+            'restauration': {
+                'all_keywords': ['restauration'],
+                'exclude': [],
+                'unit': 'k€',
+                'max_results': 1
+            },
+            'assurance': {
+                'all_keywords': ['assurance'],
+                'exclude': [],
+                'unit': 'k€',
+                'max_results': 1
+            },
+            'telecommunications': {
+                'all_keywords': ['télécommunications'],
+                'exclude': [],
+                'unit': 'k€',
+                'max_results': 1
+            },
+            'nettoyage': {
+                'all_keywords': ['nettoyage'],
+                'exclude': [],
+                'unit': 'k€',
+                'max_results': 1
+            },
+            'construction': {
+                'all_keywords': ['construction'],
+                'exclude': [],
+                'unit': 'k€',
+                'max_results': 1
+            },
+            'transport': {
+                'all_keywords': ['transport'],
+                'exclude': [],
+                'unit': 'k€',
+                'max_results': 1
+            },
+            'location': {
+                'all_keywords': ['location'],
+                'exclude': [],
+                'unit': 'k€',
+                'max_results': 1
+            }
+        },
+        'numerique': {
+            # Empreinte de fabrication par équipement
+            'ordinateur_portable': {
+                'all_keywords': ['ordinateur portable'],
+                'exclude': [],
+                'unit': 'unité',
+                'max_results': 1
+            },
+            'smartphone': {
+                'all_keywords': ['smartphone'],
+                'exclude': [],
+                'unit': 'unité',
+                'max_results': 1
+            },
+            'ecran': {
+                'all_keywords': ['écran'],
+                'exclude': ['ordinateur', 'smartphone'],
+                'unit': 'unité',
+                'max_results': 1
+            },
+            'imprimante': {
+                'all_keywords': ['imprimante', 'laser'],
+                'exclude': [],
+                'unit': 'unité',
+                'max_results': 1
+            }
         }
     }
     
+    _matcher = None
+    
+    @classmethod
+    def get_matcher(cls) -> KeywordMatcher:
+        """Critères compilés (construits une seule fois par classe)."""
+        if cls.__dict__.get('_matcher') is None:
+            cls._matcher = KeywordMatcher(cls.ESSENTIAL_FACTORS)
+        return cls._matcher
+    
     def __init__(self, csv_url: str):
         """
         Initialise le parser avec l'URL du CSV.
@@ -61,13 +326,18 @@ class ADEMECSVParser:
         self.csv_url = csv_url
         self.timeout = 30  # secondes
         self.max_size = 50 * 1024 * 1024  # 50 MB
+        self.chunk_size = 64 * 1024  # octets lus à la fois en streaming
+        # ADEME publie en latin-1 / Windows-1252 : cp1252 décode en plus € et œ (0x80, 0x9c)
+        self.encoding = 'cp1252'
     
-    def download_csv(self) -> str:
+    def iter_csv_lines(self) -> Iterator[str]:
         """
-        Télécharge le fichier CSV depuis l'URL configurée.
+        Télécharge le CSV en streaming et le restitue ligne par ligne.
+        Les paquets reçus sont décodés au fil de l'eau : seule la ligne
+        en cours est gardée en mémoire, quelle que soit la taille du fichier.
         
-        Returns:
-            Contenu du CSV en string
+        Yields:
+            Lignes du CSV (avec leur fin de ligne, pour csv.reader)
             
         Raises:
             requests.RequestException: En cas d'erreur de téléchargement
@@ -76,69 +346,262 @@ class ADEMECSVParser:
         logger.info(f"Téléchargement du CSV depuis {self.csv_url}")
         
         try:
-            response = requests.get(
-                self.csv_url,
-                timeout=self.timeout,
-                stream=True
-            )
-            response.raise_for_status()
-            
-            # Vérifier la taille
-            content_length = response.headers.get('Content-Length')
-            if content_length and int(content_length) > self.max_size:
-                raise ValueError(f"Fichier trop volumineux: {int(content_length) / 1024 / 1024:.1f} MB")
-            
-            # Télécharger le contenu
-            content = response.content.decode('latin-1')  # ADEME utilise latin-1
-            
-            logger.info(f"CSV téléchargé: {len(content)} caractères")
-            return content
+            with requests.get(self.csv_url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                
+                decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+                pending = ''
+                
+                for chunk in self._iter_chunks(response):
+                    # Découpage sur '\n' uniquement (str.splitlines couperait aussi sur d'autres séparateurs Unicode)
+                    lines = (pending + decoder.decode(chunk)).split('\n')
+                    pending = lines.pop()
+                    for line in lines:
+                        yield line + '\n'
+                
+                pending += decoder.decode(b'', final=True)
+                if pending:
+                    yield pending
+                
+        except requests.RequestException as e:
+            logger.error(f"Erreur lors du téléchargement: {e}")
+            raise
+    
+    def _iter_chunks(self, response) -> Iterator[bytes]:
+        """Paquets bruts de la réponse, avec contrôle de la taille maximale."""
+        # Vérifier la taille annoncée
+        content_length = response.headers.get('Content-Length')
+        if content_length and int(content_length) > self.max_size:
+            raise ValueError(f"Fichier trop volumineux: {int(content_length) / 1024 / 1024:.1f} MB")
+        
+        received = 0
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            received += len(chunk)
+            if received > self.max_size:
+                raise ValueError(f"Fichier trop volumineux: plus de {self.max_size / 1024 / 1024:.0f} MB")
+            yield chunk
+        
+        logger.info(f"CSV téléchargé: {received} octets")
+    
+    def get_cache_dir(self, cache_root) -> Path:
+        """Répertoire de cache propre à l'URL du CSV."""
+        url_key = hashlib.sha256(self.csv_url.encode('utf-8')).hexdigest()[:16]
+        return Path(cache_root) / url_key
+    
+    def download_to_cache(self, cache_root, etag: str = '', last_modified: str = '', known_sha256: str = '') -> Dict:
+        """
+        Télécharge le CSV dans un cache local adressé par contenu
+        (<cache_root>/<hash de l'URL>/<sha256 du contenu>.csv).
+        
+        Si le fichier `known_sha256` est en cache, la requête est conditionnelle
+        (If-None-Match / If-Modified-Since) : une réponse 304 évite tout téléchargement.
+        
+        Args:
+            cache_root: Répertoire racine du cache
+            etag, last_modified: Valeurs renvoyées par le serveur lors du dernier import
+            known_sha256: Empreinte du fichier du dernier import
             
+        Returns:
+            Dictionnaire {status, path, sha256, etag, last_modified} où status vaut
+            'not_modified' (304), 'unchanged' (contenu identique) ou 'downloaded'
+        """
+        cache_dir = self.get_cache_dir(cache_root)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        known_path = cache_dir / f"{known_sha256}.csv" if known_sha256 else None
+        
+        headers = {}
+        if known_path and known_path.exists():
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        logger.info(f"Téléchargement du CSV depuis {self.csv_url}" + (" (conditionnel)" if headers else ""))
+        
+        try:
+            with requests.get(self.csv_url, timeout=self.timeout, stream=True, headers=headers) as response:
+                if response.status_code == 304:
+                    logger.info("CSV inchangé (304 Not Modified)")
+                    return {
+                        'status': 'not_modified',
+                        'path': known_path,
+                        'sha256': known_sha256,
+                        'etag': etag,
+                        'last_modified': last_modified,
+                    }
+                response.raise_for_status()
+                
+                # Écriture dans un fichier temporaire du cache, empreinte calculée au fil de l'eau
+                digest = hashlib.sha256()
+                handle, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.part')
+                try:
+                    with os.fdopen(handle, 'wb') as tmp_file:
+                        for chunk in self._iter_chunks(response):
+                            digest.update(chunk)
+                            tmp_file.write(chunk)
+                    sha256 = digest.hexdigest()
+                    path = cache_dir / f"{sha256}.csv"
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+                
+                new_etag = response.headers.get('ETag', '')
+                new_last_modified = response.headers.get('Last-Modified', '')
+        
         except requests.RequestException as e:
             logger.error(f"Erreur lors du téléchargement: {e}")
             raise
+        
+        # Un seul fichier conservé par URL
+        for old_file in cache_dir.glob('*.csv'):
+            if old_file != path:
+                old_file.unlink()
+        
+        return {
+            'status': 'unchanged' if sha256 == known_sha256 else 'downloaded',
+            'path': path,
+            'sha256': sha256,
+            'etag': new_etag,
+            'last_modified': new_last_modified,
+        }
     
-    def parse_csv(self, csv_content: str, sectors: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+    def download_csv(self) -> str:
         """
-        Parse le contenu CSV et extrait UNIQUEMENT les facteurs essentiels par secteur.
+        Télécharge le fichier CSV complet en mémoire.
+        Préférer download_and_parse(), qui ne garde jamais le fichier entier en mémoire.
+        
+        Returns:
+            Contenu du CSV en string
+        """
+        return ''.join(self.iter_csv_lines())
+    
+    def download_and_parse(self, sectors: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Télécharge et parse le CSV en streaming (mémoire constante).
         
         Args:
-            csv_content: Contenu du CSV
             sectors: Liste des secteurs à extraire (None = tous)
             
         Returns:
             Dictionnaire {secteur: [facteurs]}
         """
+        return self.parse_lines(self.iter_csv_lines(), sectors=sectors)
+    
+    def parse_file(self, path, sectors: Optional[List[str]] = None, workers: int = 1) -> Dict[str, List[Dict]]:
+        """
+        Parse un fichier CSV local (lecture ligne par ligne).
+        
+        Args:
+            path: Chemin du fichier CSV ADEME
+            sectors: Liste des secteurs à extraire (None = tous)
+            workers: Nombre de processus ; au-delà de 1, le fichier est découpé en
+                plages d'octets traitées en parallèle (résultat identique au mode série)
+            
+        Returns:
+            Dictionnaire {secteur: [facteurs]}
+        """
+        logger.info(f"Lecture du CSV local {path}")
+        if workers > 1:
+            return self._parse_file_parallel(path, sectors, workers)
+        with open(path, encoding=self.encoding, errors='replace', newline='') as csv_file:
+            return self.parse_lines(csv_file, sectors=sectors)
+    
+    def _parse_file_parallel(self, path, sectors: Optional[List[str]], workers: int) -> Dict[str, List[Dict]]:
+        """
+        Découpe le fichier en plages d'octets alignées sur des fins d'enregistrement,
+        les fait classer par un ProcessPoolExecutor puis fusionne les correspondances
+        dans l'ordre du fichier (max_results appliqué comme en série).
+        """
         if sectors is None:
             sectors = list(self.ESSENTIAL_FACTORS.keys())
         
-        logger.info(f"Parsing CSV pour secteurs: {sectors}")
+        header_end, boundaries = _record_boundaries(path, parts=workers * PARALLEL_CHUNKS_PER_WORKER)
+        with open(path, 'rb') as csv_file:
+            header = csv_file.read(header_end).decode(self.encoding, errors='replace')
+        fieldnames = next(csv.reader(StringIO(header), delimiter=';'), [])
         
-        result = {sector: [] for sector in sectors}
+        chunks = [
+            (type(self), str(path), start, end, fieldnames, sectors)
+            for start, end in zip(boundaries, boundaries[1:])
+        ]
+        logger.info(f"Parsing parallèle: {len(chunks)} plage(s), {workers} processus")
         
-        # Tracker pour limiter le nombre de résultats par facteur
-        found_counts = {sector: {} for sector in sectors}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() restitue les résultats dans l'ordre des plages
+            matches = itertools.chain.from_iterable(executor.map(_classify_chunk, chunks))
+            return self._collect_matches(matches, sectors)
+    
+    def parse_csv(self, csv_content: str, sectors: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Parse le contenu CSV et extrait UNIQUEMENT les facteurs essentiels par secteur.
+        
+        Args:
+            csv_content: Contenu du CSV
+            sectors: Liste des secteurs à extraire (None = tous)
+            
+        Returns:
+            Dictionnaire {secteur: [facteurs]}
+        """
+        return self.parse_lines(StringIO(csv_content), sectors=sectors)
+    
+    def parse_lines(self, lines: Iterable[str], sectors: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Parse le CSV fourni ligne par ligne (fichier ouvert, flux téléchargé...)
+        et extrait UNIQUEMENT les facteurs essentiels par secteur.
+        
+        Args:
+            lines: Itérable de lignes CSV
+            sectors: Liste des secteurs à extraire (None = tous)
+            
+        Returns:
+            Dictionnaire {secteur: [facteurs]}
+        """
+        if sectors is None:
+            sectors = list(self.ESSENTIAL_FACTORS.keys())
         
         # Parser le CSV
-        csv_reader = csv.DictReader(StringIO(csv_content), delimiter=';')
+        csv_reader = csv.DictReader(lines, delimiter=';')
+        return self._collect_matches(self._iter_matches(csv_reader, sectors), sectors)
+    
+    def _iter_matches(self, rows: Iterable[Dict[str, str]], sectors: List[str]) -> Iterator[Tuple[Dict, Dict]]:
+        """
+        Extrait et classe chaque ligne.
         
-        for row in csv_reader:
+        Yields:
+            (facteur, {secteur: (factor_key, max_results)}) pour les lignes correspondant à au moins un secteur
+        """
+        matcher = self.get_matcher()
+        for row in rows:
             # Extraire les données pertinentes
             factor_data = self._extract_factor_from_row(row)
             if not factor_data:
                 continue
             
-            # Affecter au bon secteur
-            for sector in sectors:
-                match_result = self._matches_sector(factor_data, sector)
-                if match_result:
-                    factor_key, max_results = match_result
-                    
-                    # Vérifier si on a déjà atteint le max pour ce facteur
-                    current_count = found_counts[sector].get(factor_key, 0)
-                    if current_count < max_results:
-                        result[sector].append(factor_data)
-                        found_counts[sector][factor_key] = current_count + 1
+            # Affecter au bon secteur (un seul passage sur le nom pour tous les secteurs)
+            matches = matcher.classify(factor_data['name'], factor_data['unit'], sectors)
+            if matches:
+                yield factor_data, matches
+    
+    def _collect_matches(self, matches: Iterable[Tuple[Dict, Dict]], sectors: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Regroupe les correspondances par secteur, dans l'ordre du fichier,
+        en respectant max_results pour chaque facteur.
+        """
+        logger.info(f"Parsing CSV pour secteurs: {sectors}")
+        
+        result = {sector: [] for sector in sectors}
+        
+        # Tracker pour limiter le nombre de résultats par facteur
+        found_counts = {sector: {} for sector in sectors}
+        
+        for factor_data, sector_matches in matches:
+            for sector, (factor_key, max_results) in sector_matches.items():
+                # Vérifier si on a déjà atteint le max pour ce facteur
+                current_count = found_counts[sector].get(factor_key, 0)
+                if current_count < max_results:
+                    result[sector].append({**factor_data, 'factor_key': factor_key})
+                    found_counts[sector][factor_key] = current_count + 1
         
         # Logging
         for sector, factors in result.items():
@@ -215,41 +678,8 @@ class ADEMECSVParser:
         if sector not in self.ESSENTIAL_FACTORS:
             return None
         
-        name_lower = factor_data['name'].lower()
-        unit_lower = factor_data['unit'].lower()
-        
-        # Vérifier chaque facteur essentiel
-        for factor_key, criteria in self.ESSENTIAL_FACTORS[sector].items():
-            # Vérifier l'unité
-            if criteria['unit'] not in unit_lower:
-                continue
-            
-            # Vérifier que TOUS les mots-clés sont présents
-            all_keywords_present = all(
-                kw.lower() in name_lower for kw in criteria['all_keywords']
-            )
-            if not all_keywords_present:
-                continue
-            
-            # Vérifier any_of si spécifié (au moins un doit être présent)
-            if 'any_of' in criteria:
-                any_of_present = any(
-                    kw.lower() in name_lower for kw in criteria['any_of']
-                )
-                if not any_of_present:
-                    continue
-            
-            # Vérifier les exclusions
-            has_exclusion = any(
-                excl.lower() in name_lower for excl in criteria['exclude']
-            )
-            if has_exclusion:
-                continue
-            
-            # Toutes les conditions sont remplies
-            return (factor_key, criteria['max_results'])
-        
-        return None
+        matches = self.get_matcher().classify(factor_data['name'], factor_data['unit'], [sector])
+        return matches.get(sector)
     
     def get_factors_for_sector(self, sector: str) -> List[Dict]:
         """
@@ -261,6 +691,77 @@ class ADEMECSVParser:
         Returns:
             Liste des facteurs pour ce secteur
         """
-        csv_content = self.download_csv()
-        result = self.parse_csv(csv_content, sectors=[sector])
+        result = self.download_and_parse(sectors=[sector])
         return result.get(sector, [])
+
+
+# Plages par processus (équilibre la charge si certaines plages sont plus lentes)
+PARALLEL_CHUNKS_PER_WORKER = 4
+BOUNDARY_SCAN_BLOCK = 1024 * 1024
+
+
+def _record_boundaries(path, parts: int) -> Tuple[int, List[int]]:
+    """
+    Calcule des positions de coupure du fichier tombant sur des fins d'enregistrement CSV.
+    Un '\n' ne termine un enregistrement que si le nombre de guillemets lus depuis
+    le début du fichier est pair (sinon il est à l'intérieur d'un champ entre guillemets).
+    Un seul parcours du fichier en octets (comptages faits en C).
+    
+    Returns:
+        (fin de l'en-tête, [début des données, coupures..., taille du fichier])
+    """
+    size = os.path.getsize(path)
+    targets = iter([size * i // parts for i in range(1, parts)])
+    target = next(targets, None)
+    
+    header_end = None
+    boundaries = []
+    quotes = 0
+    offset = 0
+    with open(path, 'rb') as csv_file:
+        while True:
+            block = csv_file.read(BOUNDARY_SCAN_BLOCK)
+            if not block:
+                break
+            position = 0
+            while True:
+                newline = block.find(b'\n', position)
+                if newline == -1:
+                    break
+                quotes += block.count(b'"', position, newline)
+                position = newline + 1
+                if quotes % 2:
+                    continue
+                record_end = offset + position
+                if header_end is None:
+                    header_end = record_end
+                elif target is not None and record_end >= target:
+                    boundaries.append(record_end)
+                    while target is not None and target <= record_end:
+                        target = next(targets, None)
+                if header_end is not None and target is None:
+                    break
+            if header_end is not None and target is None:
+                break
+            quotes += block.count(b'"', position)
+            offset += len(block)
+    
+    if header_end is None:
+        header_end = size
+    boundaries = [header_end] + [b for b in boundaries if header_end < b < size] + [size]
+    return header_end, boundaries
+
+
+def _classify_chunk(args) -> List[Tuple[Dict, Dict]]:
+    """
+    Tâche d'un processus du parsing parallèle : lit une plage d'octets,
+    extrait et classe ses lignes.
+    """
+    parser_class, path, start, end, fieldnames, sectors = args
+    parser = parser_class(csv_url='')
+    with open(path, 'rb') as csv_file:
+        csv_file.seek(start)
+        text = csv_file.read(end - start).decode(parser.encoding, errors='replace')
+    rows = csv.DictReader(StringIO(text, newline=''), fieldnames=fieldnames, delimiter=';')
+    return list(parser._iter_matches(rows, sectors))
+
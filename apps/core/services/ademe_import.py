@@ -0,0 +1,294 @@
+"""
+Import des facteurs ADEME en base.
+Calcule en mémoire le différentiel (créés / mis à jour / inchangés) entre les
+facteurs extraits du CSV et ceux déjà en base, puis l'applique en masse dans
+une seule transaction.
+
+Chaque secteur est associé à une cible (SECTOR_TARGETS) qui indique le modèle
+de facteurs à alimenter et la correspondance entre les critères de
+ADEMECSVParser.ESSENTIAL_FACTORS et les lignes de ce modèle.
+"""
+
+from decimal import Decimal
+from typing import Dict, List, Optional
+import logging
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.services import factor_registry
+from apps.core.services.data_version import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+ADEME_SOURCE = 'ADEME Base Carbone'
+
+
+def generate_subcategory(name: str, sector: str) -> str:
+    """
+    Génère une sous-catégorie unique à partir du nom.
+    """
+    # Nettoyer et normaliser le nom
+    clean_name = name.lower()
+    clean_name = clean_name.replace(' ', '_')
+    clean_name = clean_name.replace('-', '_')
+    clean_name = clean_name.replace('(', '').replace(')', '')
+    clean_name = clean_name.replace('é', 'e').replace('è', 'e')
+    clean_name = clean_name.replace('à', 'a').replace('ô', 'o')
+
+    # Limiter la longueur
+    if len(clean_name) > 50:
+        clean_name = clean_name[:50]
+
+    return f"{sector}_{clean_name}"
+
+
+class FactorTarget:
+    """
+    Cible d'import d'un secteur : modèle de facteurs dont la clé unique `key_field`
+    est déduite du critère ADEME (`mapping` : factor_key -> clé) et dont seul
+    `value_field` (et la source) est mis à jour.
+
+    Args:
+        model_label: Modèle de facteurs ('app.Model')
+        key_field: Champ unique identifiant un facteur
+        value_field: Champ recevant la valeur ADEME
+        mapping: Critère ESSENTIAL_FACTORS -> valeur de key_field
+        label_field: Champ libellé renseigné avec le nom ADEME à la création
+        create: Créer les facteurs absents (sinon mise à jour seulement)
+    """
+
+    def __init__(self, model_label: str, key_field: str, value_field: str, mapping: Dict[str, str],
+                 label_field: Optional[str] = None, create: bool = True):
+        self.model_label = model_label
+        self.key_field = key_field
+        self.value_field = value_field
+        self.mapping = mapping
+        self.label_field = label_field
+        self.create = create
+        self.update_fields = [value_field, 'source']
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def to_value(self, value: Decimal) -> Optional[Decimal]:
+        """
+        Valeur arrondie à la précision du champ (évite de fausses mises à jour),
+        ou None si elle dépasse la capacité du champ.
+        """
+        field = self.model._meta.get_field(self.value_field)
+        value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+        if value.adjusted() + 1 > field.max_digits - field.decimal_places:
+            return None
+        return value
+
+    def get_key(self, sector: str, factor_data: Dict):
+        return self.mapping.get(factor_data.get('factor_key'))
+
+    def load_existing(self, sector: str, keys) -> Dict:
+        return self.model.objects.in_bulk(list(keys), field_name=self.key_field)
+
+    def build(self, sector: str, key, factor_data: Dict, value: Decimal):
+        fields = {self.key_field: key, self.value_field: value, 'source': ADEME_SOURCE}
+        if self.label_field:
+            fields[self.label_field] = factor_data['name'][:self.model._meta.get_field(self.label_field).max_length]
+        return self.model(**fields)
+
+    def get_value(self, obj) -> Decimal:
+        return getattr(obj, self.value_field)
+
+    def apply(self, obj, factor_data: Dict, value: Decimal):
+        setattr(obj, self.value_field, value)
+        obj.source = ADEME_SOURCE
+
+
+class VehicleFactorTarget(FactorTarget):
+    """
+    Facteurs véhicules : une ligne par nom ADEME (sous-catégorie générée depuis le nom),
+    créée si absente, comme historiquement.
+    """
+
+    def __init__(self):
+        super().__init__('vehicles.EmissionFactor', 'subcategory', 'factor_value', mapping={})
+        self.update_fields = ['factor_value', 'name', 'is_active']
+
+    def get_key(self, sector, factor_data):
+        return generate_subcategory(factor_data['name'], sector)
+
+    def load_existing(self, sector, keys):
+        # Le premier selon l'ordre du modèle est retenu, comme le faisait filter(...).first()
+        existing = {}
+        for factor in self.model.objects.filter(category=sector, subcategory__in=list(keys)):
+            existing.setdefault(factor.subcategory, factor)
+        return existing
+
+    def build(self, sector, key, factor_data, value):
+        return self.model(
+            name=factor_data['name'],
+            category=sector,
+            subcategory=key,
+            unit=factor_data['unit'],
+            factor_value=value,
+            source=ADEME_SOURCE,
+            is_active=True
+        )
+
+    def apply(self, obj, factor_data, value):
+        obj.factor_value = value
+        obj.name = factor_data['name']
+        obj.is_active = True
+
+
+# Secteur (ADEMEConfiguration.SECTORS_CHOICES) -> cible d'import.
+# Ajouter un secteur : des critères dans ESSENTIAL_FACTORS et une entrée ici.
+SECTOR_TARGETS = {
+    'vehicles': VehicleFactorTarget(),
+    'buildings': FactorTarget(
+        'batiment.BuildingEmissionFactor', 'type_energie', 'facteur',
+        mapping={
+            'electricite': 'ELEC',
+            'gaz_naturel': 'GAZ',
+            'reseau_chaleur': 'HEAT',
+            'reseau_froid': 'COOL',
+        },
+    ),
+    'food': FactorTarget(
+        'alimentation.FoodEmissionFactor', 'code', 'kg_co2_per_meal',
+        mapping={
+            'repas_boeuf': 'beef',
+            'repas_porc': 'pork',
+            'repas_poulet': 'poultry_fish',
+            'repas_vegetarien': 'vegetarian',
+        },
+        label_field='label',
+    ),
+    'purchases': FactorTarget(
+        'purchases.PurchaseEmissionFactor', 'category_code', 'factor_kg_co2_per_keur',
+        mapping={
+            'restauration': 'food_service',
+            'assurance': 'insurance',
+            'telecommunications': 'it_telecom',
+            'nettoyage': 'cleaning_maintenance',
+            'construction': 'construction',
+            'transport': 'transport',
+            'location': 'equipment_rental',
+        },
+        label_field='category_label',
+    ),
+    # La consommation annuelle n'est pas dans la Base Carbone : mise à jour seulement
+    'numerique': FactorTarget(
+        'numerique.NumeriqueEmissionFactor', 'type_equipement', 'fabrication_kg_co2',
+        mapping={
+            'ordinateur_portable': 'LAPTOP',
+            'smartphone': 'SMARTPHONE',
+            'ecran': 'SCREEN_EXTRA',
+            'imprimante': 'PRINTER',
+        },
+        create=False,
+    ),
+}
+
+
+def compute_factor_diff(sectors_factors: Dict[str, List[Dict]]) -> Dict[str, Dict]:
+    """
+    Compare les facteurs extraits aux facteurs existants (une requête par secteur).
+
+    Args:
+        sectors_factors: {secteur: [facteurs extraits par ADEMECSVParser]}
+
+    Returns:
+        {secteur: {'created': [...], 'updated': [...], 'unchanged': [...], 'skipped': [...]}} ;
+        chaque entrée contient l'objet à écrire ('object') et les valeurs utiles au rapport
+    """
+    diff = {}
+    for sector, factors in sectors_factors.items():
+        target = SECTOR_TARGETS[sector]
+        sector_diff = diff[sector] = {'created': [], 'updated': [], 'unchanged': [], 'skipped': []}
+
+        # Plusieurs lignes peuvent donner la même clé : la dernière l'emporte,
+        # comme avec l'ancien traitement ligne à ligne
+        latest = {}
+        for factor_data in factors:
+            key = target.get_key(sector, factor_data)
+            if key is not None:
+                latest[key] = factor_data
+
+        existing = target.load_existing(sector, latest.keys())
+
+        for key, factor_data in latest.items():
+            current = existing.get(key)
+            value = target.to_value(factor_data['value'])
+            entry = {'key': key, 'name': factor_data['name'], 'value': value}
+
+            if value is None:
+                sector_diff['skipped'].append({**entry, 'value': factor_data['value'], 'reason': 'valeur hors limites'})
+                continue
+
+            if current is None:
+                if not target.create:
+                    sector_diff['skipped'].append({**entry, 'reason': 'facteur absent'})
+                    continue
+                obj = target.build(sector, key, factor_data, value)
+                sector_diff['created'].append({'object': obj, **entry, 'unit': factor_data['unit']})
+            elif target.get_value(current) != value:
+                # Mise à jour si la valeur a changé
+                sector_diff['updated'].append({'object': current, **entry, 'old_value': target.get_value(current)})
+                target.apply(current, factor_data, value)
+            else:
+                sector_diff['unchanged'].append({'object': current, **entry})
+
+    return diff
+
+
+def apply_factor_diff(diff: Dict[str, Dict]):
+    """
+    Applique le différentiel en masse (bulk_create / bulk_update par modèle) dans une
+    seule transaction : les tables de facteurs ne sont jamais laissées à moitié mises à jour.
+    """
+    written = 0
+    with transaction.atomic():
+        for sector, sector_diff in diff.items():
+            target = SECTOR_TARGETS[sector]
+            to_create = [entry['object'] for entry in sector_diff['created']]
+            to_update = [entry['object'] for entry in sector_diff['updated']]
+            if to_create:
+                target.model.objects.bulk_create(to_create, batch_size=500)
+            if to_update:
+                target.model.objects.bulk_update(to_update, target.update_fields, batch_size=500)
+            written += len(to_create) + len(to_update)
+            logger.info(f"Facteurs ADEME '{sector}': {len(to_create)} créé(s), {len(to_update)} mis à jour")
+
+        if written:
+            # bulk_* ne déclenche pas les signaux des facteurs
+            bump_data_version()
+            factor_registry.invalidate()
+
+
+def _json_value(value):
+    return str(value) if isinstance(value, Decimal) else value
+
+
+def diff_report(diff: Dict[str, Dict], source: str = '', dry_run: bool = False) -> Dict:
+    """Rapport JSON du différentiel (sans les objets de modèle)."""
+    sectors = {}
+    totals = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+    for sector, sector_diff in diff.items():
+        sectors[sector] = {
+            status: [
+                {key: _json_value(value) for key, value in entry.items() if key != 'object'}
+                for entry in entries
+            ]
+            for status, entries in sector_diff.items()
+        }
+        for status, entries in sector_diff.items():
+            totals[status] += len(entries)
+
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'source': source,
+        'dry_run': dry_run,
+        'totals': totals,
+        'sectors': sectors,
+    }
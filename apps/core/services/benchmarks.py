@@ -0,0 +1,196 @@
+"""
+Mesure des pages et API les plus sollicitées (dashboard, statistiques, exports,
+listes des secteurs, sensibilisation) sur des jeux de données de taille fixe.
+
+Chaque scénario est une requête GET passée par le client de test Django, avec un
+administrateur (vue globale) ou un agent (vue limitée à son groupe) :
+- latences (premier appel à cache vide, puis percentiles sur les appels suivants),
+- nombre de requêtes SQL par appel,
+- pic mémoire Python d'un appel (tracemalloc).
+
+Les résultats sont comparés à une référence JSON : une hausse des requêtes SQL, ou
+de la latence / mémoire au-delà des tolérances, est signalée comme régression.
+"""
+
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+import django
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.services.load_data import ROWS_PER_GROUP_YEAR, USERNAME_PREFIX, generate_load_data
+
+# Nom -> (nom d'URL, paramètres GET, rôle)
+SCENARIOS = {
+    'dashboard': ('dashboard', '', 'admin'),
+    'dashboard_emissions_api': ('dashboard_emissions_api', '', 'admin'),
+    'statistics_api': ('statistics_data_api', '', 'admin'),
+    'export_data_csv': ('export_data', '', 'admin'),
+    'export_data_xlsx': ('export_data', 'format=xlsx', 'admin'),
+    'export_statistics': ('export_statistics', '', 'admin'),
+    'vehicle_list': ('vehicle_list', '', 'admin'),
+    'batiment_list': ('batiment_list', '', 'admin'),
+    'food_list': ('food_list', '', 'admin'),
+    'purchase_list': ('purchase_list', '', 'admin'),
+    'numerique_list': ('numerique_list', '', 'admin'),
+    'sensibilisation_page': ('sensibilisation_page', '', 'admin'),
+    'agent_dashboard': ('dashboard', '', 'agent'),
+    'agent_export_data_csv': ('export_data', '', 'agent'),
+    'agent_purchase_list': ('purchase_list', '', 'agent'),
+    'agent_purchase_list_year': ('purchase_list', 'year={year}', 'agent'),
+}
+
+# Tailles usuelles des jeux de données (nombre total de saisies)
+SIZE_LABELS = {'1k': 1_000, '100k': 100_000, '1M': 1_000_000}
+
+BENCH_ADMIN = 'bench_admin'
+
+
+def parse_size(value: str) -> int:
+    """'1k', '100k', '1M' ou un entier -> nombre de saisies."""
+    value = value.strip()
+    if value in SIZE_LABELS:
+        return SIZE_LABELS[value]
+    multiplier = 1
+    if value[-1:].lower() == 'k':
+        multiplier, value = 1_000, value[:-1]
+    elif value[-1:].upper() == 'M':
+        multiplier, value = 1_000_000, value[:-1]
+    return int(float(value) * multiplier)
+
+
+def size_label(rows: int) -> str:
+    for label, count in SIZE_LABELS.items():
+        if count == rows:
+            return label
+    return str(rows)
+
+
+def seed_dataset(rows: int, groups: int, years: List[int], seed: int) -> int:
+    """Génère un jeu d'environ `rows` saisies (voir generate_load_data) ; renvoie le nombre réel."""
+    per_scale = sum(ROWS_PER_GROUP_YEAR.values()) * groups * len(years)
+    created = generate_load_data(scale=rows / per_scale, years=years, groups=groups, seed=seed)
+    User.objects.filter(username=BENCH_ADMIN).delete()
+    User.objects.create_superuser(BENCH_ADMIN, f'{BENCH_ADMIN}@demo.com', 'password')
+    return sum(created.values())
+
+
+def _percentile(sorted_values: List[float], percent: int) -> float:
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[percent - 1]
+
+
+def _request(client: Client, url: str) -> int:
+    response = client.get(url)
+    # Réponses en streaming (export CSV) : le contenu est produit à la lecture
+    if response.streaming:
+        for _chunk in response.streaming_content:
+            pass
+    else:
+        response.content
+    return response.status_code
+
+
+def run_scenario(client: Client, url: str, iterations: int) -> Dict:
+    """Mesure une URL : appel à cache vide, `iterations` appels chauds, puis un appel sous tracemalloc."""
+    cache.clear()
+    start = time.perf_counter()
+    status = _request(client, url)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    queries = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            _request(client, url)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured.captured_queries))
+
+    tracemalloc.start()
+    try:
+        _request(client, url)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'status': status,
+        'cold_ms': round(cold_ms, 2),
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'p50_ms': round(_percentile(timings, 50), 2),
+        'p90_ms': round(_percentile(timings, 90), 2),
+        'p95_ms': round(_percentile(timings, 95), 2),
+        'p99_ms': round(_percentile(timings, 99), 2),
+        'max_ms': round(timings[-1], 2),
+        'queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(iterations: int = 20, scenarios: Optional[List[str]] = None, year: Optional[int] = None,
+                   progress=None) -> Dict[str, Dict]:
+    """Exécute les scénarios sur les données en base (voir seed_dataset)."""
+    year = year or timezone.now().year
+    clients = {'admin': Client(), 'agent': Client()}
+    clients['admin'].force_login(User.objects.get(username=BENCH_ADMIN))
+    clients['agent'].force_login(User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('username').first())
+
+    results = {}
+    for name in scenarios or SCENARIOS:
+        url_name, query, role = SCENARIOS[name]
+        url = reverse(url_name) + (f"?{query.format(year=year)}" if query else '')
+        results[name] = run_scenario(clients[role], url, iterations)
+        if progress:
+            progress(name, results[name])
+    return results
+
+
+def environment() -> Dict:
+    return {
+        'date': timezone.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+    }
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, latency_tolerance: float = 0.25,
+                        memory_tolerance: float = 0.25, min_latency_ms: float = 5.0) -> List[str]:
+    """
+    Régressions de `results` par rapport à `baseline` ({taille: {scénario: mesures}}).
+
+    - requêtes SQL : toute hausse (valeur déterministe),
+    - latence p95 : au-delà de la tolérance relative et d'au moins `min_latency_ms`,
+    - pic mémoire : au-delà de la tolérance relative et d'au moins 256 Ko.
+    """
+    regressions = []
+    for size, scenarios in results.items():
+        for name, current in scenarios.items():
+            reference = baseline.get(size, {}).get(name)
+            if not reference:
+                continue
+            label = f"{size} / {name}"
+            if current['queries'] > reference['queries']:
+                regressions.append(f"{label} : {current['queries']} requêtes SQL (référence {reference['queries']})")
+            if (current['p95_ms'] > reference['p95_ms'] * (1 + latency_tolerance)
+                    and current['p95_ms'] - reference['p95_ms'] >= min_latency_ms):
+                regressions.append(f"{label} : p95 {current['p95_ms']} ms (référence {reference['p95_ms']} ms)")
+            if (current['peak_memory_kb'] > reference['peak_memory_kb'] * (1 + memory_tolerance)
+                    and current['peak_memory_kb'] - reference['peak_memory_kb'] >= 256):
+                regressions.append(
+                    f"{label} : pic mémoire {current['peak_memory_kb']} Ko (référence {reference['peak_memory_kb']} Ko)"
+                )
+    return regressions
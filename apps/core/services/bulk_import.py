@@ -0,0 +1,455 @@
+"""
+Import en masse des saisies d'un secteur depuis un fichier CSV ou XLSX.
+Les lignes sont lues en flux (openpyxl en lecture seule, CSV ligne à ligne),
+validées par lots avec les règles des champs du modèle, valorisées avec un seul
+instantané du registre des facteurs puis insérées avec bulk_create
+(upsert sur la clé unique_together pour VehicleData et FoodEntry).
+
+L'import est tout ou rien : si une ligne est en erreur, rien n'est enregistré
+et le rapport liste les erreurs ligne par ligne.
+"""
+
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+import codecs
+import csv
+import logging
+import os
+import unicodedata
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from apps.core.services.factor_registry import get_snapshot
+from apps.core.services.rollups import rebuild_rollups
+from apps.core.services.user_groups import get_group_ids, get_primary_group_id
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 500
+# Taille de l'échantillon lu pour deviner l'encodage et le séparateur d'un CSV
+CSV_SNIFF_SIZE = 64 * 1024
+
+
+class BulkImportError(Exception):
+    """Fichier inexploitable (format, en-têtes) : aucune ligne n'est lue."""
+
+
+class SectorImport:
+    """
+    Description de l'import d'un secteur.
+
+    Args:
+        model_label: Modèle de saisie ('app.Model')
+        fields: Colonnes importables (champs du modèle, comme dans le formulaire de saisie)
+        aliases: En-têtes acceptés en plus du nom et du libellé du champ
+            (ex: en-têtes de l'export statistiques)
+        unique_fields: Clé unique_together servant à l'upsert (None = ajout simple)
+    """
+
+    # Colonnes exigées même si le champ a une valeur par défaut
+    required_fields = ['year']
+
+    def __init__(self, model_label: str, fields: List[str], aliases: Optional[Dict[str, str]] = None,
+                 unique_fields: Optional[List[str]] = None):
+        self.model_label = model_label
+        self.fields = fields
+        # « Année » : en-tête commun à tous les exports
+        self.aliases = {'Année': 'year', **(aliases or {})}
+        self.unique_fields = unique_fields
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def prepare(self, values: Dict) -> List[str]:
+        """Règles métier des formulaires de saisie ; retourne les erreurs de la ligne."""
+        return []
+
+
+class VehicleImport(SectorImport):
+    def prepare(self, values):
+        # Méthode déduite des colonnes renseignées : une distance seule vaut saisie par distance
+        has_fuel = values.get('essence_liters') or values.get('gazole_liters')
+        if values.get('distance_km') and not has_fuel:
+            values['calculation_method'] = 'distance'
+        if values['calculation_method'] == 'fuel':
+            if not values.get('essence_liters') and not values.get('gazole_liters'):
+                return ["Au moins une consommation (essence ou gazole) doit être renseignée."]
+        elif not values.get('distance_km'):
+            return ["Une distance parcourue doit être renseignée."]
+        return []
+
+
+class BuildingImport(SectorImport):
+    ENERGY_FIELDS = ['electricity_kwh', 'gas_kwh', 'heating_network_kwh', 'cooling_kwh', 'photovoltaic_production_kwh']
+
+    def prepare(self, values):
+        return [
+            f"{self.model._meta.get_field(name).verbose_name} : la valeur doit être positive."
+            for name in self.ENERGY_FIELDS
+            if values.get(name) is not None and values[name] < 0
+        ]
+
+
+class PurchaseImport(SectorImport):
+    def prepare(self, values):
+        if not values.get('amount_euros') or values['amount_euros'] <= 0:
+            return ["Le montant doit être supérieur à zéro."]
+        return []
+
+
+# Secteur (rollups.SECTORS) -> description de l'import
+SECTOR_IMPORTS = {
+    'vehicles': VehicleImport(
+        'vehicles.VehicleData',
+        ['year', 'service', 'calculation_method', 'essence_liters', 'gazole_liters', 'distance_km', 'notes'],
+        aliases={
+            'Service': 'service',
+            'Type Calcul': 'calculation_method',
+            'Essence (L)': 'essence_liters',
+            'Gazole (L)': 'gazole_liters',
+        },
+        unique_fields=['user', 'year', 'service'],
+    ),
+    'buildings': BuildingImport(
+        'batiment.BuildingEnergyData',
+        ['year', 'site_name', 'surface_area', 'construction_year', 'electricity_kwh', 'gas_kwh',
+         'heating_network_kwh', 'cooling_kwh', 'photovoltaic_production_kwh', 'notes'],
+        aliases={
+            'Site': 'site_name',
+            'Année Constr.': 'construction_year',
+            'Élec (kWh)': 'electricity_kwh',
+            'Gaz (kWh)': 'gas_kwh',
+            'Chaleur (kWh)': 'heating_network_kwh',
+            'Clim (kWh)': 'cooling_kwh',
+            'PV (kWh)': 'photovoltaic_production_kwh',
+        },
+    ),
+    'food': SectorImport(
+        'alimentation.FoodEntry',
+        ['year', 'service', 'beef_meals', 'pork_meals', 'poultry_fish_meals', 'vegetarian_meals',
+         'picnic_no_meat_meals', 'picnic_meat_meals'],
+        aliases={
+            'Boeuf': 'beef_meals',
+            'Porc': 'pork_meals',
+            'Volaille/Poisson': 'poultry_fish_meals',
+            'Végé': 'vegetarian_meals',
+        },
+        unique_fields=['service', 'year'],
+    ),
+    'purchases': PurchaseImport(
+        'purchases.PurchaseData',
+        ['year', 'service', 'category', 'description', 'amount_euros', 'notes'],
+        aliases={
+            'Catégorie': 'category',
+            'Description': 'description',
+            'Montant (€)': 'amount_euros',
+        },
+    ),
+    'numerique': SectorImport(
+        'numerique.EquipementNumerique',
+        ['year', 'nom', 'marque_modele', 'type_equipement', 'quantite', 'duree_vie'],
+        aliases={
+            'Nom': 'nom',
+            'Marque/Modèle': 'marque_modele',
+            'Type': 'type_equipement',
+            'Quantité': 'quantite',
+            'Durée Vie (ans)': 'duree_vie',
+        },
+    ),
+}
+
+
+def _normalize_label(label) -> str:
+    """En-tête comparable : minuscules, sans accents ni espaces superflus."""
+    text = unicodedata.normalize('NFKD', str(label or '')).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(text.lower().split())
+
+
+def expected_columns(sector: str) -> List[Tuple[str, str, bool]]:
+    """Colonnes attendues pour un secteur : (nom, libellé, obligatoire)."""
+    spec = SECTOR_IMPORTS[sector]
+    columns = []
+    for name in spec.fields:
+        field = spec.model._meta.get_field(name)
+        required = name in spec.required_fields or (not field.blank and not field.has_default())
+        columns.append((name, str(field.verbose_name), required))
+    return columns
+
+
+def _map_headers(spec: SectorImport, header_row) -> Tuple[Dict[int, str], List[str]]:
+    """Associe chaque colonne du fichier à un champ ; retourne (index -> champ, colonnes ignorées)."""
+    lookup = {}
+    for name in spec.fields:
+        lookup[_normalize_label(name)] = name
+        lookup[_normalize_label(spec.model._meta.get_field(name).verbose_name)] = name
+    for alias, name in spec.aliases.items():
+        lookup[_normalize_label(alias)] = name
+
+    columns, ignored = {}, []
+    for index, header in enumerate(header_row):
+        name = lookup.get(_normalize_label(header))
+        if name and name not in columns.values():
+            columns[index] = name
+        elif header not in (None, ''):
+            ignored.append(str(header))
+    return columns, ignored
+
+
+def _iter_csv(uploaded_file) -> Iterator[List[str]]:
+    sample = uploaded_file.read(CSV_SNIFF_SIZE)
+    uploaded_file.seek(0)
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample)
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        # Fichier enregistré par Excel en français
+        encoding = 'cp1252'
+    first_line = sample.split(b'\n', 1)[0]
+    delimiter = ';' if first_line.count(b';') >= first_line.count(b',') else ','
+    yield from csv.reader(codecs.iterdecode(uploaded_file, encoding), delimiter=delimiter)
+
+
+def _iter_xlsx(uploaded_file) -> Iterator[tuple]:
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    except Exception as e:
+        raise BulkImportError(f"Classeur XLSX illisible : {e}")
+    try:
+        # Première feuille ; en lecture seule les lignes sont lues au fil de l'eau
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_file_rows(uploaded_file, filename: str) -> Iterator[Tuple[int, tuple]]:
+    """Lignes non vides du fichier avec leur numéro (1 = première ligne du fichier)."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        rows = _iter_csv(uploaded_file)
+    elif extension == '.xlsx':
+        rows = _iter_xlsx(uploaded_file)
+    else:
+        raise BulkImportError("Format non pris en charge : fichier .csv ou .xlsx attendu.")
+
+    for line, row in enumerate(rows, start=1):
+        if any(value not in (None, '') and str(value).strip() for value in row):
+            yield line, row
+
+
+def _choice_lookup(field) -> Dict[str, str]:
+    """Code et libellé normalisés -> code, pour un champ à choix (groupes compris)."""
+    lookup = {}
+    for key, label in field.flatchoices:
+        lookup[_normalize_label(key)] = key
+        lookup[_normalize_label(label)] = key
+    return lookup
+
+
+def _empty_value(field):
+    return '' if field.empty_strings_allowed and not field.null else None
+
+
+def _clean_value(field, raw, choices, required=False):
+    if isinstance(raw, float) and field.get_internal_type() == 'DecimalField':
+        # Cellule numérique XLSX : passer par le texte pour garder les décimales saisies
+        raw = repr(raw)
+    if isinstance(raw, str):
+        raw = raw.strip()
+        if raw and field.get_internal_type() in ('DecimalField', 'FloatField', 'IntegerField',
+                                                 'PositiveIntegerField', 'BigIntegerField'):
+            # Nombres saisis à la française : "1 234,56"
+            raw = raw.replace('\xa0', '').replace(' ', '').replace(',', '.')
+    if raw is None or raw == '':
+        if required:
+            raise ValidationError(field.error_messages['blank'], code='blank')
+        if field.has_default():
+            return field.get_default()
+        raw = _empty_value(field)
+    elif choices:
+        raw = choices.get(_normalize_label(raw), raw)
+    return field.clean(raw, None)
+
+
+def _clean_row(spec: SectorImport, columns, row, defaults: Dict) -> Tuple[Dict, List[str]]:
+    """
+    Valide une ligne avec les règles des champs du modèle.
+    columns : [(index, nom, champ, choix, obligatoire)] des colonnes reconnues
+    defaults : valeurs des champs absents du fichier
+    """
+    values, errors = dict(defaults), []
+    for index, name, field, choices, required in columns:
+        raw = row[index] if index < len(row) else None
+        try:
+            values[name] = _clean_value(field, raw, choices, required)
+        except ValidationError as e:
+            errors.append(f"{field.verbose_name} : {' '.join(e.messages)}")
+    if not errors:
+        errors = spec.prepare(values)
+    return values, errors
+
+
+def _existing_keys(spec: SectorImport, objs) -> Dict[tuple, Optional[int]]:
+    """Clés uniques déjà en base pour un lot -> groupe de la saisie existante (une requête)."""
+    key_fields = [f if f != 'user' else 'user_id' for f in spec.unique_fields]
+    filters = {f'{name}__in': {getattr(obj, name) for obj in objs} for name in key_fields}
+    return {
+        tuple(row[:-1]): row[-1]
+        for row in spec.model.objects.filter(**filters).values_list(*key_fields, 'group_id')
+    }
+
+
+def _write_batch(spec: SectorImport, batch, user, report):
+    """
+    Enregistre un lot de lignes valides ([(numéro de ligne, objet)]) :
+    bulk_create, ou upsert sur la clé unique du modèle.
+    """
+    model = spec.model
+    if not spec.unique_fields:
+        model.objects.bulk_create([obj for _line, obj in batch], batch_size=IMPORT_BATCH_SIZE)
+        report['created'] += len(batch)
+        return
+
+    key_fields = [f if f != 'user' else 'user_id' for f in spec.unique_fields]
+
+    def key_of(obj):
+        return tuple(getattr(obj, name) for name in key_fields)
+
+    # Une même clé plusieurs fois dans le lot : la dernière ligne l'emporte
+    latest = {}
+    for line, obj in batch:
+        latest[key_of(obj)] = (line, obj)
+
+    existing = _existing_keys(spec, [obj for _line, obj in latest.values()])
+    # Clé sans l'auteur (FoodEntry) : ne pas écraser la saisie d'un autre groupe
+    allowed_groups = None
+    if 'user' not in spec.unique_fields and not (user.is_staff or user.is_superuser):
+        allowed_groups = set(get_group_ids(user))
+    objs = []
+    for key, (line, obj) in latest.items():
+        if key in existing:
+            if allowed_groups is not None and existing[key] not in allowed_groups:
+                report['errors'].append({
+                    'line': line,
+                    'messages': ["Une saisie existe déjà pour cette clé dans un autre groupe."],
+                })
+                continue
+            report['updated'] += 1
+        else:
+            report['created'] += 1
+        objs.append(obj)
+
+    # La saisie existante garde son auteur, son groupe et sa date de création
+    key_names = set(spec.unique_fields)
+    update_fields = [
+        f.name for f in model._meta.concrete_fields
+        if not f.primary_key and f.name not in key_names and f.name not in ('user', 'group', 'created_at')
+    ]
+    model.objects.bulk_create(
+        objs,
+        batch_size=IMPORT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=spec.unique_fields,
+        update_fields=update_fields,
+    )
+
+
+def import_sector_file(sector: str, uploaded_file, filename: str, user, dry_run: bool = False) -> Dict:
+    """
+    Importe un fichier de saisies pour un secteur.
+
+    Args:
+        sector: Secteur (clé de SECTOR_IMPORTS)
+        uploaded_file: Fichier ouvert en binaire (UploadedFile)
+        filename: Nom du fichier (l'extension choisit le lecteur)
+        user: Agent auteur des saisies (son premier groupe est affecté, comme dans les formulaires)
+        dry_run: Valider et valoriser sans rien enregistrer
+
+    Returns:
+        Rapport : lignes lues, créées / mises à jour, total CO2, erreurs par ligne
+
+    Raises:
+        BulkImportError: Fichier illisible ou colonnes obligatoires absentes
+    """
+    if sector not in SECTOR_IMPORTS:
+        raise BulkImportError(f"Secteur inconnu : {sector}")
+    spec = SECTOR_IMPORTS[sector]
+    model = spec.model
+
+    rows = iter_file_rows(uploaded_file, filename)
+    header = next(rows, None)
+    if header is None:
+        raise BulkImportError("Le fichier est vide.")
+    mapping, ignored = _map_headers(spec, header[1])
+    missing = [label for name, label, required in expected_columns(sector) if required and name not in mapping.values()]
+    if missing:
+        raise BulkImportError(f"Colonne(s) obligatoire(s) absente(s) : {', '.join(missing)}")
+
+    columns = []
+    for index, name in mapping.items():
+        field = model._meta.get_field(name)
+        choices = _choice_lookup(field) if field.choices else None
+        columns.append((index, name, field, choices, name in spec.required_fields))
+    # Colonnes absentes du fichier : valeur par défaut du champ
+    defaults = {}
+    for name in spec.fields:
+        if name not in mapping.values():
+            field = model._meta.get_field(name)
+            defaults[name] = field.get_default() if field.has_default() else _empty_value(field)
+
+    group_id = get_primary_group_id(user)
+    # Un seul instantané des facteurs pour tout le fichier
+    snapshot = get_snapshot()
+
+    report = {
+        'sector': sector,
+        'rows': 0,
+        'created': 0,
+        'updated': 0,
+        'total_co2_kg': Decimal('0'),
+        'errors': [],
+        'ignored_columns': ignored,
+        'saved': False,
+        'dry_run': dry_run,
+    }
+    years = set()
+
+    with transaction.atomic():
+        batch = []
+        for line, row in rows:
+            report['rows'] += 1
+            values, errors = _clean_row(spec, columns, row, defaults)
+            if errors:
+                report['errors'].append({'line': line, 'messages': errors})
+                continue
+
+            obj = model(user=user, group_id=group_id, **values)
+            obj.calculate_impact(snapshot)
+            report['total_co2_kg'] += Decimal(str(obj.total_co2_kg or 0))
+            years.add(obj.year)
+            batch.append((line, obj))
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _write_batch(spec, batch, user, report)
+                batch = []
+        if batch:
+            _write_batch(spec, batch, user, report)
+
+        report['errors'].sort(key=lambda error: error['line'])
+        if dry_run or report['errors']:
+            transaction.set_rollback(True)
+        else:
+            report['saved'] = True
+
+    if report['saved'] and years:
+        # bulk_create ne déclenche pas les signaux des saisies
+        rebuild_rollups(sectors=[sector], years=years)
+        logger.info(
+            f"Import '{sector}' par {user.username}: {report['created']} créée(s), "
+            f"{report['updated']} mise(s) à jour"
+        )
+    return report
@@ -0,0 +1,74 @@
+"""
+Version des données et cache des réponses JSON.
+Toute écriture d'une saisie ou d'un facteur incrémente DataVersion ; les API
+s'appuient dessus pour les requêtes conditionnelles (ETag / Last-Modified)
+et pour mettre en cache le JSON sérialisé sous une clé versionnée.
+"""
+
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils import timezone
+
+# Durée de conservation des réponses en cache (la clé change à chaque écriture)
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_data_version(request=None):
+    """
+    Retourne l'objet DataVersion courant.
+    Mémorisé sur la requête pour ne faire qu'une lecture par requête.
+    """
+    from apps.core.models import DataVersion
+
+    if request is not None and hasattr(request, '_data_version'):
+        return request._data_version
+    data_version = DataVersion.get_current()
+    if request is not None:
+        request._data_version = data_version
+    return data_version
+
+
+def bump_data_version():
+    from apps.core.models import DataVersion
+
+    DataVersion.bump()
+
+
+def versioned_etag(prefix, per_year=False):
+    """
+    Fabrique une fonction etag_func pour django.views.decorators.http.condition.
+
+    Args:
+        per_year: La réponse porte sur l'année en cours : l'année fait partie de l'ETag
+    """
+    def etag_func(request, *args, **kwargs):
+        version = get_data_version(request).version
+        if per_year:
+            return f"{prefix}-{timezone.now().year}-v{version}"
+        return f"{prefix}-v{version}"
+    return etag_func
+
+
+def data_last_modified(request, *args, **kwargs):
+    """Fonction last_modified_func pour django.views.decorators.http.condition."""
+    return get_data_version(request).updated_at
+
+
+def cached_json_response(request, key, build_data):
+    """
+    Retourne le JSON de build_data() depuis le cache, sous une clé incluant la version
+    des données ; build_data n'est appelé qu'en cas d'absence en cache.
+    """
+    cache_key = f"{key}:v{get_data_version(request).version}"
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = json.dumps(build_data(), cls=DjangoJSONEncoder)
+        cache.set(cache_key, payload, RESPONSE_CACHE_TIMEOUT)
+
+    response = HttpResponse(payload, content_type='application/json')
+    # Le navigateur garde la réponse mais revalide à chaque fois (If-None-Match -> 304)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
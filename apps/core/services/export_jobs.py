@@ -0,0 +1,203 @@
+"""
+Exports en tâche de fond.
+Les vues ne font qu'enregistrer un ExportJob ; la commande run_export_jobs
+génère le fichier hors du cycle requête/réponse et met à jour la progression.
+Un fichier déjà produit pour le même type, périmètre et DataVersion est réutilisé.
+Un job resté 'running' au-delà de EXPORT_JOB_TIMEOUT (worker arrêté) est repris
+par le prochain worker et n'est plus proposé aux nouvelles demandes.
+"""
+
+import logging
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.services.data_version import get_data_version
+from apps.core.services.exports import (
+    XLSX_CONTENT_TYPE,
+    write_csv_export,
+    write_data_workbook,
+    write_statistics_workbook,
+)
+from apps.core.services.metrics import EXPORT_JOB_DURATION
+from apps.core.services.user_groups import get_group_ids
+
+logger = logging.getLogger(__name__)
+
+
+# Type -> (nom de fichier, content-type, mode d'écriture du fichier temporaire)
+EXPORT_KINDS = {
+    'statistics_xlsx': ('statistiques_evry.xlsx', XLSX_CONTENT_TYPE, 'binary'),
+    'data_xlsx': ('bilan_carbone_evry.xlsx', XLSX_CONTENT_TYPE, 'binary'),
+    'data_csv': ('bilan_carbone_evry.csv', 'text/csv', 'text'),
+}
+
+
+def get_export_scope(kind, user):
+    """
+    Périmètre d'un export : les statistiques sont globales, les données
+    sont limitées aux groupes de l'agent (sauf pour les administrateurs).
+    """
+    if kind == 'statistics_xlsx' or user.is_staff or user.is_superuser:
+        return 'all'
+    group_ids = get_group_ids(user)
+    return 'groups:' + ','.join(str(i) for i in group_ids)
+
+
+def _stale_before():
+    """Date de démarrage en deçà de laquelle un job 'running' est considéré abandonné."""
+    return timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+
+
+def request_export(kind, user):
+    """
+    Retourne un ExportJob pour (type, périmètre) à la version courante des données :
+    un export terminé réutilisable, un export déjà en file, ou un nouveau job.
+    """
+    from apps.core.models import ExportJob
+
+    if kind not in EXPORT_KINDS:
+        raise ValueError(f"Type d'export inconnu: {kind}")
+
+    scope = get_export_scope(kind, user)
+    version = get_data_version().version
+    jobs = ExportJob.objects.filter(kind=kind, scope=scope, data_version=version)
+
+    done = jobs.filter(status=ExportJob.STATUS_DONE).first()
+    if done and done.file and done.file.storage.exists(done.file.name):
+        return done
+
+    queued = jobs.filter(
+        Q(status=ExportJob.STATUS_PENDING)
+        | Q(status=ExportJob.STATUS_RUNNING, started_at__gte=_stale_before())
+    ).first()
+    if queued:
+        return queued
+
+    return ExportJob.objects.create(kind=kind, scope=scope, data_version=version, requested_by=user)
+
+
+def _write_export(job, output, progress):
+    if job.kind == 'statistics_xlsx':
+        write_statistics_workbook(output, progress=progress)
+    elif job.kind == 'data_xlsx':
+        write_data_workbook(output, job.group_ids, progress=progress)
+    else:
+        write_csv_export(output, job.group_ids, progress=progress)
+
+
+def run_job(job):
+    """
+    Génère le fichier d'un job (déjà passé en 'running') dans un fichier temporaire,
+    puis l'enregistre dans le stockage de médias.
+    """
+    from apps.core.models import ExportJob
+
+    filename, _content_type, mode = EXPORT_KINDS[job.kind]
+
+    def progress(percent):
+        # Bornée à 99 : 100 % uniquement quand le fichier est enregistré
+        ExportJob.objects.filter(pk=job.pk).update(progress=min(percent, 99))
+
+    # Version lue avant la génération : si les données changent pendant l'export,
+    # le fichier ne sera pas réutilisé pour la nouvelle version
+    job.data_version = get_data_version().version
+    started = time.perf_counter()
+    tmp = tempfile.NamedTemporaryFile(suffix=os.path.splitext(filename)[1], delete=False)
+    tmp.close()
+    try:
+        if mode == 'text':
+            with open(tmp.name, 'w', newline='', encoding='utf-8') as output:
+                _write_export(job, output, progress)
+        else:
+            with open(tmp.name, 'wb') as output:
+                _write_export(job, output, progress)
+
+        with open(tmp.name, 'rb') as generated:
+            job.file.save(f"{job.kind}_{job.pk}_{filename}", File(generated), save=False)
+
+        job.status = ExportJob.STATUS_DONE
+        job.progress = 100
+        job.error = ''
+    except Exception as e:
+        logger.exception(f"Export #{job.pk} en échec")
+        job.status = ExportJob.STATUS_FAILED
+        job.error = str(e)
+    finally:
+        os.unlink(tmp.name)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'progress', 'error', 'file', 'data_version', 'finished_at'])
+    EXPORT_JOB_DURATION.labels(kind=job.kind, status=job.status).observe(time.perf_counter() - started)
+
+    if job.status == ExportJob.STATUS_DONE:
+        _delete_previous_artifacts(job)
+    return job
+
+
+def _delete_previous_artifacts(job):
+    """Supprime les fichiers des exports plus anciens du même type et périmètre."""
+    from apps.core.models import ExportJob
+
+    previous = (
+        ExportJob.objects
+        .filter(kind=job.kind, scope=job.scope, status=ExportJob.STATUS_DONE, pk__lt=job.pk)
+        .exclude(file='')
+    )
+    for old in previous:
+        old.file.delete(save=False)
+        old.save(update_fields=['file'])
+
+
+def claim_next_job():
+    """
+    Réserve le plus ancien job à traiter (passage atomique -> running) : en attente,
+    ou resté 'running' au-delà de EXPORT_JOB_TIMEOUT (worker arrêté pendant l'export).
+    Plusieurs workers peuvent tourner sans traiter deux fois le même job.
+    """
+    from apps.core.models import ExportJob
+
+    while True:
+        job = (
+            ExportJob.objects
+            .filter(
+                Q(status=ExportJob.STATUS_PENDING)
+                | Q(status=ExportJob.STATUS_RUNNING, started_at__lt=_stale_before())
+            )
+            .order_by('created_at', 'pk')
+            .first()
+        )
+        if job is None:
+            return None
+        if job.status == ExportJob.STATUS_RUNNING:
+            logger.warning(f"Export #{job.pk} bloqué depuis {job.started_at}: reprise")
+        # Garde sur l'état lu : un autre worker qui a réservé le job entre-temps l'a modifié
+        claimed = ExportJob.objects.filter(pk=job.pk, status=job.status, started_at=job.started_at).update(
+            status=ExportJob.STATUS_RUNNING, started_at=timezone.now(), progress=0
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def process_pending_jobs(limit=None):
+    """
+    Traite les jobs en attente.
+
+    Returns:
+        Liste des jobs traités
+    """
+    processed = []
+    while limit is None or len(processed) < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        logger.info(f"Export #{job.pk} ({job.kind}, {job.scope})")
+        processed.append(run_job(job))
+    return processed
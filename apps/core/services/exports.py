@@ -0,0 +1,407 @@
+"""
+Service d'export des données de saisie.
+Les lignes sont lues par paquets (values_list + iterator) et écrites au fil de
+l'eau : la mémoire reste constante et le premier octet part immédiatement.
+"""
+
+import csv
+from typing import Callable, Iterator, List, Optional
+
+from apps.core.services.rollups import get_sector_model, get_sector_totals
+
+# Taille des paquets lus en base lors des exports
+EXPORT_CHUNK_SIZE = 2000
+
+# (secteur, libellé synthèse, libellé ligne détail, champ Nom/Service)
+EXPORT_SECTORS = [
+    ('buildings', 'Bâtiments', 'Bâtiment', 'site_name'),
+    ('vehicles', 'Véhicules', 'Véhicule', 'service'),
+    ('food', 'Alimentation', 'Alimentation', 'service'),
+    ('purchases', 'Achats', 'Achat', 'service'),
+    ('numerique', 'Numérique', 'Numérique', 'nom'),
+]
+
+DETAIL_HEADERS = ['Type', 'Année', 'Nom/Service', 'Total CO2 (kg)']
+
+
+class Echo:
+    """Pseudo-buffer pour csv.writer : renvoie la ligne au lieu de la stocker."""
+
+    def write(self, value):
+        return value
+
+
+def get_export_totals(group_ids: Optional[List[int]] = None):
+    """Totaux par secteur (toutes années) : [(libellé, total)], en une requête d'agrégat."""
+    totals = get_sector_totals(group_ids=group_ids)
+    return [(label, totals[sector]) for sector, label, _type, _name in EXPORT_SECTORS]
+
+
+def iter_detail_rows(group_ids: Optional[List[int]] = None, chunk_size: int = EXPORT_CHUNK_SIZE,
+                     progress: Optional[Callable[[int], None]] = None) -> Iterator[list]:
+    """
+    Lignes de détail de tous les secteurs, sans instancier de modèles.
+    `progress(pourcentage)` est appelé après chaque secteur si fourni.
+    """
+    for index, (sector, _label, type_label, name_field) in enumerate(EXPORT_SECTORS, start=1):
+        qs = get_sector_model(sector).objects.all()
+        if group_ids is not None:
+            qs = qs.filter(group_id__in=group_ids)
+        for year, name, total in qs.values_list('year', name_field, 'total_co2_kg').iterator(chunk_size=chunk_size):
+            yield [type_label, year, name, total]
+        if progress:
+            progress(int(index * 100 / len(EXPORT_SECTORS)))
+
+
+def iter_csv_export(group_ids: Optional[List[int]] = None,
+                    progress: Optional[Callable[[int], None]] = None) -> Iterator[str]:
+    """Génère l'export CSV (synthèse puis détails) ligne par ligne."""
+    writer = csv.writer(Echo())
+
+    totals = get_export_totals(group_ids)
+    total_global = sum(total for _label, total in totals)
+
+    yield writer.writerow(['BILAN CARBONE - SYNTHÈSE'])
+    yield writer.writerow(['Total Global', f'{total_global:.2f} kgCO2e'])
+    for label, total in totals:
+        pct = int((total / total_global) * 100) if total_global else 0
+        yield writer.writerow([label, f'{total:.2f} kgCO2e', f'{pct}%'])
+    yield writer.writerow([])
+
+    yield writer.writerow(['DETAILS'])
+    yield writer.writerow(DETAIL_HEADERS)
+    for row in iter_detail_rows(group_ids, progress=progress):
+        yield writer.writerow(row)
+
+
+def write_csv_export(output, group_ids: Optional[List[int]] = None,
+                     progress: Optional[Callable[[int], None]] = None):
+    """Écrit l'export CSV dans un fichier texte ouvert."""
+    for line in iter_csv_export(group_ids, progress=progress):
+        output.write(line)
+
+
+def write_data_workbook(output, group_ids: Optional[List[int]] = None,
+                        progress: Optional[Callable[[int], None]] = None):
+    """Écrit l'export Excel des données (synthèse + graphique, puis détails) dans `output`."""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, PatternFill
+    from openpyxl.chart import DoughnutChart, Reference
+    from openpyxl.chart.label import DataLabelList
+
+    wb = Workbook()
+
+    # --- Feuille 1: Synthèse ---
+    ws_synth = wb.active
+    ws_synth.title = "Synthèse"
+
+    # Totaux par secteur (une requête d'agrégat)
+    totals = get_export_totals(group_ids)
+
+    ws_synth.append(['Catégorie', 'Emissions (kgCO2e)'])
+    for label, total in totals:
+        ws_synth.append([label, total])
+
+    # Style
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="2d6a4f", end_color="2d6a4f", fill_type="solid")
+
+    for cell in ws_synth[1]:
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal='center')
+
+    # Graphique
+    chart = DoughnutChart()
+    chart.title = "Répartition Bilan Carbone"
+    chart.style = 10
+    chart.holeSize = 70
+
+    chart.dataLabels = DataLabelList()
+    chart.dataLabels.showPercent = True
+    chart.dataLabels.showCatName = True
+
+    cats = Reference(ws_synth, min_col=1, min_row=2, max_row=len(totals) + 1)
+    data = Reference(ws_synth, min_col=2, min_row=1, max_row=len(totals) + 1)
+    chart.add_data(data, titles_from_data=False)
+    chart.set_categories(cats)
+
+    ws_synth.add_chart(chart, "D2")
+
+    # --- Feuille 2: Détails ---
+    ws_detail = wb.create_sheet(title="Détails")
+    ws_detail.append(DETAIL_HEADERS)
+
+    for row in iter_detail_rows(group_ids, progress=progress):
+        ws_detail.append(row)
+
+    wb.save(output)
+
+
+# ---------------------------------------------------------------------------
+# Export Excel des statistiques (openpyxl en mode write-only)
+# ---------------------------------------------------------------------------
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Largeur minimale des colonnes numériques (montants arrondis à 2 décimales)
+NUMBER_COLUMN_WIDTH = 12
+
+
+class ColumnWidths:
+    """
+    Suivi incrémental de la largeur des colonnes (longueur max du texte + 2).
+    En mode write-only, les largeurs doivent être fixées avant la première ligne :
+    on l'alimente donc avec les en-têtes, les libellés connus et les longueurs
+    maximales calculées en base.
+    """
+
+    def __init__(self, headers):
+        self.widths = [len(str(h)) for h in headers]
+
+    def track(self, index, value):
+        length = len(str(value)) if value is not None else 0
+        if length > self.widths[index]:
+            self.widths[index] = length
+
+    def track_row(self, row):
+        for index, value in enumerate(row):
+            self.track(index, value)
+
+    def apply(self, ws):
+        from openpyxl.utils import get_column_letter
+
+        for index, width in enumerate(self.widths, start=1):
+            ws.column_dimensions[get_column_letter(index)].width = width + 2
+
+
+def _choice_labels(choices):
+    """Aplati des choices Django (y compris groupés) en {code: libellé}."""
+    labels = {}
+    for code, label in choices:
+        if isinstance(label, (list, tuple)):
+            labels.update(_choice_labels(label))
+        else:
+            labels[code] = label
+    return labels
+
+
+def _max_lengths(qs, fields):
+    """Longueur max de chaque champ texte, calculée en base (une requête)."""
+    from django.db.models import Max
+    from django.db.models.functions import Length
+
+    if not fields:
+        return {}
+    agg = qs.aggregate(**{field: Max(Length(field)) for field in fields})
+    return {field: agg[field] or 0 for field in fields}
+
+
+def _statistics_sheets():
+    """
+    Définition des feuilles de détail :
+    (titre, modèle, en-têtes, champs values_list, fonction ligne, colonnes texte {index: champ}, libellés {index: [valeurs]})
+    """
+    from apps.vehicles.models import VehicleData
+    from apps.purchases.models import PurchaseData
+    from apps.alimentation.models import FoodEntry
+    from apps.batiment.models import BuildingEnergyData
+    from apps.numerique.models import EquipementNumerique
+
+    method_labels = dict(VehicleData.CALCULATION_METHOD_CHOICES)
+    category_labels = dict(PurchaseData.CATEGORY_CHOICES)
+    type_labels = _choice_labels(EquipementNumerique.TYPE_CHOICES)
+
+    def building_row(year, site, surface, construction, elec, elec_f, gas, gas_f, heat, heat_f, cool, cool_f, pv, total):
+        return [
+            year, site, surface, construction or "-",
+            round(elec, 2), elec_f,
+            round(gas, 2), gas_f,
+            round(heat, 2), heat_f,
+            round(cool, 2), cool_f,
+            round(pv, 2),
+            round(float(total or 0), 2)
+        ]
+
+    def vehicle_row(year, service, method, essence, gazole, distance, total, notes):
+        return [
+            year, service, method_labels.get(method, method),
+            essence or 0, gazole or 0, distance or 0,
+            round(float(total or 0), 2),
+            notes
+        ]
+
+    def food_row(year, service, beef, pork, poultry, vege, picnic_meat, picnic_veg, total):
+        picnic = picnic_meat + picnic_veg
+        return [
+            year, service,
+            beef, pork, poultry, vege,
+            picnic, beef + pork + poultry + vege + picnic,
+            round(float(total or 0), 2)
+        ]
+
+    def purchase_row(year, category, description, amount, factor, total):
+        return [
+            year, category_labels.get(category, category), description,
+            amount, factor,
+            round(float(total or 0), 2)
+        ]
+
+    def numerique_row(year, nom, marque, type_code, quantite, duree_vie, conso, fabrication, total):
+        return [
+            year, nom, marque or "-", type_labels.get(type_code, type_code),
+            quantite, duree_vie,
+            round(conso, 2), round(fabrication, 2),
+            round(float(total or 0), 2)
+        ]
+
+    return [
+        (
+            "Détails Bâtiments", BuildingEnergyData,
+            ["Année", "Site", "Surface (m²)", "Année Constr.",
+             "Élec (kWh)", "Facteur Élec",
+             "Gaz (kWh)", "Facteur Gaz",
+             "Chaleur (kWh)", "Facteur Chaleur",
+             "Clim (kWh)", "Facteur Clim",
+             "PV (kWh)", "Impact (kgCO2e)"],
+            ['year', 'site_name', 'surface_area', 'construction_year',
+             'electricity_kwh', 'electricity_factor', 'gas_kwh', 'gas_factor',
+             'heating_network_kwh', 'heating_network_factor', 'cooling_kwh', 'cooling_factor',
+             'photovoltaic_production_kwh', 'total_co2_kg'],
+            building_row, {1: 'site_name'}, {},
+        ),
+        (
+            "Détails Véhicules", VehicleData,
+            ["Année", "Service", "Type Calcul",
+             "Essence (L)", "Gazole (L)", "Distance (km)",
+             "Impact (kgCO2e)", "Notes"],
+            ['year', 'service', 'calculation_method', 'essence_liters', 'gazole_liters',
+             'distance_km', 'total_co2_kg', 'notes'],
+            vehicle_row, {1: 'service', 7: 'notes'}, {2: method_labels.values()},
+        ),
+        (
+            "Détails Alimentation", FoodEntry,
+            ["Année", "Service",
+             "Boeuf", "Porc", "Volaille/Poisson", "Végé", "Pique-Nique",
+             "Total Repas", "Impact (kgCO2e)"],
+            ['year', 'service', 'beef_meals', 'pork_meals', 'poultry_fish_meals', 'vegetarian_meals',
+             'picnic_meat_meals', 'picnic_no_meat_meals', 'total_co2_kg'],
+            food_row, {1: 'service'}, {},
+        ),
+        (
+            "Détails Achats", PurchaseData,
+            ["Année", "Catégorie", "Description",
+             "Montant (€)", "Facteur (kgCO2e/k€)",
+             "Impact (kgCO2e)"],
+            ['year', 'category', 'description', 'amount_euros', 'emission_factor', 'total_co2_kg'],
+            purchase_row, {2: 'description'}, {1: category_labels.values()},
+        ),
+        (
+            "Détails Numérique", EquipementNumerique,
+            ["Année", "Nom", "Marque/Modèle", "Type",
+             "Quantité", "Durée Vie (ans)",
+             "Conso (kWh/an)", "Fab. (kgCO2e)",
+             "Impact (kgCO2e)"],
+            ['year', 'nom', 'marque_modele', 'type_equipement', 'quantite', 'duree_vie',
+             'consommation_annuelle', 'empreinte_fabrication', 'total_co2_kg'],
+            numerique_row, {1: 'nom', 2: 'marque_modele'}, {3: type_labels.values()},
+        ),
+    ]
+
+
+def write_statistics_workbook(output, chunk_size: int = EXPORT_CHUNK_SIZE,
+                              progress: Optional[Callable[[int], None]] = None):
+    """
+    Écrit le classeur Excel des statistiques dans `output` (fichier ou HttpResponse).
+    - Mode write-only : les lignes sont sérialisées au fil de l'eau, sans garder de cellules en mémoire
+    - Une requête d'agrégat pour la synthèse, un itérateur ordonné par feuille de détail
+    - Graphique natif en barres empilées sur la synthèse
+    `progress(pourcentage)` est appelé après chaque feuille si fourni.
+    """
+    import datetime
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.chart import BarChart, Reference
+    from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    from apps.core.services.rollups import get_totals_by_year
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="2d6a4f", end_color="2d6a4f", fill_type="solid")
+
+    wb = Workbook(write_only=True)
+
+    def header_row(ws, headers, centered=False):
+        cells = []
+        for value in headers:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.font = header_font
+            cell.fill = header_fill
+            if centered:
+                cell.alignment = Alignment(horizontal="center")
+            cells.append(cell)
+        return cells
+
+    # --- SHEET 1: SYNTHÈSE (Graphique) ---
+    totals_by_year = get_totals_by_year()
+    sorted_years = sorted(totals_by_year.keys()) or [datetime.datetime.now().year]
+
+    ws = wb.create_sheet(title="Évolution Annuelle")
+    headers = ["Année", "Bâtiments", "Véhicules", "Alimentation", "Achats", "Numérique", "Total (kgCO2e)"]
+    rows = []
+    for year in sorted_years:
+        totals = totals_by_year.get(year, {})
+        values = [totals.get(sector, 0.0) for sector in ['buildings', 'vehicles', 'food', 'purchases', 'numerique']]
+        rows.append([year] + [round(v, 2) for v in values] + [round(sum(values), 2)])
+
+    widths = ColumnWidths(headers)
+    for row in rows:
+        widths.track_row(row)
+    widths.apply(ws)
+
+    ws.append(header_row(ws, headers, centered=True))
+    for row in rows:
+        ws.append(row)
+
+    # Chart: Stacked Bar
+    chart = BarChart()
+    chart.type = "col"
+    chart.style = 10
+    chart.title = "Évolution des Émissions par Secteur"
+    chart.y_axis.title = "kg CO₂e"
+    chart.x_axis.title = "Année"
+    chart.grouping = "stacked"
+    chart.overlap = 100
+
+    # Data: Columns B to F (2 to 6) / Categories: Column A (Year)
+    data = Reference(ws, min_col=2, min_row=1, max_row=len(sorted_years) + 1, max_col=6)
+    cats = Reference(ws, min_col=1, min_row=2, max_row=len(sorted_years) + 1)
+    chart.add_data(data, titles_from_data=True)
+    chart.set_categories(cats)
+    ws.add_chart(chart, f"{get_column_letter(len(headers) + 1)}2")
+
+    # --- SHEETS: Détails par secteur ---
+    sheets = _statistics_sheets()
+    for sheet_index, (title, model, headers, fields, make_row, text_columns, label_columns) in enumerate(sheets, start=1):
+        ws_detail = wb.create_sheet(title=title)
+        qs = model.objects.order_by('year', 'pk')
+
+        widths = ColumnWidths(headers)
+        for index in range(len(headers)):
+            if index not in text_columns and index not in label_columns and index > 0:
+                widths.track(index, 'x' * NUMBER_COLUMN_WIDTH)
+        for index, labels in label_columns.items():
+            for label in labels:
+                widths.track(index, label)
+        for index, length in zip(text_columns, _max_lengths(qs, list(text_columns.values())).values()):
+            widths.track(index, 'x' * length)
+        widths.apply(ws_detail)
+
+        ws_detail.append(header_row(ws_detail, headers))
+        for values in qs.values_list(*fields).iterator(chunk_size=chunk_size):
+            ws_detail.append(make_row(*values))
+        if progress:
+            progress(int(sheet_index * 100 / len(sheets)))
+
+    wb.save(output)
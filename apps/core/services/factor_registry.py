@@ -0,0 +1,220 @@
+"""
+Registre des facteurs d'émission.
+Les cinq tables de facteurs sont chargées une fois par processus dans un instantané
+en mémoire, marqué par un jeton de version stocké dans le cache Django. Toute
+modification d'un facteur (signaux post_save / post_delete, import ADEME en masse)
+remplace ce jeton : chaque processus partageant le cache recharge alors son
+instantané à la lecture suivante. Les enregistrements de saisies ne font plus
+aucune requête sur les facteurs.
+
+L'historique des facteurs (EmissionFactorVersion : valeur d'un facteur pour une
+plage d'années) fait partie de l'instantané : for_year(année) donne la vue des
+facteurs en vigueur pour une année de saisie, les versions remplaçant les valeurs
+courantes sur leur plage.
+
+Le jeton n'atteint les autres processus que si le cache est partagé : c'est le cas
+du cache fichier par défaut (CACHES) ; un LocMemCache limiterait l'invalidation
+au processus courant.
+"""
+
+import copy
+import uuid
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from apps.core.services.metrics import FACTOR_CACHE_LOOKUPS
+
+VERSION_CACHE_KEY = 'factor_registry:version'
+
+# Modèle de facteurs -> champ servant de clé de recherche
+FACTOR_MODELS = {
+    'vehicles.EmissionFactor': 'name',
+    'batiment.BuildingEmissionFactor': 'type_energie',
+    'alimentation.FoodEmissionFactor': 'code',
+    'purchases.PurchaseEmissionFactor': 'category_code',
+    'numerique.NumeriqueEmissionFactor': 'type_equipement',
+}
+
+# Modèle de facteurs -> champs de valeur versionnables (le premier par défaut)
+FACTOR_VALUE_FIELDS = {
+    'vehicles.EmissionFactor': ['factor_value'],
+    'batiment.BuildingEmissionFactor': ['facteur'],
+    'alimentation.FoodEmissionFactor': ['kg_co2_per_meal'],
+    'purchases.PurchaseEmissionFactor': ['factor_kg_co2_per_keur'],
+    'numerique.NumeriqueEmissionFactor': ['fabrication_kg_co2', 'conso_kwh_an'],
+}
+
+# Index de dépendances : secteur de saisie -> modèles de facteurs utilisés par son calcul
+SECTOR_FACTOR_MODELS = {
+    'vehicles': ['vehicles.EmissionFactor'],
+    'buildings': ['batiment.BuildingEmissionFactor'],
+    'food': ['alimentation.FoodEmissionFactor'],
+    'purchases': ['purchases.PurchaseEmissionFactor'],
+    'numerique': ['numerique.NumeriqueEmissionFactor', 'batiment.BuildingEmissionFactor'],
+}
+
+
+def sectors_for_factor_model(label):
+    """Secteurs dont le calcul dépend d'un modèle de facteurs."""
+    return [sector for sector, labels in SECTOR_FACTOR_MODELS.items() if label in labels]
+
+
+class _FactorLookup:
+    def get(self, label, key):
+        return self.index[label].get(key)
+
+    def values(self, label, value_field):
+        return {key: getattr(row, value_field) for key, row in self.index[label].items()}
+
+
+class FactorSnapshot(_FactorLookup):
+    """
+    Contenu des tables de facteurs (et de leur historique) à une version donnée.
+    Les instances sont partagées entre requêtes : ne pas les modifier.
+    """
+
+    def __init__(self, version):
+        from apps.core.models import EmissionFactorVersion
+
+        self.version = version
+        self.rows = {}
+        self.index = {}
+        # Ordre croissant : pour une même clé, la version commençant le plus tard l'emporte
+        self.versions = list(EmissionFactorVersion.objects.order_by('valid_from_year', 'pk'))
+        self._years = {}
+        for label, key_field in FACTOR_MODELS.items():
+            model = apps.get_model(label)
+            rows = list(model.objects.order_by(*(model._meta.ordering or ['pk'])))
+            index = {}
+            for row in rows:
+                # Le premier selon l'ordre du modèle, comme filter(...).first()
+                index.setdefault(getattr(row, key_field), row)
+            self.rows[label] = rows
+            self.index[label] = index
+
+    def for_year(self, year):
+        """Facteurs en vigueur pour une année de saisie (None = valeurs courantes)."""
+        view = self._years.get(year)
+        if view is None:
+            view = self._years.setdefault(year, YearFactors(self, year))
+        return view
+
+
+class YearFactors(_FactorLookup):
+    """
+    Vue d'un instantané pour une année : les facteurs couverts par une version
+    d'historique sont des copies portant la valeur de cette version.
+    """
+
+    def __init__(self, snapshot, year):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.year = year
+        # (modèle, clé, champ) -> version appliquée
+        self.applied = {
+            (v.factor_model, v.factor_key, v.value_field): v
+            for v in snapshot.versions if v.covers(year)
+        }
+        self.rows = dict(snapshot.rows)
+        self.index = dict(snapshot.index)
+
+        overrides = {}
+        for (label, key, field), v in self.applied.items():
+            overrides.setdefault((label, key), {})[field] = v.value
+        for (label, key), fields in overrides.items():
+            model = apps.get_model(label)
+            base = snapshot.index[label].get(key)
+            row = copy.copy(base) if base is not None else model(**{FACTOR_MODELS[label]: key})
+            for field, value in fields.items():
+                setattr(row, field, model._meta.get_field(field).to_python(value))
+            if self.index[label] is snapshot.index[label]:
+                self.index[label] = dict(snapshot.index[label])
+            self.index[label][key] = row
+        for label in {label for label, _key in overrides}:
+            replaced = {id(snapshot.index[label].get(key)): row for key, row in self.index[label].items()}
+            rows = [replaced.get(id(row), row) for row in snapshot.rows[label]]
+            self.rows[label] = rows + [row for row in self.index[label].values() if row not in rows]
+
+    def for_year(self, year):
+        return self.snapshot.for_year(year)
+
+    def versioned(self, label, value_field):
+        """{clé: valeur} des seuls facteurs fixés par une version pour cette année."""
+        return {
+            key: v.value for (model, key, field), v in self.applied.items()
+            if model == label and field == value_field
+        }
+
+    def signature(self, sector):
+        """Versions appliquées aux facteurs d'un secteur (années de même signature = mêmes facteurs)."""
+        labels = SECTOR_FACTOR_MODELS[sector]
+        return tuple(sorted(v.pk for (label, _key, _field), v in self.applied.items() if label in labels))
+
+    def revision(self, sector):
+        """Version d'historique la plus récente utilisée par le calcul d'un secteur (None si aucune)."""
+        return max(self.signature(sector), default=None)
+
+
+_snapshot = None
+# Invalidation en attente de la validation de la transaction courante
+_pending = False
+
+
+def _current_version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        # Premier processus après un vidage du cache : add() évite d'écraser un jeton concurrent
+        cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def get_snapshot() -> FactorSnapshot:
+    """Instantané courant, rechargé si le jeton de version a changé (une lecture du cache)."""
+    global _snapshot, _pending
+    if _pending and not connection.in_atomic_block:
+        # Transaction annulée : l'instantané chargé pendant celle-ci n'est plus valide
+        _pending = False
+        _snapshot = None
+    version = _current_version()
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != version:
+        FACTOR_CACHE_LOOKUPS.labels(result='miss').inc()
+        snapshot = _snapshot = FactorSnapshot(version)
+    else:
+        FACTOR_CACHE_LOOKUPS.labels(result='hit').inc()
+    return snapshot
+
+
+def get_factors(label):
+    """Liste des facteurs d'un modèle ('app.Model'), dans l'ordre du modèle."""
+    return get_snapshot().rows[label]
+
+
+def get_factor(label, key):
+    """Facteur d'un modèle par sa clé (voir FACTOR_MODELS), ou None."""
+    return get_snapshot().get(label, key)
+
+
+def get_factor_values(label, value_field):
+    """Dictionnaire {clé: valeur} pour un modèle de facteurs."""
+    return get_snapshot().values(label, value_field)
+
+
+def _publish_new_version():
+    global _pending
+    _pending = False
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate():
+    """
+    Invalide le registre : tout de suite pour ce processus, et pour les autres
+    une fois la transaction validée (ils ne rechargent pas des données non validées).
+    """
+    global _snapshot, _pending
+    _snapshot = None
+    _pending = True
+    transaction.on_commit(_publish_new_version)
@@ -0,0 +1,103 @@
+"""
+Mesures par requête HTTP : requêtes SQL (nombre, durée, empreintes répétées) et
+temps de rendu des gabarits.
+
+Les mesures sont collectées dans un objet RequestMetrics rattaché à la requête
+en cours par une variable de contexte (RequestMetricsMiddleware l'installe) :
+- SQL : connection.execute_wrapper, actif seulement pendant la requête mesurée,
+- gabarits : moteur TimedDjangoTemplates (TEMPLATES['BACKEND'] dans les settings).
+
+Hors requête mesurée (requête non échantillonnée, commandes, tâches), seul le
+test de la variable de contexte est exécuté.
+"""
+
+import contextvars
+import re
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from django.template.backends.django import DjangoTemplates, Template
+
+_current_metrics: contextvars.ContextVar = contextvars.ContextVar('request_metrics', default=None)
+
+# IN (%s, %s, ...) -> IN (...) : même empreinte quelle que soit la taille de la liste
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def fingerprint(sql: str) -> str:
+    """Empreinte d'une requête : le SQL avec ses paramètres (%s), listes IN regroupées."""
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+class RequestMetrics:
+    """Compteurs d'une requête HTTP."""
+
+    __slots__ = ('queries', 'db_time', 'template_time', 'fingerprints')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def add_query(self, sql: str, duration: float):
+        self.queries += 1
+        self.db_time += duration
+        self.fingerprints[sql] += 1
+
+    def repeated_queries(self, threshold: int) -> List[Tuple[str, int]]:
+        """Empreintes exécutées au moins `threshold` fois (symptôme N+1), les plus fréquentes d'abord."""
+        counts: Counter = Counter()
+        for sql, count in self.fingerprints.items():
+            counts[fingerprint(sql)] += count
+        return [(sql, count) for sql, count in counts.most_common() if count >= threshold]
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current_metrics.get()
+
+
+def start_metrics() -> Tuple[RequestMetrics, contextvars.Token]:
+    metrics = RequestMetrics()
+    return metrics, _current_metrics.set(metrics)
+
+
+def stop_metrics(token: contextvars.Token):
+    _current_metrics.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper : chronomètre chaque requête SQL de la requête HTTP mesurée."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - start)
+
+
+class TimedTemplate(Template):
+    """Gabarit dont le rendu est chronométré (rendu de premier niveau : les inclusions sont comprises)."""
+
+    def render(self, context=None, request=None):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Moteur de gabarits Django standard, rendus chronométrés pour RequestMetricsMiddleware."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,178 @@
+"""
+Listes de saisies des secteurs : filtres côté serveur (année, service, groupe),
+tri et pagination par clé (keyset / seek) au lieu de charger toute la table.
+
+Une page coûte une requête bornée (LIMIT) sur l'index de tri, quelle que soit
+la position dans la liste, et les totaux du filtre courant une seule requête
+d'agrégat. La position est transmise par un curseur opaque (valeurs de tri de la
+dernière ligne affichée) plutôt que par un numéro de page.
+"""
+
+import base64
+import datetime
+import json
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from django.http import QueryDict
+
+from apps.core.services.user_groups import get_group_ids
+
+LIST_PAGE_SIZE = 50
+
+# Tri -> (libellé, colonnes de tri) ; 'id' en dernier garantit un ordre total
+SORTS = {
+    'recent': ('Plus récentes', ['-year', '-created_at', '-id']),
+    'oldest': ('Plus anciennes', ['year', 'created_at', 'id']),
+    'co2_desc': ('CO₂ décroissant', ['-sort_co2', '-id']),
+    'co2_asc': ('CO₂ croissant', ['sort_co2', 'id']),
+}
+DEFAULT_SORT = 'recent'
+
+
+def _cursor_value(value):
+    # Dates complètes (microsecondes comprises) : l'égalité sur created_at doit être exacte
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Valeur de curseur non sérialisable : {value!r}")
+
+
+def _encode_cursor(values) -> str:
+    payload = json.dumps(values, default=_cursor_value, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str, size: int) -> Optional[list]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(payload)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+def _after(order, values) -> Q:
+    """
+    Lignes situées après `values` dans l'ordre `order` :
+    (a > x) OU (a = x ET b > y) OU ... selon le sens de chaque colonne.
+    """
+    condition = Q()
+    equal = Q()
+    for column, value in zip(order, values):
+        name = column.lstrip('-')
+        lookup = 'lt' if column.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _int_param(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class EntryListPage:
+    """
+    Page d'une liste de saisies.
+
+    Attributs utilisés par les gabarits : rows, count, totals, has_next,
+    next_query, filters, sort, sort_choices, years, groups, is_filtered.
+    """
+
+    def __init__(self, request, queryset, search_field: str, sum_fields: Iterable[str] = ('total_co2_kg',),
+                 page_size: int = LIST_PAGE_SIZE):
+        params = request.GET
+        self.search_field = search_field
+        self.sort = params.get('sort') if params.get('sort') in SORTS else DEFAULT_SORT
+        self.sort_choices = [(key, label) for key, (label, _order) in SORTS.items()]
+        self.filters = {
+            'year': _int_param(params.get('year')),
+            'service': (params.get('service') or '').strip(),
+            'group': _int_param(params.get('group')),
+        }
+        self.is_filtered = any(self.filters.values())
+
+        # Choix des filtres : années et groupes visibles dans le périmètre de l'utilisateur
+        self.years = list(queryset.order_by('-year').values_list('year', flat=True).distinct())
+        if request.user.is_staff or request.user.is_superuser:
+            self.groups = list(Group.objects.order_by('name'))
+        else:
+            self.groups = list(Group.objects.filter(pk__in=get_group_ids(request.user)).order_by('name'))
+
+        filtered = queryset
+        if self.filters['year'] is not None:
+            filtered = filtered.filter(year=self.filters['year'])
+        if self.filters['service']:
+            filtered = filtered.filter(**{f'{search_field}__icontains': self.filters['service']})
+        if self.filters['group'] is not None:
+            filtered = filtered.filter(group_id=self.filters['group'])
+
+        # Totaux du filtre courant : une requête d'agrégat
+        aggregates = {f'sum_{field}': Sum(field) for field in sum_fields}
+        result = filtered.aggregate(count=Count('pk'), **aggregates)
+        self.count = result['count']
+        self.totals: Dict[str, object] = {field: result[f'sum_{field}'] or 0 for field in sum_fields}
+
+        # Page : curseur -> WHERE (clés de tri) > dernière ligne, LIMIT page_size + 1
+        order = SORTS[self.sort][1]
+        columns = [column.lstrip('-') for column in order]
+        rows_qs = filtered.select_related('group')
+        if 'sort_co2' in columns:
+            field = queryset.model._meta.get_field('total_co2_kg')
+            # total_co2_kg peut être NULL (véhicules) : NULL trié comme 0.
+            # Arrondi à la précision du champ : le curseur compare alors exactement
+            # (SQLite stocke les décimaux en flottants)
+            sort_co2 = Coalesce(F('total_co2_kg'), Value(0), output_field=field.clone())
+            if getattr(field, 'decimal_places', None) is not None:
+                sort_co2 = Round(sort_co2, field.decimal_places, output_field=field.clone())
+            rows_qs = rows_qs.annotate(sort_co2=sort_co2)
+        self.cursor = params.get('after') or ''
+        values = _decode_cursor(self.cursor, len(order)) if self.cursor else None
+        try:
+            if values is None:
+                raise ValueError
+            rows_qs = rows_qs.filter(_after(order, values))
+        except (ValueError, ValidationError):
+            # Curseur absent ou invalide : première page
+            self.cursor = ''
+
+        rows = list(rows_qs.order_by(*order)[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.rows = rows[:page_size]
+
+        self.next_query = ''
+        self.first_query = self._query(None)
+        if self.has_next:
+            last = self.rows[-1]
+            self.next_query = self._query(_encode_cursor([getattr(last, column) for column in columns]))
+
+    def _query(self, cursor: Optional[str]) -> str:
+        """Paramètres GET de la page (filtres et tri conservés)."""
+        query = QueryDict(mutable=True)
+        for key, value in self.filters.items():
+            if value not in (None, ''):
+                query[key] = value
+        if self.sort != DEFAULT_SORT:
+            query['sort'] = self.sort
+        if cursor:
+            query['after'] = cursor
+        return query.urlencode()
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return bool(self.rows)
@@ -0,0 +1,246 @@
+"""
+Génération de données synthétiques volumineuses pour les tests de charge et les mesures.
+
+Les saisies des cinq secteurs sont créées par lots (bulk_create), leurs émissions
+calculées au préalable par les méthodes calculate_impact() des modèles avec un seul
+instantané du registre des facteurs : mêmes résultats que save(), sans les requêtes
+ni les signaux par ligne. Les agrégats sont reconstruits à la fin.
+
+Le contenu généré ne dépend que des paramètres (échelle, années, groupes, graine) :
+deux exécutions identiques produisent les mêmes saisies.
+"""
+
+import random
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.db import connection, transaction
+
+from apps.core.services.factor_registry import get_snapshot
+from apps.core.services.rollups import SECTORS, get_sector_model, rebuild_rollups
+
+# Préfixe des groupes / utilisateurs générés (permet de les remplacer sans toucher au reste)
+GROUP_PREFIX = 'Charge'
+USERNAME_PREFIX = 'charge_'
+
+# Saisies par groupe et par année à l'échelle 1
+ROWS_PER_GROUP_YEAR = {
+    'vehicles': 4,
+    'buildings': 3,
+    'food': 2,
+    'purchases': 20,
+    'numerique': 8,
+}
+
+DIRECTIONS = [
+    "Direction des Sports", "Services Techniques", "Mairie Annexe", "Ecole Jules Ferry",
+    "Police Municipale", "C.C.A.S.", "Espaces Verts", "Restauration Scolaire", "Voirie",
+    "Culture", "Petite Enfance", "Urbanisme", "Ressources Humaines", "Informatique",
+]
+
+MARQUES_BY_TYPE = {
+    'LAPTOP': ['Dell Latitude 5420', 'HP EliteBook 840', 'Lenovo ThinkPad T14'],
+    'DESKTOP_SCREEN': ['Dell OptiPlex 7090 + P2419H', 'HP ProDesk 600 + E243'],
+    'SMARTPHONE': ['Samsung Galaxy A52', 'iPhone 12', 'Google Pixel 6'],
+    'BORNE_WIFI': ['Cisco Meraki MR46', 'Ubiquiti UniFi AP AC Pro'],
+    'SWITCH': ['Cisco Catalyst 2960', 'HP Aruba 2930F'],
+    'CLOUD_INSTANCE': ['OVH Public Cloud b2-7', 'Scaleway PRO2-S'],
+    'CLOUD_STORAGE': ['OVH Object Storage', 'Scaleway Object Storage'],
+    'PRINTER': ['HP LaserJet Pro M404dn', 'Canon imageRUNNER 2625i'],
+    'SCREEN_EXTRA': ['Dell P2422H', 'Iiyama ProLite XU2493HS'],
+}
+
+
+def _group_name(index: int) -> str:
+    return f"{GROUP_PREFIX} {index:03d} - {DIRECTIONS[index % len(DIRECTIONS)]}"
+
+
+def clear_load_data() -> int:
+    """
+    Supprime les groupes et utilisateurs générés ainsi que leurs saisies.
+    Les saisies sont supprimées par un DELETE par table (pas de signal par ligne).
+
+    Returns:
+        Nombre de saisies supprimées
+    """
+    group_ids = list(Group.objects.filter(name__startswith=f"{GROUP_PREFIX} ").values_list('pk', flat=True))
+    deleted = 0
+    if group_ids:
+        placeholders = ', '.join(['%s'] * len(group_ids))
+        with transaction.atomic(), connection.cursor() as cursor:
+            for sector in SECTORS:
+                table = get_sector_model(sector)._meta.db_table
+                cursor.execute(f'DELETE FROM {table} WHERE group_id IN ({placeholders})', group_ids)
+                deleted += cursor.rowcount
+    User.objects.filter(username__startswith=USERNAME_PREFIX, is_superuser=False).delete()
+    Group.objects.filter(pk__in=group_ids).delete()  # Agrégats supprimés en cascade
+    return deleted
+
+
+def _create_groups(count: int):
+    """Crée les groupes et un agent par groupe (mot de passe 'password', haché une seule fois)."""
+    password = make_password('password')
+    groups = Group.objects.bulk_create([Group(name=_group_name(i)) for i in range(1, count + 1)])
+    # bulk_create ne renvoie pas toujours les clés primaires (selon la base) : relecture
+    groups = list(Group.objects.filter(name__in=[g.name for g in groups]).order_by('name'))
+    users = User.objects.bulk_create([
+        User(username=f"{USERNAME_PREFIX}{i:03d}", email=f"{USERNAME_PREFIX}{i:03d}@demo.com", password=password)
+        for i in range(1, count + 1)
+    ])
+    users = list(User.objects.filter(username__in=[u.username for u in users]).order_by('username'))
+    User.groups.through.objects.bulk_create([
+        User.groups.through(user_id=user.pk, group_id=group.pk) for user, group in zip(users, groups)
+    ])
+    return list(zip(groups, users))
+
+
+def _vehicles(rng, group, user, year, count):
+    from apps.vehicles.models import VehicleData
+
+    for n in range(count):
+        entry = VehicleData(
+            group=group, user=user, year=year,
+            service=f"Flotte {n + 1}",
+            calculation_method=rng.choice(['fuel', 'fuel', 'distance']),
+        )
+        if entry.calculation_method == 'fuel':
+            entry.essence_liters = Decimal(rng.randint(100, 5000))
+            entry.gazole_liters = Decimal(rng.randint(100, 5000))
+        else:
+            entry.distance_km = Decimal(rng.randint(1000, 50000))
+        yield entry
+
+
+def _buildings(rng, group, user, year, count):
+    from apps.batiment.models import BuildingEnergyData
+
+    for n in range(count):
+        yield BuildingEnergyData(
+            group=group, user=user, year=year,
+            site_name=f"Site {n + 1} - {group.name}",
+            construction_year=rng.randint(1960, 2020),
+            surface_area=Decimal(rng.randint(200, 5000)),
+            electricity_kwh=Decimal(rng.randint(5000, 200000)),
+            gas_kwh=Decimal(rng.randint(0, 150000)),
+            heating_network_kwh=Decimal(rng.randint(0, 50000)),
+            cooling_kwh=Decimal(rng.randint(0, 20000)),
+        )
+
+
+def _food(rng, group, user, year, count):
+    from apps.alimentation.models import FoodEntry
+
+    for n in range(count):
+        # (service, year) est unique : le nom du groupe fait partie du service
+        yield FoodEntry(
+            group=group, user=user, year=year,
+            service=f"{group.name} - Restaurant {n + 1}",
+            beef_meals=rng.randint(0, 5000),
+            pork_meals=rng.randint(0, 5000),
+            poultry_fish_meals=rng.randint(500, 8000),
+            vegetarian_meals=rng.randint(500, 8000),
+            picnic_no_meat_meals=rng.randint(0, 1000),
+            picnic_meat_meals=rng.randint(0, 1000),
+        )
+
+
+def _purchases(rng, group, user, year, count):
+    from apps.purchases.models import PurchaseData
+
+    categories = [code for code, _label in PurchaseData.CATEGORY_CHOICES]
+    for n in range(count):
+        category = rng.choice(categories)
+        yield PurchaseData(
+            group=group, user=user, year=year,
+            service=DIRECTIONS[rng.randrange(len(DIRECTIONS))],
+            category=category,
+            description=f"Marché {year}-{n + 1:05d} ({category})",
+            amount_euros=Decimal(rng.randint(500, 250000)),
+        )
+
+
+def _numerique(rng, group, user, year, count):
+    from apps.numerique.models import EquipementNumerique
+
+    types = list(MARQUES_BY_TYPE)
+    for n in range(count):
+        equip_type = rng.choice(types)
+        yield EquipementNumerique(
+            group=group, user=user, year=year,
+            nom=f"Parc {DIRECTIONS[rng.randrange(len(DIRECTIONS))]} - Lot {n + 1}",
+            marque_modele=rng.choice(MARQUES_BY_TYPE[equip_type]),
+            type_equipement=equip_type,
+            quantite=rng.randint(1, 60),
+            duree_vie=rng.randint(3, 7),
+        )
+
+
+SECTOR_GENERATORS = {
+    'vehicles': _vehicles,
+    'buildings': _buildings,
+    'food': _food,
+    'purchases': _purchases,
+    'numerique': _numerique,
+}
+
+
+def _iter_entries(sector, members, years, scale, seed) -> Iterator:
+    count = max(1, round(ROWS_PER_GROUP_YEAR[sector] * scale))
+    for group, user in members:
+        for year in years:
+            # Une graine par (secteur, groupe, année) : le contenu ne dépend pas de l'ordre de génération
+            rng = random.Random(f"{seed}:{sector}:{group.name}:{year}")
+            yield from SECTOR_GENERATORS[sector](rng, group, user, year, count)
+
+
+def generate_load_data(scale: float = 1, years: Optional[Iterable[int]] = None, groups: int = 20, seed: int = 42,
+                       batch_size: int = 5000, sectors: Optional[Iterable[str]] = None,
+                       progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, int]:
+    """
+    Remplace les données de charge existantes par un jeu synthétique.
+
+    Args:
+        scale: Multiplicateur du nombre de saisies par groupe et par année (ROWS_PER_GROUP_YEAR)
+        years: Années générées
+        groups: Nombre de groupes (un agent par groupe)
+        seed: Graine du générateur
+        batch_size: Taille des lots de bulk_create
+        sectors: Secteurs générés (None = tous)
+        progress: Rappel (secteur, lignes créées) après chaque lot
+
+    Returns:
+        {secteur: nombre de saisies créées}
+    """
+    years = sorted(years)
+    sectors = list(sectors) if sectors else SECTORS
+    clear_load_data()
+    members = _create_groups(groups)
+
+    # Un seul instantané : facteurs résolus une fois par année, aucune requête par ligne
+    snapshot = get_snapshot()
+    created = {}
+    for sector in sectors:
+        model = get_sector_model(sector)
+        created[sector] = 0
+        batch: List = []
+        with transaction.atomic():
+            for entry in _iter_entries(sector, members, years, scale, seed):
+                entry.calculate_impact(snapshot)
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    model.objects.bulk_create(batch)
+                    created[sector] += len(batch)
+                    batch = []
+                    if progress:
+                        progress(sector, created[sector])
+            if batch:
+                model.objects.bulk_create(batch)
+                created[sector] += len(batch)
+                if progress:
+                    progress(sector, created[sector])
+
+    # bulk_create ne déclenche pas les signaux des saisies
+    rebuild_rollups(sectors=sectors, years=years)
+    return created
@@ -0,0 +1,273 @@
+"""
+Test de charge « fin de campagne » : des agents simulés, connectés en même temps,
+enchaînent les parcours réels de l'application sur un serveur déjà démarré
+(runserver ou gunicorn) : connexion, tableau de bord, listes, saisies (formulaires
+des cinq secteurs), statistiques et exports.
+
+Chaque agent simulé est un thread avec sa propre session HTTP (cookies, jeton CSRF).
+Les comptes utilisés sont ceux des données de charge (generate_load_data) : les
+saisies créées pendant le test sont rattachées à leurs groupes et supprimées avec eux.
+
+Le rapport donne, par point d'accès : nombre de requêtes, débit, taux d'erreur et
+latences (p50, p95, p99, max). Tester avec la base de production (PostgreSQL) :
+sous SQLite, les saisies concurrentes échouent en « database is locked ».
+"""
+
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import requests
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.services.load_data import MARQUES_BY_TYPE
+
+# Parcours -> poids (probabilité relative de l'action suivante d'un agent)
+FLOW_WEIGHTS = {
+    'dashboard': 30,
+    'list': 25,
+    'form': 25,
+    'statistics': 10,
+    'export': 7,
+    'sensibilisation': 3,
+}
+
+SECTOR_PAGES = {
+    'vehicles': ('vehicle_list', 'vehicle_form'),
+    'buildings': ('batiment_list', 'batiment_form'),
+    'food': ('food_list', 'food_form'),
+    'purchases': ('purchase_list', 'purchase_form'),
+    # Le formulaire numérique est sur le tableau de bord du secteur
+    'numerique': ('numerique_list', 'numerique_dashboard'),
+}
+
+
+def _form_data(sector: str, rng: random.Random, year: int) -> Dict[str, object]:
+    """Champs POST d'une saisie réaliste pour un secteur."""
+    from apps.purchases.models import PurchaseData
+
+    tag = uuid.uuid4().hex[:8]
+    if sector == 'vehicles':
+        return {
+            'year': year, 'service': f"Flotte {tag}",
+            'essence_liters': rng.randint(100, 5000), 'gazole_liters': rng.randint(100, 5000), 'notes': '',
+        }
+    if sector == 'buildings':
+        return {
+            'year': year, 'site_name': f"Site {tag}", 'surface_area': rng.randint(200, 5000),
+            'construction_year': rng.randint(1960, 2020), 'electricity_kwh': rng.randint(5000, 200000),
+            'gas_kwh': rng.randint(0, 150000), 'heating_network_kwh': 0, 'cooling_kwh': 0,
+            'photovoltaic_production_kwh': 0, 'notes': '',
+        }
+    if sector == 'food':
+        # (service, année) est unique
+        return {
+            'year': year, 'service': f"Restaurant {tag}",
+            'beef_meals': rng.randint(0, 5000), 'pork_meals': rng.randint(0, 5000),
+            'poultry_fish_meals': rng.randint(500, 8000), 'vegetarian_meals': rng.randint(500, 8000),
+            'picnic_no_meat_meals': 0, 'picnic_meat_meals': 0,
+        }
+    if sector == 'purchases':
+        return {
+            'year': year, 'service': f"Service {tag}",
+            'category': rng.choice([code for code, _label in PurchaseData.CATEGORY_CHOICES]),
+            'description': f"Marché {tag}", 'amount_euros': rng.randint(500, 250000), 'notes': '',
+        }
+    equip_type = rng.choice(list(MARQUES_BY_TYPE))
+    return {
+        'year': year, 'nom': f"Parc {tag}", 'marque_modele': rng.choice(MARQUES_BY_TYPE[equip_type]),
+        'type_equipement': equip_type, 'quantite': rng.randint(1, 60), 'duree_vie': rng.randint(3, 7),
+    }
+
+
+class LoadTestStats:
+    """Mesures partagées entre les agents simulés (protégées par un verrou)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.error_samples: Dict[str, str] = {}
+
+    def record(self, endpoint: str, seconds: float, error: Optional[str] = None):
+        with self._lock:
+            self.timings[endpoint].append(seconds)
+            if error:
+                self.errors[endpoint] += 1
+                self.error_samples.setdefault(endpoint, error)
+
+    def report(self, elapsed: float) -> Dict[str, Dict]:
+        """{point d'accès: mesures}, plus une ligne 'TOTAL'."""
+        with self._lock:
+            timings = {endpoint: sorted(values) for endpoint, values in self.timings.items()}
+            errors = dict(self.errors)
+        timings['TOTAL'] = sorted(value for values in timings.values() for value in values)
+        errors['TOTAL'] = sum(errors.values())
+
+        report = {}
+        for endpoint, values in sorted(timings.items(), key=lambda item: (item[0] == 'TOTAL', item[0])):
+            if not values:
+                continue
+            percentiles = (
+                statistics.quantiles(values, n=100, method='inclusive') if len(values) > 1 else values * 99
+            )
+            report[endpoint] = {
+                'requests': len(values),
+                'throughput_rps': round(len(values) / elapsed, 2),
+                'error_rate': round(errors.get(endpoint, 0) / len(values), 4),
+                'p50_ms': round(percentiles[49] * 1000, 1),
+                'p95_ms': round(percentiles[94] * 1000, 1),
+                'p99_ms': round(percentiles[98] * 1000, 1),
+                'max_ms': round(values[-1] * 1000, 1),
+            }
+        return report
+
+
+class VirtualAgent(threading.Thread):
+    """Agent simulé : connexion, puis actions tirées selon FLOW_WEIGHTS jusqu'à l'échéance."""
+
+    def __init__(self, base_url: str, username: str, password: str, stats: LoadTestStats, deadline: float,
+                 start_delay: float, think_time: Sequence[float], seed: str, timeout: float):
+        super().__init__(daemon=True)
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.stats = stats
+        self.deadline = deadline
+        self.start_delay = start_delay
+        self.think_time = think_time
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.session = requests.Session()
+        self.year = timezone.now().year
+
+    def request(self, endpoint: str, method: str, url_name: str, query: str = '', data=None,
+                expected_status=200) -> Optional[requests.Response]:
+        url = f"{self.base_url}{reverse(url_name)}{'?' + query if query else ''}"
+        headers = {}
+        if data is not None:
+            data = {**data, 'csrfmiddlewaretoken': self.session.cookies.get('csrftoken', '')}
+            headers['Referer'] = url
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, url, data=data, headers=headers, allow_redirects=False, timeout=self.timeout, stream=True
+            )
+            # Lecture complète : les exports en streaming sont comptés jusqu'au dernier octet
+            for _chunk in response.iter_content(64 * 1024):
+                pass
+        except requests.RequestException as e:
+            self.stats.record(endpoint, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+            return None
+        error = None
+        if response.status_code != expected_status:
+            error = f"HTTP {response.status_code} (attendu {expected_status})"
+        self.stats.record(endpoint, time.perf_counter() - start, error)
+        return response
+
+    def login(self) -> bool:
+        self.request('login (GET)', 'GET', 'login')
+        response = self.request(
+            'login (POST)', 'POST', 'login', data={'username': self.username, 'password': self.password},
+            expected_status=302,
+        )
+        return response is not None and response.status_code == 302
+
+    def flow_dashboard(self):
+        self.request('dashboard', 'GET', 'dashboard')
+        self.request('dashboard_emissions_api', 'GET', 'dashboard_emissions_api')
+
+    def flow_list(self):
+        list_name, _form_name = SECTOR_PAGES[self.rng.choice(list(SECTOR_PAGES))]
+        self.request(list_name, 'GET', list_name)
+        if self.rng.random() < 0.3:
+            self.request(f"{list_name} (année)", 'GET', list_name, query=f"year={self.year}")
+
+    def flow_form(self):
+        sector = self.rng.choice(list(SECTOR_PAGES))
+        list_name, form_name = SECTOR_PAGES[sector]
+        query = 'method=fuel' if sector == 'vehicles' else ''
+        self.request(f"{form_name} (GET)", 'GET', form_name, query=query)
+        self.think()
+        self.request(
+            f"{form_name} (POST)", 'POST', form_name, query=query,
+            data=_form_data(sector, self.rng, self.year), expected_status=302,
+        )
+        # Redirection vers la liste après enregistrement
+        self.request(list_name, 'GET', list_name)
+
+    def flow_statistics(self):
+        self.request('statistics', 'GET', 'statistics')
+        self.request('statistics_data_api', 'GET', 'statistics_data_api')
+
+    def flow_export(self):
+        choice = self.rng.random()
+        if choice < 0.5:
+            self.request('export_data (csv)', 'GET', 'export_data')
+        elif choice < 0.8:
+            self.request('export_data (xlsx)', 'GET', 'export_data', query='format=xlsx')
+        else:
+            self.request('export_statistics', 'GET', 'export_statistics')
+
+    def flow_sensibilisation(self):
+        self.request('sensibilisation_page', 'GET', 'sensibilisation_page')
+
+    def think(self):
+        low, high = self.think_time
+        pause = self.rng.uniform(low, high)
+        if pause > 0:
+            time.sleep(min(pause, max(0.0, self.deadline - time.monotonic())))
+
+    def run(self):
+        time.sleep(self.start_delay)
+        if time.monotonic() >= self.deadline or not self.login():
+            return
+        flows = list(FLOW_WEIGHTS)
+        weights = [FLOW_WEIGHTS[flow] for flow in flows]
+        while time.monotonic() < self.deadline:
+            getattr(self, f"flow_{self.rng.choices(flows, weights)[0]}")()
+            self.think()
+        self.session.close()
+
+
+def run_load_test(base_url: str, accounts: Sequence[str], password: str, users: int = 100, duration: float = 60,
+                  ramp_up: float = 10, think_time: Sequence[float] = (0.5, 2.0), seed: int = 42,
+                  timeout: float = 60, progress: Optional[Callable[[float, Dict], None]] = None) -> Dict:
+    """
+    Lance `users` agents simulés pendant `duration` secondes (démarrages étalés sur `ramp_up`).
+    Les comptes `accounts` sont répartis entre les agents (plusieurs sessions par compte si besoin).
+
+    Returns:
+        {'elapsed_s': durée réelle, 'endpoints': {point d'accès: mesures}, 'errors': {point d'accès: exemple}}
+    """
+    stats = LoadTestStats()
+    started = time.monotonic()
+    deadline = started + ramp_up + duration
+    agents = [
+        VirtualAgent(
+            base_url, accounts[i % len(accounts)], password, stats, deadline,
+            start_delay=ramp_up * i / users, think_time=think_time, seed=f"{seed}:{i}", timeout=timeout,
+        )
+        for i in range(users)
+    ]
+    for agent in agents:
+        agent.start()
+
+    while any(agent.is_alive() for agent in agents):
+        time.sleep(5)
+        if progress:
+            progress(time.monotonic() - started, stats.report(max(time.monotonic() - started, 1e-6)).get('TOTAL', {}))
+    for agent in agents:
+        agent.join()
+
+    elapsed = time.monotonic() - started
+    return {
+        'elapsed_s': round(elapsed, 1),
+        'endpoints': stats.report(elapsed),
+        'errors': dict(stats.error_samples),
+    }
@@ -0,0 +1,79 @@
+"""
+Métriques d'exploitation au format texte Prometheus (vue metrics_view, URL /metrics/).
+
+Avec plusieurs processus (workers gunicorn, commandes, tâches), définir la variable
+d'environnement PROMETHEUS_MULTIPROC_DIR (répertoire vide au démarrage, voir
+config/gunicorn.conf.py) : chaque processus écrit ses valeurs dans ses propres
+fichiers de ce répertoire, additionnés à la lecture. Sans cette variable, seules
+les valeurs du processus qui répond sont exposées (développement).
+
+Taux de succès du cache des facteurs (PromQL) :
+    sum(rate(bilan_factor_cache_lookups_total{result="hit"}[5m]))
+      / sum(rate(bilan_factor_cache_lookups_total[5m]))
+"""
+
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    'bilan_http_request_duration_seconds',
+    'Durée des requêtes HTTP par vue',
+    ['view', 'method', 'status'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+REQUEST_QUERIES = Histogram(
+    'bilan_http_request_sql_queries',
+    'Requêtes SQL par requête HTTP échantillonnée (REQUEST_METRICS_SAMPLE_RATE)',
+    ['view'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+
+EXPORT_JOB_DURATION = Histogram(
+    'bilan_export_job_duration_seconds',
+    'Durée de génération des exports asynchrones',
+    ['kind', 'status'],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
+REMINDER_CAMPAIGN_DURATION = Histogram(
+    'bilan_reminder_campaign_duration_seconds',
+    "Durée d'envoi des campagnes de rappel",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+
+REMINDER_EMAILS = Counter(
+    'bilan_reminder_emails_total',
+    'Emails de rappel envoyés, par statut',
+    ['status'],
+)
+
+ADEME_IMPORT_DURATION = Histogram(
+    'bilan_ademe_import_duration_seconds',
+    'Durée des étapes de la mise à jour des facteurs ADEME',
+    ['phase'],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
+ADEME_IMPORT_ROWS = Counter(
+    'bilan_ademe_import_rows_total',
+    'Facteurs ADEME traités par la mise à jour, par secteur et résultat',
+    ['sector', 'outcome'],
+)
+
+FACTOR_CACHE_LOOKUPS = Counter(
+    'bilan_factor_cache_lookups_total',
+    "Accès à l'instantané du registre des facteurs (hit : réutilisé, miss : rechargé)",
+    ['result'],
+)
+
+
+def render_metrics() -> bytes:
+    """Métriques de tous les processus (mode multiprocessus) ou du processus courant."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,240 @@
+"""
+Recalcul des émissions des saisies après une modification des facteurs.
+Chaque secteur est recalculé par une seule requête UPDATE ... SET total_co2_kg = ...
+dont les facteurs sont des constantes SQL (CASE sur la catégorie) lues dans un
+instantané du registre des facteurs : même résultat que save(), sans charger
+les lignes.
+
+Les facteurs sont ceux en vigueur pour l'année des saisies (historique
+EmissionFactorVersion) : les années partageant les mêmes versions sont mises à
+jour ensemble, soit un seul UPDATE par secteur tant qu'aucune version ne s'applique.
+
+Les bâtiments conservent leurs facteurs historiques : seuls les facteurs
+encore à 0 reçoivent la valeur courante, comme dans BuildingEnergyData.save(),
+sauf si une version de l'historique couvre l'année.
+"""
+
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.core.services.factor_registry import get_snapshot, sectors_for_factor_model
+from apps.core.services.rollups import SECTORS, get_sector_model, rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+
+def _decimal(value) -> Value:
+    return Value(Decimal(str(value)), output_field=models.DecimalField(max_digits=20, decimal_places=6))
+
+
+def _float(value) -> Value:
+    return Value(float(value), output_field=models.FloatField())
+
+
+def _by_code(field: str, factors: Dict, default, wrap):
+    """CASE field WHEN code THEN facteur ... ELSE défaut END."""
+    return Case(
+        *[When(**{field: code}, then=wrap(value)) for code, value in factors.items()],
+        default=wrap(default),
+    )
+
+
+def _vehicle_updates(snapshot):
+    from apps.vehicles.models import VehicleData
+
+    def factor(name):
+        obj = snapshot.get('vehicles.EmissionFactor', name)
+        return obj.factor_value if obj else VehicleData.DEFAULT_FACTORS[name]
+
+    zero = _decimal(0)
+    essence = Coalesce(F('essence_liters'), zero) * _decimal(factor('Essence'))
+    gazole = Coalesce(F('gazole_liters'), zero) * _decimal(factor('Gazole'))
+    distance = Coalesce(F('distance_km'), zero) * _decimal(factor('Voiture thermique moyenne'))
+    fuel = {'calculation_method': 'fuel'}
+    return {
+        'essence_co2_kg': Case(When(**fuel, then=essence), default=F('essence_co2_kg')),
+        'gazole_co2_kg': Case(When(**fuel, then=gazole), default=F('gazole_co2_kg')),
+        'total_co2_kg': Case(
+            When(**fuel, then=essence + gazole),
+            When(calculation_method='distance', then=distance),
+            default=F('total_co2_kg'),
+        ),
+    }
+
+
+def _building_updates(snapshot):
+    from apps.batiment.models import BuildingEnergyData
+
+    current = snapshot.values('batiment.BuildingEmissionFactor', 'facteur')
+    versioned = snapshot.versioned('batiment.BuildingEmissionFactor', 'facteur')
+    kwh_fields = {
+        'ELEC': 'electricity_kwh',
+        'GAZ': 'gas_kwh',
+        'HEAT': 'heating_network_kwh',
+        'COOL': 'cooling_kwh',
+    }
+    updates = {}
+    total = None
+    for code, factor_field in BuildingEnergyData.FACTOR_FIELDS.items():
+        kwh_field = kwh_fields[code]
+        if code in versioned:
+            # Version de l'historique couvrant l'année : elle fait foi
+            factor = _decimal(versioned[code])
+        else:
+            # Facteur historique conservé ; 0 = jamais renseigné -> facteur courant
+            value = current.get(code, BuildingEnergyData.DEFAULT_FACTORS[code])
+            factor = Case(When(**{factor_field: 0}, then=_decimal(value)), default=F(factor_field))
+        updates[factor_field] = factor
+        term = F(kwh_field) * factor
+        total = term if total is None else total + term
+    updates['total_co2_kg'] = total
+    return updates
+
+
+def _food_updates(snapshot):
+    from apps.alimentation.models import FoodEntry
+
+    factors = snapshot.values('alimentation.FoodEmissionFactor', 'kg_co2_per_meal')
+    total = None
+    for meal_field, code in FoodEntry.MEAL_FACTOR_CODES.items():
+        term = F(meal_field) * _decimal(factors.get(code, 0))
+        total = term if total is None else total + term
+    return {'total_co2_kg': total}
+
+
+def _purchase_updates(snapshot):
+    from apps.purchases.models import PurchaseData
+
+    factors = dict(PurchaseData.DEFAULT_FACTORS)
+    factors.update(snapshot.values('purchases.PurchaseEmissionFactor', 'factor_kg_co2_per_keur'))
+    # Le SET lit les anciennes valeurs : le total utilise son propre CASE, en kgCO2e/€
+    # (pas de division en SQL : SQLite diviserait en entiers les montants ronds)
+    per_euro = {code: value / Decimal('1000') for code, value in factors.items()}
+    return {
+        'emission_factor': _by_code('category', factors, 0, _decimal),
+        'total_co2_kg': F('amount_euros') * _by_code('category', per_euro, 0, _decimal),
+    }
+
+
+def _numerique_updates(snapshot):
+    from apps.numerique.models import EquipementNumerique
+
+    rows = snapshot.rows['numerique.NumeriqueEmissionFactor']
+    fabrication = _by_code('type_equipement', {f.type_equipement: f.fabrication_kg_co2 for f in rows}, 0, _float)
+    conso = _by_code('type_equipement', {f.type_equipement: f.conso_kwh_an for f in rows}, 0, _float)
+    elec = snapshot.get('batiment.BuildingEmissionFactor', 'ELEC')
+    elec_factor = float(elec.facteur) if elec else EquipementNumerique.DEFAULT_ELEC_FACTOR
+
+    empreinte = F('quantite') * fabrication
+    consommation = F('quantite') * conso
+    return {
+        'empreinte_fabrication': empreinte,
+        'consommation_annuelle': consommation,
+        'total_co2_kg': empreinte / Greatest(F('duree_vie'), Value(1)) + consommation * _float(elec_factor),
+    }
+
+
+# Secteur -> construction des expressions du UPDATE
+SECTOR_UPDATES = {
+    'vehicles': _vehicle_updates,
+    'buildings': _building_updates,
+    'food': _food_updates,
+    'purchases': _purchase_updates,
+    'numerique': _numerique_updates,
+}
+
+
+def _year_groups(snapshot, sector: str, qs) -> List[Tuple[Optional[List[int]], object]]:
+    """
+    Regroupe les années des saisies par versions de facteurs appliquées :
+    [(années ou None = toutes, facteurs de l'année)].
+    """
+    from apps.core.services.factor_registry import SECTOR_FACTOR_MODELS
+
+    labels = SECTOR_FACTOR_MODELS[sector]
+    if not any(v.factor_model in labels for v in snapshot.versions):
+        return [(None, snapshot.for_year(None))]
+
+    groups = {}
+    for year in qs.order_by().values_list('year', flat=True).distinct():
+        factors = snapshot.for_year(year)
+        groups.setdefault(factors.signature(sector), ([], factors))[0].append(year)
+    return list(groups.values())
+
+
+def recompute_emissions(sectors: Optional[Iterable[str]] = None, years: Optional[Iterable[int]] = None,
+                        group_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """
+    Recalcule les émissions des saisies avec les facteurs en vigueur pour leur année
+    (un UPDATE par secteur et jeu de versions), puis reconstruit les agrégats concernés.
+
+    Args:
+        sectors: Secteurs à recalculer (None = tous)
+        years: Années à recalculer (None = toutes)
+        group_ids: Groupes à recalculer (None = tous)
+
+    Returns:
+        {secteur: nombre de lignes mises à jour}
+    """
+    sectors = list(sectors) if sectors else SECTORS
+    years = list(years) if years else None
+    group_ids = list(group_ids) if group_ids else None
+    snapshot = get_snapshot()
+
+    updated = {}
+    with transaction.atomic():
+        for sector in sectors:
+            qs = get_sector_model(sector).objects.all()
+            if years:
+                qs = qs.filter(year__in=years)
+            if group_ids:
+                qs = qs.filter(group_id__in=group_ids)
+            updated[sector] = 0
+            for group_years, factors in _year_groups(snapshot, sector, qs):
+                target = qs if group_years is None else qs.filter(year__in=group_years)
+                updates = SECTOR_UPDATES[sector](factors)
+                updates['factor_revision'] = Value(factors.revision(sector), output_field=models.IntegerField())
+                updated[sector] += target.update(**updates)
+            logger.info(f"Recalcul '{sector}': {updated[sector]} saisie(s)")
+
+        # update() ne déclenche pas les signaux des saisies
+        rebuild_rollups(sectors=sectors, years=years)
+
+    return updated
+
+
+def recompute_factor_ranges(factor_model: str, ranges: Iterable[Tuple[int, Optional[int]]]) -> Dict[str, int]:
+    """
+    Recalcul incrémental après l'ajout / la modification d'une version de facteur :
+    seules les saisies des secteurs dépendant du modèle de facteurs (index
+    SECTOR_FACTOR_MODELS) et dont l'année tombe dans une des plages sont recalculées.
+
+    Args:
+        factor_model: Modèle de facteurs modifié ('app.Model')
+        ranges: Plages d'années (début, fin incluse ou None = sans limite)
+
+    Returns:
+        {secteur: nombre de lignes mises à jour}
+    """
+    condition = Q()
+    for year_from, year_to in ranges:
+        bounds = Q(year__gte=year_from)
+        if year_to is not None:
+            bounds &= Q(year__lte=year_to)
+        condition |= bounds
+    if not condition:
+        return {}
+
+    updated = {}
+    for sector in sectors_for_factor_model(factor_model):
+        years = list(
+            get_sector_model(sector).objects.filter(condition).order_by().values_list('year', flat=True).distinct()
+        )
+        if years:
+            updated.update(recompute_emissions(sectors=[sector], years=years))
+    return updated
@@ -0,0 +1,170 @@
+"""
+Envoi des emails de rappel.
+La vue enregistre une ReminderCampaign et ses ReminderDelivery (corps déjà rendus) ;
+seule la commande send_reminders envoie, jamais un thread du serveur web (arrêté
+sans prévenir au recyclage d'un worker). L'envoi réutilise une seule connexion SMTP,
+par lots, avec un débit limité, et enregistre le statut de chaque destinataire.
+Une campagne interrompue (serveur injoignable) se termine avec ses destinataires
+restants en échec ; une campagne abandonnée en cours d'envoi est reprise après
+REMINDER_CAMPAIGN_TIMEOUT."""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.services.metrics import REMINDER_CAMPAIGN_DURATION, REMINDER_EMAILS
+
+logger = logging.getLogger(__name__)
+
+
+def render_reminder_bodies(body_template, users, year, url):
+    """
+    Rend les corps de message en une passe : {year} et {url} sont remplacés une fois,
+    seul {user} varie d'un destinataire à l'autre.
+
+    Returns:
+        Liste de (user, corps)
+    """
+    common = body_template.replace('{year}', str(year)).replace('{url}', url)
+    return [(user, common.replace('{user}', user.username)) for user in users]
+
+
+def queue_reminders(subject, body_template, recipients, year, url, created_by=None):
+    """
+    Crée la campagne et une ligne d'envoi par destinataire (statut 'pending').
+
+    Returns:
+        ReminderCampaign créée
+    """
+    from apps.core.models import ReminderCampaign, ReminderDelivery
+
+    users = list(recipients.only('id', 'username', 'email'))
+    campaign = ReminderCampaign.objects.create(subject=subject, created_by=created_by)
+    ReminderDelivery.objects.bulk_create([
+        ReminderDelivery(campaign=campaign, user=user, email=user.email, body=body)
+        for user, body in render_reminder_bodies(body_template, users, year, url)
+    ], batch_size=500)
+    return campaign
+
+
+def _reopen(connection):
+    try:
+        connection.close()
+        connection.open()
+    except Exception as e:
+        logger.error(f"Reconnexion au serveur email impossible: {e}")
+
+
+def dispatch_campaign(campaign, batch_size=None, rate_limit=None, connection=None):
+    """
+    Envoie les rappels en attente d'une campagne sur une seule connexion.
+
+    Args:
+        batch_size: Nombre de messages par lot (statuts enregistrés à chaque lot)
+        rate_limit: Nombre maximum de messages par seconde (0 = illimité)
+        connection: Backend email déjà construit (défaut: get_connection())
+    """
+    from apps.core.models import ReminderCampaign, ReminderDelivery
+
+    batch_size = batch_size or settings.REMINDER_EMAIL_BATCH_SIZE
+    rate_limit = settings.REMINDER_EMAIL_RATE_LIMIT if rate_limit is None else rate_limit
+    connection = connection or get_connection()
+
+    started = time.monotonic()
+    pending = list(campaign.deliveries.filter(status=ReminderDelivery.STATUS_PENDING))
+    try:
+        connection.open()
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            batch_started = time.monotonic()
+
+            for delivery in batch:
+                message = EmailMessage(
+                    subject=campaign.subject,
+                    body=delivery.body,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[delivery.email],
+                    connection=connection,
+                )
+                # Un message à la fois sur la connexion ouverte, pour connaître
+                # le statut exact de chaque destinataire
+                try:
+                    if not connection.send_messages([message]):
+                        raise RuntimeError("Message refusé ou connexion indisponible")
+                    delivery.status = ReminderDelivery.STATUS_SENT
+                    delivery.sent_at = timezone.now()
+                except Exception as e:
+                    logger.error(f"Erreur envoi email à {delivery.email}: {e}")
+                    delivery.status = ReminderDelivery.STATUS_FAILED
+                    delivery.error = str(e)
+                    # La connexion peut être inutilisable après une erreur SMTP
+                    _reopen(connection)
+
+            ReminderDelivery.objects.bulk_update(batch, ['status', 'error', 'sent_at'])
+            for delivery in batch:
+                REMINDER_EMAILS.labels(status=delivery.status).inc()
+
+            if rate_limit:
+                remaining = len(batch) / rate_limit - (time.monotonic() - batch_started)
+                if remaining > 0:
+                    time.sleep(remaining)
+    except Exception as e:
+        # Serveur injoignable ou erreur imprévue : les destinataires restants
+        # passent en échec pour que la campagne ne reste pas 'running'
+        logger.exception(f"Campagne de rappel #{campaign.pk} interrompue")
+        failed = campaign.deliveries.filter(status=ReminderDelivery.STATUS_PENDING).update(
+            status=ReminderDelivery.STATUS_FAILED, error=f"Envoi interrompu: {e}"
+        )
+        REMINDER_EMAILS.labels(status=ReminderDelivery.STATUS_FAILED).inc(failed)
+    finally:
+        try:
+            connection.close()
+        except Exception as e:
+            logger.error(f"Fermeture de la connexion email impossible: {e}")
+
+    deliveries = campaign.deliveries
+    campaign.sent_count = deliveries.filter(status=ReminderDelivery.STATUS_SENT).count()
+    campaign.failed_count = deliveries.filter(status=ReminderDelivery.STATUS_FAILED).count()
+    campaign.status = ReminderCampaign.STATUS_DONE
+    campaign.finished_at = timezone.now()
+    campaign.save(update_fields=['sent_count', 'failed_count', 'status', 'finished_at'])
+    REMINDER_CAMPAIGN_DURATION.observe(time.monotonic() - started)
+    return campaign
+
+
+def claim_next_campaign():
+    """
+    Réserve la plus ancienne campagne à envoyer (passage atomique -> running) :
+    en attente, ou restée 'running' au-delà de REMINDER_CAMPAIGN_TIMEOUT
+    (processus arrêté pendant l'envoi). Une campagne reprise n'envoie que les
+    destinataires encore en attente.
+    """
+    from apps.core.models import ReminderCampaign
+
+    while True:
+        stale_before = timezone.now() - timedelta(seconds=settings.REMINDER_CAMPAIGN_TIMEOUT)
+        campaign = (
+            ReminderCampaign.objects
+            .filter(
+                Q(status=ReminderCampaign.STATUS_PENDING)
+                | Q(status=ReminderCampaign.STATUS_RUNNING, started_at__lt=stale_before)
+            )
+            .order_by('created_at', 'pk')
+            .first()
+        )
+        if campaign is None:
+            return None
+        if campaign.status == ReminderCampaign.STATUS_RUNNING:
+            logger.warning(f"Campagne de rappel #{campaign.pk} bloquée depuis {campaign.started_at}: reprise")
+        # Garde sur l'état lu : un autre processus qui a réservé la campagne entre-temps l'a modifié
+        claimed = ReminderCampaign.objects.filter(
+            pk=campaign.pk, status=campaign.status, started_at=campaign.started_at
+        ).update(status=ReminderCampaign.STATUS_RUNNING, started_at=timezone.now())
+        if claimed:
+            campaign.refresh_from_db()
+            return campaign
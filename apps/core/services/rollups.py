@@ -0,0 +1,211 @@
+"""
+Service de consolidation des émissions.
+Maintient la table EmissionRollup (totaux par secteur, année, groupe et sous-catégorie)
+et expose les lectures utilisées par le dashboard, les statistiques et la sensibilisation.
+"""
+
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+import logging
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from apps.core.services.data_version import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+
+# Secteur -> (modèle source, champ utilisé comme sous-catégorie ou None)
+SECTOR_SOURCES = {
+    'vehicles': ('vehicles.VehicleData', 'calculation_method'),
+    'buildings': ('batiment.BuildingEnergyData', None),
+    'food': ('alimentation.FoodEntry', None),
+    'purchases': ('purchases.PurchaseData', 'category'),
+    'numerique': ('numerique.EquipementNumerique', 'type_equipement'),
+}
+
+SECTORS = list(SECTOR_SOURCES.keys())
+
+
+def get_sector_model(sector: str):
+    """Retourne la classe de modèle source d'un secteur."""
+    return apps.get_model(SECTOR_SOURCES[sector][0])
+
+
+def get_sector_for_model(model) -> Optional[str]:
+    """Retourne la clé de secteur associée à un modèle de saisie (ou None)."""
+    label = model._meta.label
+    for sector, (model_label, _field) in SECTOR_SOURCES.items():
+        if model_label == label:
+            return sector
+    return None
+
+
+def get_rollup_key(sector: str, instance):
+    """Clé (year, group_id, subcategory) d'une saisie."""
+    field = SECTOR_SOURCES[sector][1]
+    subcategory = getattr(instance, field) if field else ''
+    return (instance.year, instance.group_id, subcategory or '')
+
+
+def _to_decimal(value) -> Decimal:
+    # Sum() sur un FloatField (numérique) renvoie un float
+    if value is None:
+        return Decimal('0')
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return round(value, 3)
+
+
+def refresh_rollup(sector: str, year, group_id, subcategory: str = ''):
+    """
+    Recalcule une cellule de la table d'agrégats depuis la table source.
+    Une seule requête d'agrégat, limitée à (année, groupe, sous-catégorie).
+    """
+    from apps.core.models import EmissionRollup
+
+    model = get_sector_model(sector)
+    field = SECTOR_SOURCES[sector][1]
+
+    qs = model.objects.filter(year=year, group_id=group_id)
+    if field:
+        qs = qs.filter(**{field: subcategory})
+    agg = qs.aggregate(total=Sum('total_co2_kg'), count=Count('pk'))
+
+    lookup = {'sector': sector, 'year': year, 'group_id': group_id, 'subcategory': subcategory}
+    if not agg['count']:
+        EmissionRollup.objects.filter(**lookup).delete()
+        return None
+
+    rollup, _created = EmissionRollup.objects.update_or_create(
+        **lookup,
+        defaults={
+            'total_co2_kg': _to_decimal(agg['total']),
+            'entry_count': agg['count'],
+        }
+    )
+    return rollup
+
+
+def rebuild_rollups(sectors: Optional[Iterable[str]] = None, years: Optional[Iterable[int]] = None) -> int:
+    """
+    Reconstruit entièrement les agrégats (un GROUP BY par secteur).
+    À utiliser après des écritures en masse qui contournent les signaux
+    (bulk_create, queryset.update...).
+
+    Returns:
+        Nombre de lignes d'agrégats écrites
+    """
+    from apps.core.models import EmissionRollup
+
+    sectors = list(sectors) if sectors else SECTORS
+    years = list(years) if years else None
+    written = 0
+
+    with transaction.atomic():
+        for sector in sectors:
+            model = get_sector_model(sector)
+            field = SECTOR_SOURCES[sector][1]
+
+            existing = EmissionRollup.objects.filter(sector=sector)
+            source = model.objects.all()
+            if years:
+                existing = existing.filter(year__in=years)
+                source = source.filter(year__in=years)
+            existing.delete()
+
+            group_by = ['year', 'group_id'] + ([field] if field else [])
+            rows = (
+                source.order_by()
+                .values(*group_by)
+                .annotate(total=Sum('total_co2_kg'), count=Count('pk'))
+            )
+            objs = [
+                EmissionRollup(
+                    sector=sector,
+                    year=row['year'],
+                    group_id=row['group_id'],
+                    subcategory=(row[field] or '') if field else '',
+                    total_co2_kg=_to_decimal(row['total']),
+                    entry_count=row['count'],
+                )
+                for row in rows
+            ]
+            EmissionRollup.objects.bulk_create(objs, batch_size=500)
+            written += len(objs)
+            logger.info(f"Agrégats '{sector}': {len(objs)} ligne(s)")
+
+        bump_data_version()
+
+    return written
+
+
+def _scoped(qs, group_ids=None):
+    if group_ids is not None:
+        qs = qs.filter(group_id__in=list(group_ids))
+    return qs
+
+
+def get_sector_totals(year: Optional[int] = None, group_ids=None) -> Dict[str, float]:
+    """
+    Totaux CO2 (kg) par secteur pour une année (year=None => toutes années).
+    group_ids=None => vue globale, sinon limité aux groupes donnés.
+    """
+    from apps.core.models import EmissionRollup
+
+    totals = {sector: 0.0 for sector in SECTORS}
+    qs = EmissionRollup.objects.all()
+    if year is not None:
+        qs = qs.filter(year=year)
+    rows = (
+        _scoped(qs, group_ids)
+        .order_by()
+        .values('sector')
+        .annotate(total=Sum('total_co2_kg'))
+    )
+    for row in rows:
+        totals[row['sector']] = float(row['total'] or 0)
+    return totals
+
+
+def get_totals_by_year(group_ids=None) -> Dict[int, Dict[str, float]]:
+    """Totaux CO2 (kg) par année puis par secteur: {year: {sector: total}}."""
+    from apps.core.models import EmissionRollup
+
+    result = {}
+    rows = (
+        _scoped(EmissionRollup.objects.all(), group_ids)
+        .order_by()
+        .values('year', 'sector')
+        .annotate(total=Sum('total_co2_kg'))
+    )
+    for row in rows:
+        year_totals = result.setdefault(row['year'], {sector: 0.0 for sector in SECTORS})
+        year_totals[row['sector']] = float(row['total'] or 0)
+    return result
+
+
+def get_subcategory_totals(sector: str, group_ids=None) -> Dict[int, Dict[str, float]]:
+    """Totaux CO2 (kg) d'un secteur par année puis par sous-catégorie: {year: {subcategory: total}}."""
+    from apps.core.models import EmissionRollup
+
+    result = {}
+    rows = (
+        _scoped(EmissionRollup.objects.filter(sector=sector), group_ids)
+        .order_by()
+        .values('year', 'subcategory')
+        .annotate(total=Sum('total_co2_kg'))
+    )
+    for row in rows:
+        result.setdefault(row['year'], {})[row['subcategory']] = float(row['total'] or 0)
+    return result
+
+
+def get_entry_count(sector: str, group_ids=None) -> int:
+    """Nombre total de saisies d'un secteur (toutes années confondues)."""
+    from apps.core.models import EmissionRollup
+
+    qs = _scoped(EmissionRollup.objects.filter(sector=sector), group_ids)
+    return qs.aggregate(count=Sum('entry_count'))['count'] or 0
@@ -0,0 +1,174 @@
+"""
+Service d'agrégation pour la page Statistiques.
+Calcule les totaux empilés et les détails par secteur (doughnuts) avec un
+GROUP BY par secteur côté base, au lieu d'itérer sur chaque saisie en Python.
+"""
+
+from typing import Dict, List, Optional
+
+from django.db.models import DecimalField, F, Q, Sum
+
+from apps.core.services.rollups import get_subcategory_totals, get_totals_by_year
+
+
+DECIMAL = DecimalField(max_digits=20, decimal_places=6)
+
+BUILDING_PARTS = {
+    'Électricité': ('electricity_kwh', 'electricity_factor'),
+    'Gaz Naturel': ('gas_kwh', 'gas_factor'),
+    'Réseau Chaleur': ('heating_network_kwh', 'heating_network_factor'),
+    'Climatisation': ('cooling_kwh', 'cooling_factor'),
+}
+
+# Libellé -> [(champ nombre de repas, code facteur)]
+FOOD_PARTS = {
+    'Bœuf': [('beef_meals', 'beef')],
+    'Porc': [('pork_meals', 'pork')],
+    'Volaille/Poisson': [('poultry_fish_meals', 'poultry_fish')],
+    'Végétarien': [('vegetarian_meals', 'vegetarian')],
+    'Pique-nique': [('picnic_meat_meals', 'picnic_meat'), ('picnic_no_meat_meals', 'picnic_veg')],
+}
+
+
+def _float(value) -> float:
+    return float(value or 0)
+
+
+def _scoped(qs, group_ids=None):
+    if group_ids is not None:
+        qs = qs.filter(group_id__in=list(group_ids))
+    return qs
+
+
+def get_building_breakdown(group_ids=None) -> Dict[int, Dict[str, float]]:
+    """Part de chaque énergie par année: Sum(conso × facteur historique de la ligne)."""
+    from apps.batiment.models import BuildingEnergyData
+
+    annotations = {
+        f'part_{i}': Sum(F(kwh) * F(factor), output_field=DECIMAL)
+        for i, (kwh, factor) in enumerate(BUILDING_PARTS.values())
+    }
+    rows = _scoped(BuildingEnergyData.objects.all(), group_ids).order_by().values('year').annotate(**annotations)
+
+    return {
+        row['year']: {
+            label: _float(row[f'part_{i}'])
+            for i, label in enumerate(BUILDING_PARTS)
+        }
+        for row in rows
+    }
+
+
+def get_vehicle_breakdown(group_ids=None) -> Dict[int, Dict[str, float]]:
+    """Essence / Gazole (méthode carburant) et total méthode distance par année."""
+    from apps.vehicles.models import VehicleData
+
+    fuel = Q(calculation_method='fuel')
+    rows = (
+        _scoped(VehicleData.objects.all(), group_ids)
+        .order_by()
+        .values('year')
+        .annotate(
+            essence=Sum('essence_co2_kg', filter=fuel),
+            gazole=Sum('gazole_co2_kg', filter=fuel),
+            distance=Sum('total_co2_kg', filter=~fuel),
+        )
+    )
+    return {
+        row['year']: {
+            'Essence': _float(row['essence']),
+            'Gazole': _float(row['gazole']),
+            'Distance (Mixte)': _float(row['distance']),
+        }
+        for row in rows
+    }
+
+
+def get_food_breakdown(group_ids=None) -> Dict[int, Dict[str, float]]:
+    """Nombre de repas sommé par année, valorisé avec les facteurs alimentation courants."""
+    from apps.alimentation.models import FoodEntry
+    from apps.core.services.factor_registry import get_factor_values
+
+    factors = {code: float(value) for code, value in get_factor_values('alimentation.FoodEmissionFactor', 'kg_co2_per_meal').items()}
+    meal_fields = [field for parts in FOOD_PARTS.values() for field, _code in parts]
+    rows = (
+        _scoped(FoodEntry.objects.all(), group_ids)
+        .order_by()
+        .values('year')
+        .annotate(**{field: Sum(field) for field in meal_fields})
+    )
+    return {
+        row['year']: {
+            label: sum((row[field] or 0) * factors.get(code, 0) for field, code in parts)
+            for label, parts in FOOD_PARTS.items()
+        }
+        for row in rows
+    }
+
+
+def _labelled(by_year: Dict[int, Dict[str, float]], labels: Dict[str, str]) -> Dict[int, Dict[str, float]]:
+    result = {}
+    for year, values in by_year.items():
+        breakdown = result.setdefault(year, {})
+        for code, total in values.items():
+            label = labels.get(code, code)
+            breakdown[label] = breakdown.get(label, 0) + total
+    return result
+
+
+def get_purchase_breakdown(group_ids=None) -> Dict[int, Dict[str, float]]:
+    """Total par catégorie d'achat (libellé) et par année."""
+    from apps.purchases.models import PurchaseData
+
+    return _labelled(get_subcategory_totals('purchases', group_ids), dict(PurchaseData.CATEGORY_CHOICES))
+
+
+def get_numerique_breakdown(group_ids=None) -> Dict[int, Dict[str, float]]:
+    """Total par type d'équipement (libellé simplifié) et par année."""
+    from apps.numerique.models import EquipementNumerique
+
+    labels = {}
+    for _group_name, choices in EquipementNumerique.TYPE_CHOICES:
+        for code, label in choices:
+            labels[code] = label.split('(')[0].strip() if '(' in label else label
+    return _labelled(get_subcategory_totals('numerique', group_ids), labels)
+
+
+def build_statistics_data(group_ids: Optional[List[int]] = None) -> Dict:
+    """
+    Données de la page Statistiques (même forme JSON que l'API historique):
+    - years: années disponibles triées
+    - stacked_data: {secteur: [total par année]}
+    - details_data: {année: {secteur: {libellé: valeur}}}
+    """
+    totals_by_year = get_totals_by_year(group_ids)
+    sorted_years = sorted(totals_by_year.keys())
+    if not sorted_years:
+        return {'years': [], 'stacked_data': {}, 'details_data': {}}
+
+    stacked_data = {
+        sector: [totals_by_year[year][sector] for year in sorted_years]
+        for sector in ['vehicles', 'buildings', 'food', 'purchases', 'numerique']
+    }
+
+    breakdowns = {
+        'buildings': (get_building_breakdown(group_ids), dict.fromkeys(BUILDING_PARTS, 0)),
+        'vehicles': (get_vehicle_breakdown(group_ids), dict.fromkeys(['Essence', 'Gazole', 'Distance (Mixte)'], 0)),
+        'food': (get_food_breakdown(group_ids), dict.fromkeys(FOOD_PARTS, 0)),
+        'purchases': (get_purchase_breakdown(group_ids), {}),
+        'numerique': (get_numerique_breakdown(group_ids), {}),
+    }
+
+    details_data = {
+        year: {
+            sector: by_year.get(year, dict(empty))
+            for sector, (by_year, empty) in breakdowns.items()
+        }
+        for year in sorted_years
+    }
+
+    return {
+        'years': sorted_years,
+        'stacked_data': stacked_data,
+        'details_data': details_data,
+    }
@@ -0,0 +1,72 @@
+"""
+Groupes d'un utilisateur, pour limiter les saisies visibles par un agent.
+
+Les groupes (identifiant, nom) sont lus une fois puis gardés dans le cache
+(invalidé par les signaux m2m_changed de User.groups, le renommage et la
+suppression d'un groupe, voir apps.core.signals) et sur l'objet utilisateur de
+la requête : les vues filtrent par group_id__in=<ids> et le menu latéral lit les
+noms (context processor), sans requête ni sous-requête sur auth_user_groups.
+
+Avec un LocMemCache (un cache par processus), l'invalidation n'atteindrait pas les
+autres workers : les groupes sont alors relus à chaque requête.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+CACHE_KEY = 'user_groups:{user_id}'
+
+
+def _cache_key(user_id) -> str:
+    return CACHE_KEY.format(user_id=user_id)
+
+
+def _cache_is_shared() -> bool:
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def _get_memberships(user) -> List[Tuple[int, str]]:
+    """[(id, nom)] des groupes de l'utilisateur, par identifiant croissant (ordre de user.groups.first())."""
+    if not user.is_authenticated:
+        return []
+    # request.user : un même objet pour toute la requête
+    memberships = getattr(user, '_group_memberships', None)
+    if memberships is None:
+        shared = _cache_is_shared()
+        key = _cache_key(user.pk)
+        memberships = cache.get(key) if shared else None
+        if memberships is None:
+            memberships = list(user.groups.order_by('id').values_list('id', 'name'))
+            if shared:
+                cache.set(key, memberships, getattr(settings, 'USER_GROUPS_CACHE_TIMEOUT', 3600))
+        user._group_memberships = memberships
+    return memberships
+
+
+def get_group_ids(user) -> List[int]:
+    """Identifiants des groupes de l'utilisateur, triés (le premier est le groupe de rattachement des saisies)."""
+    return [group_id for group_id, _name in _get_memberships(user)]
+
+
+def get_group_names(user) -> List[str]:
+    """Noms des groupes de l'utilisateur, dans l'ordre de get_group_ids."""
+    return [name for _group_id, name in _get_memberships(user)]
+
+
+def get_primary_group_id(user) -> Optional[int]:
+    """Groupe affecté aux saisies créées par l'utilisateur (comme user.groups.first()), ou None."""
+    group_ids = get_group_ids(user)
+    return group_ids[0] if group_ids else None
+
+
+def invalidate_group_ids(user_ids: Iterable[int]):
+    """Oublie les groupes mémorisés : tout de suite, et de nouveau à la validation de la transaction."""
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        cache.delete_many(keys)
+        # Une requête concurrente a pu relire l'ancienne appartenance avant la validation
+        transaction.on_commit(lambda: cache.delete_many(keys))
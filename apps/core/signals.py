@@ -0,0 +1,144 @@
+"""
+Signaux de maintenance de la table EmissionRollup et de la version des données.
+Chaque création / modification / suppression d'une saisie recalcule
+uniquement les cellules d'agrégats concernées et incrémente DataVersion.
+Chaque modification d'un facteur invalide aussi le registre des facteurs ;
+celle d'une version de l'historique recalcule en plus les saisies des années couvertes.
+Les changements d'appartenance aux groupes invalident les groupes mémorisés des utilisateurs.
+"""
+
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import m2m_changed, pre_delete, pre_save, post_save, post_delete
+
+from apps.core.services import factor_registry, rollups
+from apps.core.services.data_version import bump_data_version
+from apps.core.services.user_groups import invalidate_group_ids
+
+
+def _remember_previous_key(sender, instance, raw=False, **kwargs):
+    """Mémorise l'ancienne clé d'agrégat (année/groupe/sous-catégorie peuvent changer)."""
+    if raw or instance.pk is None:
+        return
+    sector = rollups.get_sector_for_model(sender)
+    field = rollups.SECTOR_SOURCES[sector][1]
+    values = ['year', 'group_id'] + ([field] if field else [])
+    previous = sender.objects.filter(pk=instance.pk).values_list(*values).first()
+    if previous:
+        year, group_id = previous[0], previous[1]
+        subcategory = (previous[2] or '') if field else ''
+        instance._rollup_previous_key = (year, group_id, subcategory)
+
+
+def _refresh_after_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sector = rollups.get_sector_for_model(sender)
+    keys = {rollups.get_rollup_key(sector, instance)}
+    previous = getattr(instance, '_rollup_previous_key', None)
+    if previous:
+        keys.add(previous)
+        del instance._rollup_previous_key
+    for key in keys:
+        rollups.refresh_rollup(sector, *key)
+    bump_data_version()
+
+
+def _refresh_after_delete(sender, instance, **kwargs):
+    sector = rollups.get_sector_for_model(sender)
+    rollups.refresh_rollup(sector, *rollups.get_rollup_key(sector, instance))
+    bump_data_version()
+
+
+def _bump_after_factor_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_data_version()
+
+
+def _invalidate_factor_registry(sender, instance, **kwargs):
+    # Y compris pour loaddata (raw) : les facteurs en base ont changé
+    factor_registry.invalidate()
+
+
+def _remember_previous_range(sender, instance, raw=False, **kwargs):
+    """Mémorise l'ancienne plage d'une version (ses saisies sont aussi à recalculer)."""
+    if raw or instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).values_list('factor_model', 'valid_from_year', 'valid_to_year').first()
+    if previous:
+        instance._previous_range = previous
+
+
+def _recompute_version_ranges(ranges):
+    from apps.core.services.recompute import recompute_factor_ranges
+
+    by_model = {}
+    for factor_model, year_from, year_to in ranges:
+        by_model.setdefault(factor_model, set()).add((year_from, year_to))
+    for factor_model, model_ranges in by_model.items():
+        recompute_factor_ranges(factor_model, model_ranges)
+
+
+def _factor_version_changed(sender, instance, raw=False, **kwargs):
+    factor_registry.invalidate()
+    if raw:
+        return
+    ranges = {(instance.factor_model, instance.valid_from_year, instance.valid_to_year)}
+    previous = getattr(instance, '_previous_range', None)
+    if previous:
+        ranges.add(previous)
+        del instance._previous_range
+    bump_data_version()
+    # Après validation : le recalcul lit le registre rechargé
+    transaction.on_commit(partial(_recompute_version_ranges, ranges))
+
+
+def _user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # user.groups.add/remove/clear
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.__dict__.pop('_group_memberships', None)
+            invalidate_group_ids([instance.pk])
+    elif action == 'pre_clear':
+        # group.user_set.clear() : pk_set n'est pas fourni
+        invalidate_group_ids(instance.user_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_group_ids(pk_set)
+
+
+def _group_changed(sender, instance, created=False, raw=False, **kwargs):
+    # Renommage (noms affichés dans le menu) ; suppression : liens supprimés en cascade, sans m2m_changed
+    if not created and not raw:
+        invalidate_group_ids(instance.user_set.values_list('pk', flat=True))
+
+
+def connect_signals():
+    for sector in rollups.SECTORS:
+        model = rollups.get_sector_model(sector)
+        pre_save.connect(_remember_previous_key, sender=model, dispatch_uid=f'rollup_pre_save_{sector}')
+        post_save.connect(_refresh_after_save, sender=model, dispatch_uid=f'rollup_post_save_{sector}')
+        post_delete.connect(_refresh_after_delete, sender=model, dispatch_uid=f'rollup_post_delete_{sector}')
+
+    # Modèles de facteurs : leur modification change aussi les statistiques affichées
+    for label in factor_registry.FACTOR_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_bump_after_factor_change, sender=model, dispatch_uid=f'data_version_post_save_{label}')
+        post_delete.connect(_bump_after_factor_change, sender=model, dispatch_uid=f'data_version_post_delete_{label}')
+        post_save.connect(_invalidate_factor_registry, sender=model, dispatch_uid=f'factor_registry_post_save_{label}')
+        post_delete.connect(_invalidate_factor_registry, sender=model, dispatch_uid=f'factor_registry_post_delete_{label}')
+
+    # Historique des facteurs : recalcul limité aux années des versions modifiées
+    version_model = apps.get_model('core.EmissionFactorVersion')
+    pre_save.connect(_remember_previous_range, sender=version_model, dispatch_uid='factor_version_pre_save')
+    post_save.connect(_factor_version_changed, sender=version_model, dispatch_uid='factor_version_post_save')
+    post_delete.connect(_factor_version_changed, sender=version_model, dispatch_uid='factor_version_post_delete')
+
+    # Appartenance aux groupes (périmètre des agents)
+    user_model = apps.get_model('auth.User')
+    m2m_changed.connect(_user_groups_changed, sender=user_model.groups.through, dispatch_uid='user_groups_changed')
+    group_model = apps.get_model('auth.Group')
+    post_save.connect(_group_changed, sender=group_model, dispatch_uid='user_groups_group_saved')
+    pre_delete.connect(_group_changed, sender=group_model, dispatch_uid='user_groups_group_deleted')
@@ -1,3 +1,533 @@
-from django.test import TestCase
+import re
+import unittest
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.mail.backends.locmem import EmailBackend as LocMemEmailBackend
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.services.export_jobs import claim_next_job, request_export
+from apps.core.services.instrumentation import fingerprint
+from apps.core.services.reminders import claim_next_campaign, dispatch_campaign, queue_reminders
+from apps.core.services.user_groups import get_group_ids
+from apps.core.services.rollups import SECTORS, SECTOR_SOURCES, get_sector_model
+
+
+class QueryPlanTests(TestCase):
+    """
+    Plans d'exécution (EXPLAIN) des requêtes les plus fréquentes sur les saisies :
+    échoue si l'une d'elles parcourt toute la table au lieu d'un index.
+
+    SQLite par défaut ; PostgreSQL avec DB_ENGINE=postgresql (les parcours séquentiels
+    y sont désactivés pour le test : sur des tables de test quasi vides le planificateur
+    les choisirait toujours, il n'y revient que si aucun index n'est utilisable).
+    """
+
+    YEAR = 2026
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='Direction test')
+        cls.user = User.objects.create_user('agent_plan', password='x')
+        cls.user.groups.add(cls.group)
+
+    def setUp(self):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise unittest.SkipTest(f"EXPLAIN non vérifié pour {connection.vendor}")
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # SET LOCAL : limité à la transaction du test
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertNoFullScan(self, queryset, label):
+        table = queryset.model._meta.db_table
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            # "SCAN table" sans "USING ... INDEX" = parcours complet de la table
+            full_scan = re.search(rf'SCAN (TABLE )?{table}\b(?!.*USING)', plan)
+        else:
+            full_scan = re.search(rf'Seq Scan on {table}\b', plan)
+        self.assertIsNone(full_scan, f"{label} : parcours complet de {table}\n{plan}")
+
+    def hot_querysets(self, sector):
+        model = get_sector_model(sector)
+        scoped = model.objects.filter(group__in=self.user.groups.all())
+        querysets = {
+            # Listes (EntryListPage) : périmètre des groupes, tri par année / date
+            'liste groupe': scoped.order_by('-year', '-created_at', '-id')[:51],
+            'liste groupe + année': scoped.filter(year=self.YEAR).order_by('-year', '-created_at', '-id')[:51],
+            'liste globale': model.objects.order_by('-year', '-created_at', '-id')[:51],
+            # Statistiques et recalculs limités à des années
+            'année': model.objects.filter(year=self.YEAR),
+            'années': model.objects.filter(year__in=[self.YEAR - 1, self.YEAR]),
+            # Cellule d'agrégat (refresh_rollup)
+            'agrégat année + groupe': model.objects.filter(year=self.YEAR, group_id=self.group.pk),
+        }
+        field = SECTOR_SOURCES[sector][1]
+        if field:
+            querysets['répartition par sous-catégorie'] = (
+                model.objects.filter(year=self.YEAR).values(field).annotate(total=Sum('total_co2_kg'))
+            )
+        return querysets
+
+    def test_sector_queries_use_indexes(self):
+        for sector in SECTORS:
+            for label, queryset in self.hot_querysets(sector).items():
+                with self.subTest(sector=sector, query=label):
+                    self.assertNoFullScan(queryset, f"{sector} / {label}")
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True, REQUEST_METRICS_SAMPLE_RATE=1.0, REQUEST_METRICS_SERVER_TIMING=True,
+                   REQUEST_METRICS_SLOW_MS=60000, REQUEST_METRICS_DUPLICATE_THRESHOLD=5)
+class RequestMetricsMiddlewareTests(TestCase):
+    """En-tête Server-Timing et journalisation de RequestMetricsMiddleware."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin_metrics', 'admin@demo.com', 'x')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('dashboard'))
+        header = response['Server-Timing']
+        self.assertRegex(header, r'total;dur=[\d.]+')
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="SQL x[1-9]\d*"')
+        self.assertRegex(header, r'tpl;dur=[\d.]+')
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_request_has_no_header(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(REQUEST_METRICS_SLOW_MS=0)
+    def test_slow_request_logged_as_warning(self):
+        with self.assertLogs('apps.core.middleware', 'WARNING') as logs:
+            self.client.get(reverse('dashboard'))
+        self.assertIn('path=/', logs.output[0])
+        self.assertIn('sql_queries=', logs.output[0])
+
+    def test_fingerprint_groups_in_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s, %s)'),
+            fingerprint('SELECT 1 FROM t WHERE id IN (%s)'),
+        )
+
+
+class MetricsViewTests(TestCase):
+    """Accès à /metrics/ et contenu au format texte Prometheus."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff_metrics', password='x', is_staff=True)
+        cls.agent = User.objects.create_user('agent_metrics', password='x')
+
+    def test_requires_staff(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.client.force_login(self.agent)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    def test_staff_sees_request_metrics(self):
+        self.client.force_login(self.staff)
+        self.client.get(reverse('dashboard'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('bilan_http_request_duration_seconds_bucket', response.content.decode())
+        self.assertIn('view="dashboard"', response.content.decode())
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_bearer_token(self):
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer autre').status_code, 403)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+
+class UserGroupsTests(TestCase):
+    """Groupes mémorisés des utilisateurs (get_group_ids) et leur invalidation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group_a = Group.objects.create(name='Direction A')
+        cls.group_b = Group.objects.create(name='Direction B')
+        cls.user = User.objects.create_user('agent_groups', password='x')
+        cls.user.groups.add(cls.group_a)
+
+    def setUp(self):
+        cache.clear()
+
+    def fresh_ids(self):
+        # Nouvel objet : comme une nouvelle requête
+        return get_group_ids(User.objects.get(pk=self.user.pk))
+
+    def test_cached_between_requests(self):
+        self.assertEqual(self.fresh_ids(), [self.group_a.pk])
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_group_ids(user), [self.group_a.pk])
+            get_group_ids(user)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_not_cached_in_process_local_cache(self):
+        self.fresh_ids()
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_group_ids(user), [self.group_a.pk])
+            get_group_ids(user)
+
+    def test_invalidated_by_membership_changes(self):
+        self.fresh_ids()
+        self.user.groups.add(self.group_b)
+        self.assertEqual(self.fresh_ids(), [self.group_a.pk, self.group_b.pk])
+        self.group_a.user_set.remove(self.user)
+        self.assertEqual(self.fresh_ids(), [self.group_b.pk])
+        self.group_b.user_set.clear()
+        self.assertEqual(self.fresh_ids(), [])
+        self.group_a.user_set.add(self.user)
+        self.assertEqual(self.fresh_ids(), [self.group_a.pk])
+
+    def test_sidebar_names_follow_rename(self):
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse('dashboard')), 'Agent (Direction A)')
+        self.group_a.name = 'Direction A2'
+        self.group_a.save()
+        self.assertContains(self.client.get(reverse('dashboard')), 'Agent (Direction A2)')
+
+    def test_invalidated_by_group_deletion(self):
+        self.fresh_ids()
+        self.group_a.delete()
+        self.assertEqual(self.fresh_ids(), [])
+
+    def test_list_view_scoped_to_groups(self):
+        from apps.purchases.models import PurchaseData
+
+        other = User.objects.create_user('agent_other', password='x')
+        PurchaseData.objects.create(user=self.user, group=self.group_a, year=2026, service='A',
+                                    category='insurance', description='Visible', amount_euros=100)
+        PurchaseData.objects.create(user=other, group=self.group_b, year=2026, service='B',
+                                    category='insurance', description='Cachee', amount_euros=100)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('purchase_list'))
+        self.assertContains(response, 'Visible')
+        self.assertNotContains(response, 'Cachee')
+
+
+class CountingEmailBackend(LocMemEmailBackend):
+    """Backend locmem qui compte les ouvertures de connexion et peut refuser des adresses."""
+
+    def __init__(self, refused=(), fail_open=False, **kwargs):
+        super().__init__(**kwargs)
+        self.refused = set(refused)
+        self.fail_open = fail_open
+        self.opened = 0
+
+    def open(self):
+        if self.fail_open:
+            raise ConnectionRefusedError("Serveur SMTP injoignable")
+        self.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        if any(address in self.refused for message in messages for address in message.to):
+            raise ValueError("Destinataire refusé")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', REMINDER_EMAIL_RATE_LIMIT=0)
+class ReminderDispatchTests(TestCase):
+    """Envoi des campagnes de rappel (queue_reminders, dispatch_campaign, reprise)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            User.objects.create_user(f'agent_rappel{i}', f'agent{i}@demo.com', 'x')
+        cls.recipients = User.objects.filter(username__startswith='agent_rappel').order_by('username')
+
+    def queue(self):
+        return queue_reminders(
+            'Rappel', 'Bonjour {user}, saisissez {year} sur {url}', self.recipients, 2026, 'http://bilan.test/'
+        )
+
+    def statuses(self, campaign):
+        return dict(campaign.deliveries.values_list('email', 'status'))
+
+    def test_single_connection_and_statuses(self):
+        from apps.core.models import ReminderCampaign
+
+        campaign = self.queue()
+        backend = CountingEmailBackend(refused={'agent2@demo.com'})
+        with self.assertLogs('apps.core.services.reminders', 'ERROR'):
+            dispatch_campaign(campaign, batch_size=2, connection=backend)
+
+        # Une ouverture pour la campagne, une réouverture après le refus
+        self.assertEqual(backend.opened, 2)
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(mail.outbox[0].body, 'Bonjour agent_rappel0, saisissez 2026 sur http://bilan.test/')
+        statuses = self.statuses(campaign)
+        self.assertEqual(statuses.pop('agent2@demo.com'), 'failed')
+        self.assertEqual(set(statuses.values()), {'sent'})
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.status, campaign.sent_count, campaign.failed_count),
+                         (ReminderCampaign.STATUS_DONE, 4, 1))
+        self.assertEqual(campaign.deliveries.get(email='agent2@demo.com').error, 'Destinataire refusé')
+
+    def test_batches_throttled(self):
+        campaign = self.queue()
+        with mock.patch('apps.core.services.reminders.time.sleep') as sleep:
+            dispatch_campaign(campaign, batch_size=2, rate_limit=1, connection=CountingEmailBackend())
+        # 5 messages en lots de 2 à 1 message/seconde : pauses d'environ 2, 2 et 1 s
+        waits = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(waits), 3)
+        for wait, expected in zip(waits, [2, 2, 1]):
+            self.assertAlmostEqual(wait, expected, delta=0.5)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_connection_failure_finishes_campaign(self):
+        from apps.core.models import ReminderCampaign
+
+        campaign = self.queue()
+        with self.assertLogs('apps.core.services.reminders', 'ERROR'):
+            dispatch_campaign(campaign, connection=CountingEmailBackend(fail_open=True))
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, ReminderCampaign.STATUS_DONE)
+        self.assertEqual(campaign.failed_count, 5)
+        self.assertEqual(set(self.statuses(campaign).values()), {'failed'})
+        self.assertIn('Serveur SMTP injoignable', campaign.deliveries.first().error)
+        self.assertEqual(mail.outbox, [])
+
+    @override_settings(REMINDER_CAMPAIGN_TIMEOUT=600)
+    def test_stale_running_campaign_reclaimed(self):
+        from apps.core.models import ReminderCampaign, ReminderDelivery
+
+        campaign = self.queue()
+        ReminderCampaign.objects.filter(pk=campaign.pk).update(
+            status=ReminderCampaign.STATUS_RUNNING, started_at=timezone.now() - timedelta(seconds=60)
+        )
+        self.assertIsNone(claim_next_campaign())
+
+        # Processus arrêté après un premier envoi
+        campaign.deliveries.filter(email='agent0@demo.com').update(status=ReminderDelivery.STATUS_SENT)
+        ReminderCampaign.objects.filter(pk=campaign.pk).update(started_at=timezone.now() - timedelta(hours=1))
+        with self.assertLogs('apps.core.services.reminders', 'WARNING'):
+            claimed = claim_next_campaign()
+        self.assertEqual(claimed.pk, campaign.pk)
+        self.assertGreater(claimed.started_at, timezone.now() - timedelta(seconds=60))
+
+        dispatch_campaign(claimed, connection=CountingEmailBackend())
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(set(self.statuses(campaign).values()), {'sent'})
+
+
+@override_settings(EXPORT_JOB_TIMEOUT=600)
+class ExportJobTests(TestCase):
+    """File des exports en tâche de fond : réutilisation et reprise des jobs abandonnés."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff_exports', password='x', is_staff=True)
+
+    def start(self, job, seconds_ago):
+        from apps.core.models import ExportJob
+
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJob.STATUS_RUNNING, started_at=timezone.now() - timedelta(seconds=seconds_ago)
+        )
+
+    def test_running_job_reused_until_timeout(self):
+        job = request_export('statistics_xlsx', self.staff)
+        self.start(job, 60)
+        self.assertEqual(request_export('statistics_xlsx', self.staff).pk, job.pk)
+        self.start(job, 3600)
+        self.assertNotEqual(request_export('statistics_xlsx', self.staff).pk, job.pk)
+
+    def test_stale_running_job_reclaimed(self):
+        job = request_export('statistics_xlsx', self.staff)
+        self.start(job, 60)
+        self.assertIsNone(claim_next_job())
+        self.start(job, 3600)
+        with self.assertLogs('apps.core.services.export_jobs', 'WARNING'):
+            claimed = claim_next_job()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertGreater(claimed.started_at, timezone.now() - timedelta(seconds=60))
+        self.assertIsNone(claim_next_job())
+
+
+class GenerateLoadDataTests(TestCase):
+    """Données de charge générées sur une base neuve (facteurs non initialisés)."""
+
+    def test_without_factors(self):
+        from io import StringIO
+
+        from django.apps import apps
+
+        from apps.core.services import factor_registry
+        from apps.core.services.factor_registry import FACTOR_MODELS
+
+        for label in FACTOR_MODELS:
+            apps.get_model(label).objects.all().delete()
+        factor_registry.invalidate()
+
+        call_command('generate_load_data', '--years', '2026', '--groups', '2', stdout=StringIO())
+
+        for sector in SECTORS:
+            self.assertTrue(get_sector_model(sector).objects.filter(year=2026).exists(), sector)
+        buildings = get_sector_model('buildings').objects.filter(year=2026)
+        self.assertTrue(all(entry.electricity_factor == Decimal('0.052') for entry in buildings))
+        self.assertGreater(buildings.aggregate(total=Sum('total_co2_kg'))['total'], 0)
+
+
+class UpdateAdemeFactorsTests(TestCase):
+    """Téléchargement conditionnel de la Base Carbone (update_ademe_factors)."""
+
+    def test_unchanged_body_keeps_new_validators(self):
+        from io import StringIO
+
+        from apps.core.models import ADEMEConfiguration
+
+        config = ADEMEConfiguration.get_config()
+        config.csv_etag, config.csv_last_modified, config.csv_sha256 = '"v1"', 'Mon, 01 Jun 2026 00:00:00 GMT', 'abc'
+        config.save()
+        fetched = {
+            'status': 'unchanged', 'path': 'base_carbone.csv', 'sha256': 'abc',
+            'etag': '"v2"', 'last_modified': 'Tue, 02 Jun 2026 00:00:00 GMT',
+        }
+        with mock.patch('apps.core.services.ademe_csv_parser.ADEMECSVParser.download_to_cache',
+                        return_value=fetched) as download:
+            call_command('update_ademe_factors', '--sectors', 'vehicles', stdout=StringIO())
+        self.assertEqual(download.call_args.kwargs['etag'], '"v1"')
+
+        config.refresh_from_db()
+        self.assertEqual((config.csv_etag, config.csv_last_modified, config.csv_sha256),
+                         ('"v2"', 'Tue, 02 Jun 2026 00:00:00 GMT', 'abc'))
+        self.assertIsNotNone(config.last_update)
+
+
+class BulkImportTests(TestCase):
+    """Import en masse des saisies (apps.core.services.bulk_import)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='Direction import')
+        cls.other_group = Group.objects.create(name='Direction voisine')
+        cls.user = User.objects.create_user('agent_import', password='x')
+        cls.user.groups.add(cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def run_import(self, sector, content, filename='saisies.csv'):
+        from io import BytesIO
+
+        from apps.core.services.bulk_import import import_sector_file
+
+        return import_sector_file(sector, BytesIO(content), filename, User.objects.get(pk=self.user.pk))
+
+    def test_csv_import(self):
+        from apps.core.models import EmissionRollup
+        from apps.purchases.models import PurchaseData
+
+        report = self.run_import('purchases', (
+            "Année;Service;Catégorie;Description;Montant (€)\n"
+            "2026;Voirie;insurance;Contrat flotte;1 200,50\n"
+            "2026;Culture;insurance;Contrat salles;800\n"
+        ).encode('utf-8'))
+
+        self.assertTrue(report['saved'])
+        self.assertEqual((report['rows'], report['created'], report['errors']), (2, 2, []))
+        entries = PurchaseData.objects.filter(user=self.user, group=self.group, year=2026)
+        self.assertEqual(entries.count(), 2)
+        self.assertEqual(entries.get(service='Voirie').amount_euros, Decimal('1200.50'))
+        # Agrégats reconstruits (bulk_create ne déclenche pas les signaux)
+        rollup_total = EmissionRollup.objects.filter(sector='purchases', year=2026, group=self.group).aggregate(
+            total=Sum('total_co2_kg'))['total']
+        self.assertAlmostEqual(float(rollup_total), float(entries.aggregate(total=Sum('total_co2_kg'))['total']), 2)
+
+    def test_reimport_updates_existing_entries(self):
+        from apps.vehicles.models import VehicleData
+
+        content = "year,service,essence_liters\n2026,Flotte,{}\n"
+        self.run_import('vehicles', content.format(100).encode('utf-8'))
+        report = self.run_import('vehicles', content.format(250).encode('utf-8'))
+
+        self.assertEqual((report['created'], report['updated']), (0, 1))
+        entry = VehicleData.objects.get(user=self.user, year=2026, service='Flotte')
+        self.assertEqual(entry.essence_liters, Decimal('250'))
+        self.assertEqual(VehicleData.objects.filter(user=self.user).count(), 1)
+
+    def test_entry_of_other_group_not_overwritten(self):
+        from apps.alimentation.models import FoodEntry
+
+        colleague = User.objects.create_user('agent_voisin', password='x')
+        FoodEntry.objects.create(user=colleague, group=self.other_group, year=2026, service='Cantine',
+                                 vegetarian_meals=10)
+        report = self.run_import('food', b"year,service,vegetarian_meals\n2026,Cantine,999\n2026,Creche,50\n")
+
+        self.assertFalse(report['saved'])
+        self.assertEqual([error['line'] for error in report['errors']], [2])
+        self.assertEqual(FoodEntry.objects.get(service='Cantine').vegetarian_meals, 10)
+        self.assertFalse(FoodEntry.objects.filter(service='Creche').exists())
+
+    def test_invalid_row_rolls_back_file(self):
+        from apps.purchases.models import PurchaseData
+
+        report = self.run_import('purchases', (
+            "year;service;category;description;amount_euros\n"
+            "2026;Voirie;insurance;Contrat;500\n"
+            "2026;Culture;insurance;Contrat;0\n"
+            "2026;Sports;insurance;Contrat;300\n"
+        ).encode('utf-8'))
+
+        self.assertFalse(report['saved'])
+        self.assertEqual(report['errors'], [{'line': 3, 'messages': ["Le montant doit être supérieur à zéro."]}])
+        self.assertFalse(PurchaseData.objects.filter(user=self.user).exists())
+
+    def test_xlsx_import(self):
+        from io import BytesIO
+
+        from openpyxl import Workbook
+
+        from apps.batiment.models import BuildingEnergyData
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['Année', 'Site', 'Élec (kWh)', 'Gaz (kWh)'])
+        sheet.append([2026, 'Mairie', 12000.5, 3000])
+        output = BytesIO()
+        workbook.save(output)
+
+        report = self.run_import('buildings', output.getvalue(), filename='batiments.xlsx')
+
+        self.assertTrue(report['saved'])
+        entry = BuildingEnergyData.objects.get(user=self.user, site_name='Mairie')
+        self.assertEqual((entry.electricity_kwh, entry.gas_kwh), (Decimal('12000.5'), Decimal('3000')))
+        self.assertGreater(entry.total_co2_kg, 0)
+
+
+class KeywordMatcherTests(unittest.TestCase):
+    """Classement des facteurs ADEME : index par mots identique à la recherche de sous-chaînes."""
+
+    def test_matches_reference_search(self):
+        from apps.core.management.commands.benchmark_ademe_parser import NAMES, UNITS, reference_match
+        from apps.core.services.ademe_csv_parser import ADEMECSVParser, KeywordMatcher
+
+        factors = ADEMECSVParser.ESSENTIAL_FACTORS
+        matcher = KeywordMatcher(factors)
+        # Ancres en milieu de mot ou sur plusieurs mots, espaces multiples
+        names = NAMES + ['Biogazole B100', 'Chauffage  gaz naturel', 'Réseau de chaleur urbain', 'GAZ NATUREL']
+        for name in names:
+            for unit in UNITS:
+                expected = {
+                    sector: match for sector in factors
+                    if (match := reference_match(factors[sector], name, unit))
+                }
+                # Deux fois : résultat mémorisé identique
+                self.assertEqual(matcher.classify(name, unit, list(factors)), expected, (name, unit))
+                self.assertEqual(matcher.classify(name, unit, list(factors)), expected, (name, unit))
@@ -12,4 +12,9 @@ urlpatterns = [
     path('manual/', views.manual_view, name='manual'),
     path('statistics/', views.statistics_view, name='statistics'),
     path('statistics/export/', views.export_statistics_view, name='export_statistics'),
+    path('exports/', views.export_job_create, name='export_job_create'),
+    path('exports/<int:pk>/', views.export_job_status, name='export_job_status'),
+    path('exports/<int:pk>/download/', views.export_job_download, name='export_job_download'),
+    path('import/<str:sector>/', views.sector_import_view, name='sector_import'),
+    path('metrics/', views.metrics_view, name='metrics'),
 ]
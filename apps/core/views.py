@@ -3,7 +3,10 @@ from django.contrib.auth import authenticate, login as auth_login, logout as aut
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.views.decorators.http import condition
 from apps.vehicles.models import VehicleData, EmissionFactor
+from apps.core.services.data_version import cached_json_response, data_last_modified, versioned_etag
 
 
 def login_view(request):
@@ -37,14 +40,15 @@ def logout_view(request):
 def manual_view(request):
     """View for the user manual page."""
     from apps.core.models import UserManual
+    from apps.core.services.user_groups import get_group_ids
     
     # 1. Try to find user's group manual
-    user_groups = request.user.groups.all()
+    group_ids = get_group_ids(request.user)
     manual = None
     
-    if user_groups.exists():
+    if group_ids:
         # Priority: just take first group found for now
-        manual = UserManual.objects.filter(group__in=user_groups).first()
+        manual = UserManual.objects.filter(group_id__in=group_ids).first()
         
     # 2. Fallback to default global manual
     if not manual:
@@ -66,32 +70,21 @@ def manual_view(request):
 @login_required
 def dashboard_view(request):
     """Vue du tableau de bord"""
-    from django.db.models import Sum
     from datetime import datetime
-    from apps.vehicles.models import VehicleData
-    from apps.purchases.models import PurchaseData
-    from apps.alimentation.models import FoodEntry
-    from apps.batiment.models import BuildingEnergyData
-    from apps.numerique.models import EquipementNumerique
+    from apps.core.services.rollups import get_sector_totals, get_entry_count
     from apps.sensibilisation.services import SensibilisationService
     from apps.sensibilisation.models import MessageSensibilisation
 
     current_year = datetime.now().year
 
     # Le dashboard est global pour tous les utilisateurs connectés.
-    # On récupère toutes les données, sans filtrer.
-    base_queryset_vehicles = VehicleData.objects.all()
-    base_queryset_purchases = PurchaseData.objects.all()
-    base_queryset_alimentation = FoodEntry.objects.all()
-    base_queryset_batiment = BuildingEnergyData.objects.all()
-    base_queryset_numerique = EquipementNumerique.objects.all()
-
-    # Calcul des totaux pour l'année en cours
-    vehicles_total = float(base_queryset_vehicles.filter(year=current_year).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    purchases_total = float(base_queryset_purchases.filter(year=current_year).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    alimentation_total = float(base_queryset_alimentation.filter(year=current_year).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    building_total = float(base_queryset_batiment.filter(year=current_year).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    numerique_total = float(base_queryset_numerique.filter(year=current_year).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
+    # Totaux de l'année en cours lus depuis la table d'agrégats (une seule requête)
+    totals = get_sector_totals(current_year)
+    vehicles_total = totals['vehicles']
+    purchases_total = totals['purchases']
+    alimentation_total = totals['food']
+    building_total = totals['buildings']
+    numerique_total = totals['numerique']
 
     total_co2 = vehicles_total + purchases_total + alimentation_total + building_total + numerique_total
 
@@ -104,7 +97,7 @@ def dashboard_view(request):
     }
     
     context = {
-        'vehicle_count': base_queryset_vehicles.count(),
+        'vehicle_count': get_entry_count('vehicles'),
         'emission_factors_count': EmissionFactor.objects.filter(is_active=True).count(),
         # Sensibilisation
         'message_admin': MessageSensibilisation.objects.filter(actif=True).first(),
@@ -122,11 +115,9 @@ def send_reminder_email(request):
     Permet de modifier le sujet et le message avant envoi.
     """
     from django.contrib.auth.models import User
-    from django.core.mail import send_mail
-    from django.conf import settings
     from django.utils import timezone
     from apps.core.models import ReminderTemplate
-    import logging
+    from apps.core.services.reminders import queue_reminders
     
     # Vérifier que l'utilisateur est admin
     if not request.user.is_staff:
@@ -160,37 +151,26 @@ def send_reminder_email(request):
         # Filtrer destinataires sélectionnés
         recipients = potential_recipients.filter(id__in=selected_ids)
         
-        sent_count = 0
-        failed_count = 0
+        if not recipients.exists():
+            messages.warning(request, "⚠️ Aucun destinataire sélectionné")
+            return redirect('dashboard')
         
-        for user in recipients:
-            try:
-                # Personnaliser le message pour cet utilisateur
-                # On utilise .format() simple, attention si le template contient des accolades littérales
-                # Il vaut mieux être prudent ou utiliser replace
-                user_body = body_template.replace('{user}', user.username)\
-                                       .replace('{year}', str(year))\
-                                       .replace('{url}', f"{request.scheme}://{domain}")
-                
-                # Envoyer
-                send_mail(
-                    subject=subject,
-                    message=user_body,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[user.email],
-                    fail_silently=False,
-                )
-                sent_count += 1
-                
-            except Exception as e:
-                failed_count += 1
-                logging.error(f"Erreur envoi email à {user.email}: {e}")
+        # Corps rendus et statuts enregistrés ici ; l'envoi est fait par la commande send_reminders
+        campaign = queue_reminders(
+            subject,
+            body_template,
+            recipients,
+            year=year,
+            url=f"{request.scheme}://{domain}",
+            created_by=request.user,
+        )
         
         # Message de retour
-        if sent_count > 0:
-            messages.success(request, f"✅ {sent_count} email(s) envoyé(s) avec succès")
-        if failed_count > 0:
-            messages.warning(request, f"⚠️ {failed_count} email(s) n'ont pas pu être envoyé(s)")
+        messages.success(
+            request,
+            f"✅ {campaign.deliveries.count()} email(s) en file d'envoi "
+            "(suivi dans l'administration : Campagnes de rappel)"
+        )
         
         return redirect('dashboard')
     
@@ -204,163 +184,70 @@ def send_reminder_email(request):
 
 
 @login_required
+@condition(etag_func=versioned_etag('dashboard-emissions', per_year=True), last_modified_func=data_last_modified)
 def dashboard_emissions_api(request):
     """
     API endpoint pour récupérer les données d'émissions agrégées
     pour le graphique de répartition globale du dashboard.
     
     Retourne un JSON avec les émissions par secteur.
+    Réponse conditionnelle (ETag/Last-Modified) et mise en cache par version des données.
     """
-    from django.http import JsonResponse
-    from django.db.models import Sum
-    from apps.purchases.models import PurchaseData
-    from apps.alimentation.models import FoodEntry
-    from apps.batiment.models import BuildingEnergyData
-    from apps.numerique.models import EquipementNumerique
-    
-    from django.utils import timezone
+    from apps.core.services.rollups import get_sector_totals
     
     current_year = timezone.now().year
     
-    # Agréger les données par secteur pour TOUS les utilisateurs (vue globale admin) pour l'ANNEE EN COURS
-    vehicles_total = float(VehicleData.objects.filter(year=current_year).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    
-    purchases_total = float(PurchaseData.objects.filter(year=current_year).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    
-    alimentation_total = float(FoodEntry.objects.filter(year=current_year).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    
-    building_total = float(BuildingEnergyData.objects.filter(year=current_year).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-
-    numerique_total = float(EquipementNumerique.objects.filter(year=current_year).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    
-    # Préparer les données pour Chart.js
-    data = {
-        'labels': ['Véhicules', 'Achats', 'Alimentation', 'Bâtiments', 'Numérique'],
-        'data': [
-            round(vehicles_total, 2),
-            round(purchases_total, 2),
-            round(alimentation_total, 2),
-            round(building_total, 2),
-            round(numerique_total, 2)
-        ],
-        'colors': ['#4A90E2', '#9B59B6', '#27AE60', '#F39C12', '#34495E'],
-        'total': round(vehicles_total + purchases_total + alimentation_total + building_total + numerique_total, 2)
-    }
+    def build_data():
+        # Agréger les données par secteur pour TOUS les utilisateurs (vue globale admin) pour l'ANNEE EN COURS
+        totals = get_sector_totals(current_year)
+        vehicles_total = totals['vehicles']
+        purchases_total = totals['purchases']
+        alimentation_total = totals['food']
+        building_total = totals['buildings']
+        numerique_total = totals['numerique']
+        
+        # Préparer les données pour Chart.js
+        return {
+            'labels': ['Véhicules', 'Achats', 'Alimentation', 'Bâtiments', 'Numérique'],
+            'data': [
+                round(vehicles_total, 2),
+                round(purchases_total, 2),
+                round(alimentation_total, 2),
+                round(building_total, 2),
+                round(numerique_total, 2)
+            ],
+            'colors': ['#4A90E2', '#9B59B6', '#27AE60', '#F39C12', '#34495E'],
+            'total': round(vehicles_total + purchases_total + alimentation_total + building_total + numerique_total, 2)
+        }
     
-    return JsonResponse(data)
+    return cached_json_response(request, f'dashboard_emissions:{current_year}', build_data)
 
 
 @login_required
 def export_data_view(request):
-    """Vue pour exporter les données (CSV ou Excel)"""
-    import csv
-    from django.http import HttpResponse
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, PatternFill
-    from openpyxl.chart import DoughnutChart, Reference, Series
-    from openpyxl.chart.label import DataLabelList
-    
-    from apps.vehicles.models import VehicleData
-    from apps.batiment.models import BuildingEnergyData
+    """Vue pour exporter les données (CSV en streaming ou Excel)"""
+    from django.http import HttpResponse, StreamingHttpResponse
+    from apps.core.services.exports import XLSX_CONTENT_TYPE, iter_csv_export, write_data_workbook
+    from apps.core.services.user_groups import get_group_ids
     
     format_type = request.GET.get('format', 'csv')
     
     # Admins exportent tout, les agents exportent les données de leur groupe
     if request.user.is_staff or request.user.is_superuser:
-        vehicles = VehicleData.objects.all()
-        buildings = BuildingEnergyData.objects.all()
+        group_ids = None
     else:
-        user_groups = request.user.groups.all()
-        vehicles = VehicleData.objects.filter(group__in=user_groups)
-        buildings = BuildingEnergyData.objects.filter(group__in=user_groups)
+        group_ids = get_group_ids(request.user)
     
     if format_type == 'xlsx':
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        response = HttpResponse(content_type=XLSX_CONTENT_TYPE)
         response['Content-Disposition'] = 'attachment; filename="bilan_carbone_evry.xlsx"'
-        
-        wb = Workbook()
-        
-        # --- Feuille 1: Synthèse ---
-        ws_synth = wb.active
-        ws_synth.title = "Synthèse"
-        
-        # Calcul des totaux
-        total_batiment = sum(float(b.total_co2_kg or 0) for b in buildings)
-        total_vehicle = sum(float(v.total_co2_kg or 0) for v in vehicles)
-        total_global = total_batiment + total_vehicle
-        
-        ws_synth.append(['Catégorie', 'Emissions (kgCO2e)'])
-        ws_synth.append(['Bâtiments', total_batiment])
-        ws_synth.append(['Véhicules', total_vehicle])
-        
-        # Style
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="2d6a4f", end_color="2d6a4f", fill_type="solid")
-        
-        for cell in ws_synth[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal='center')
-            
-        # Graphique
-        chart = DoughnutChart()
-        chart.title = "Répartition Bilan Carbone"
-        chart.style = 10
-        chart.holeSize = 70
-        
-        chart.dataLabels = DataLabelList()
-        chart.dataLabels.showPercent = True
-        chart.dataLabels.showCatName = True
-        
-        cats = Reference(ws_synth, min_col=1, min_row=2, max_row=3)
-        data = Reference(ws_synth, min_col=2, min_row=1, max_row=3)
-        chart.add_data(data, titles_from_data=False)
-        chart.set_categories(cats)
-        
-        ws_synth.add_chart(chart, "D2")
-        
-        # --- Feuille 2: Détails ---
-        ws_detail = wb.create_sheet(title="Détails")
-        ws_detail.append(['Type', 'Année', 'Nom/Service', 'Total CO2 (kg)'])
-        
-        for b in buildings:
-            ws_detail.append(['Bâtiment', b.year, b.site_name, b.total_co2_kg])
-            
-        for v in vehicles:
-            ws_detail.append(['Véhicule', v.year, v.service, v.total_co2_kg])
-
-        wb.save(response)
+        write_data_workbook(response, group_ids)
         return response
         
     else: # CSV
-        response = HttpResponse(content_type='text/csv')
+        # Streaming : synthèse (agrégat en base) puis détails lus par paquets
+        response = StreamingHttpResponse(iter_csv_export(group_ids), content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="bilan_carbone_evry.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Totaux
-        total_batiment = sum(float(b.total_co2_kg or 0) for b in buildings)
-        total_vehicle = sum(float(v.total_co2_kg or 0) for v in vehicles)
-        total_global = total_batiment + total_vehicle
-        
-        pct_batimes = int((total_batiment/total_global)*100) if total_global else 0
-        pct_vehicles = int((total_vehicle/total_global)*100) if total_global else 0
-        
-        writer.writerow(['BILAN CARBONE - SYNTHÈSE'])
-        writer.writerow(['Total Global', f'{total_global:.2f} kgCO2e'])
-        writer.writerow(['Bâtiments', f'{total_batiment:.2f} kgCO2e', f'{pct_batimes}%'])
-        writer.writerow(['Véhicules', f'{total_vehicle:.2f} kgCO2e', f'{pct_vehicles}%'])
-        writer.writerow([])
-        
-        writer.writerow(['DETAILS'])
-        writer.writerow(['Type', 'Année', 'Nom/Service', 'Total CO2 (kg)'])
-        
-        for b in buildings:
-            writer.writerow(['Bâtiment', b.year, b.site_name, b.total_co2_kg])
-            
-        for v in vehicles:
-            writer.writerow(['Véhicule', v.year, v.service, v.total_co2_kg])
-            
         return response
 
 
@@ -371,7 +258,6 @@ def statistics_view(request):
     """
     from django.db.models import Sum
     from django.utils import timezone
-    from apps.vehicles.models import VehicleData
     from apps.purchases.models import PurchaseData
     from apps.alimentation.models import FoodEntry
     from apps.batiment.models import BuildingEnergyData
@@ -381,387 +267,181 @@ def statistics_view(request):
 
 
 @login_required
+@condition(etag_func=versioned_etag('statistics'), last_modified_func=data_last_modified)
 def statistics_api(request):
     """
     API pour les statistiques:
     - Top Chart: Stacked Bar (Global par secteur)
     - Bottom Charts: Détails par secteur (Doughnuts mix énergétique, mix véhicules...)
+    Réponse conditionnelle (ETag/Last-Modified) et mise en cache par version des données.
     """
-    from django.http import JsonResponse
-    from django.db.models import Sum
-    from django.utils import timezone
-    from apps.vehicles.models import VehicleData
-    from apps.purchases.models import PurchaseData
-    from apps.alimentation.models import FoodEntry, FoodEmissionFactor
-    from apps.batiment.models import BuildingEnergyData
-    from apps.numerique.models import EquipementNumerique
-    
-    # 1. Identifier les années disponibles (vue globale)
-    years = set()
-    years.update(VehicleData.objects.values_list('year', flat=True))
-    years.update(BuildingEnergyData.objects.values_list('year', flat=True))
-    years.update(FoodEntry.objects.values_list('year', flat=True))
-    years.update(PurchaseData.objects.values_list('year', flat=True))
-    years.update(EquipementNumerique.objects.values_list('year', flat=True))
+    from apps.core.services.statistics import build_statistics_data
     
-    sorted_years = sorted(list(years))
-    if not sorted_years:
-        return JsonResponse({'years': [], 'stacked_data': {}, 'details_data': {}})
-        sorted_years = [timezone.now().year]
-
-    # 2. Préparer les données pour le Stacked Bar Chart (Global)
-    # 4 arrays alignés sur sorted_years
-    stacked_data = {
-        'vehicles': [],
-        'buildings': [],
-        'food': [],
-        'purchases': [],
-        'numerique': []
-    }
-    
-    # 3. Préparer les détails pour les Doughnuts (Dict {year: {sector: {label: value}}})
-    details_data = {}
+    # Vue globale: totaux empilés + détails par secteur, agrégés côté base
+    # (une requête GROUP BY par secteur, indépendamment du nombre d'années/saisies)
+    return cached_json_response(request, 'statistics_data', build_statistics_data)
 
-    # Pré-chargement des facteurs Alimentation pour éviter N requêtes
-    food_factors_map = {f.code: f.kg_co2_per_meal for f in FoodEmissionFactor.objects.all()}
+
+@login_required
+def export_statistics_view(request):
+    """
+    Export statistics to Excel with Native Charts.
+    Classeur généré en mode write-only (voir apps.core.services.exports).
+    """
+    from django.http import HttpResponse
+    from apps.core.services.exports import XLSX_CONTENT_TYPE, write_statistics_workbook
     
-    for year in sorted_years:
-        details_data[year] = {
-            'buildings': {},
-            'vehicles': {},
-            'food': {},
-            'purchases': {},
-            'numerique': {}
-        }
+    response = HttpResponse(content_type=XLSX_CONTENT_TYPE)
+    response['Content-Disposition'] = 'attachment; filename="statistiques_evry.xlsx"'
+    write_statistics_workbook(response)
+    return response
 
-        # --- BUILDING DETAILS ---
-        qs_b = BuildingEnergyData.objects.filter(year=year)
-        # On recalcule les sommes des 'parties' pour le camembert
-        # Attention: BuildingEnergyData n'a pas les champs 'elec_co2' stockés, on doit calculer
-        # Sum( consumption * factor ) -> comme factor est par ligne, c'est complexe si factor change
-        # Simplification: On itère pour sommer (pas optimal si 1M lignes mais ok ici)
-        b_elec = 0
-        b_gas = 0
-        b_heat = 0
-        b_cool = 0
-        total_b = 0
-        
-        for b in qs_b:
-            b_elec += float(b.electricity_kwh * b.electricity_factor)
-            b_gas += float(b.gas_kwh * b.gas_factor)
-            b_heat += float(b.heating_network_kwh * b.heating_network_factor)
-            b_cool += float(b.cooling_kwh * b.cooling_factor)
-            total_b += float(b.total_co2_kg)
-            
-        details_data[year]['buildings'] = {
-            'Électricité': b_elec,
-            'Gaz Naturel': b_gas,
-            'Réseau Chaleur': b_heat,
-            'Climatisation': b_cool
-        }
-        stacked_data['buildings'].append(total_b)
 
+@login_required
+def export_job_create(request):
+    """
+    Demande un export en tâche de fond (POST kind=statistics_xlsx|data_csv|data_xlsx).
+    Retourne l'identifiant du job et l'URL de suivi.
+    """
+    from django.http import JsonResponse
+    from django.urls import reverse
+    from apps.core.services.export_jobs import EXPORT_KINDS, request_export
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Méthode non autorisée'}, status=405)
 
-        # --- VEHICLE DETAILS ---
-        qs_v = VehicleData.objects.filter(year=year)
-        v_essence = 0
-        v_gazole = 0
-        v_distance = 0
-        total_v = 0
-        
-        for v in qs_v:
-            total_v += float(v.total_co2_kg or 0)
-            if v.calculation_method == 'fuel':
-                v_essence += float(v.essence_co2_kg or 0)
-                v_gazole += float(v.gazole_co2_kg or 0)
-            else:
-                v_distance += float(v.total_co2_kg or 0)
-                
-        details_data[year]['vehicles'] = {
-            'Essence': v_essence,
-            'Gazole': v_gazole,
-            'Distance (Mixte)': v_distance
-        }
-        stacked_data['vehicles'].append(total_v)
+    kind = request.POST.get('kind', '')
+    if kind not in EXPORT_KINDS:
+        return JsonResponse({'error': "Type d'export inconnu"}, status=400)
 
+    job = request_export(kind, request.user)
+    return JsonResponse({
+        'id': job.pk,
+        'status': job.status,
+        'status_url': reverse('export_job_status', args=[job.pk]),
+    }, status=202)
 
-        # --- FOOD DETAILS ---
-        qs_f = FoodEntry.objects.filter(year=year)
-        f_breakdown = {
-            'Bœuf': 0, 
-            'Porc': 0, 
-            'Volaille/Poisson': 0, 
-            'Végétarien': 0,
-            'Pique-nique': 0
-        }
-        total_f = 0
-        
-        for f in qs_f:
-            total_f += float(f.total_co2_kg or 0)
-            # Recalcul manuel des parts (approximatif si facteurs ont changé mais acceptable)
-            f_breakdown['Bœuf'] += f.beef_meals * float(food_factors_map.get('beef', 0))
-            f_breakdown['Porc'] += f.pork_meals * float(food_factors_map.get('pork', 0))
-            f_breakdown['Volaille/Poisson'] += f.poultry_fish_meals * float(food_factors_map.get('poultry_fish', 0))
-            f_breakdown['Végétarien'] += f.vegetarian_meals * float(food_factors_map.get('vegetarian', 0))
-            f_breakdown['Pique-nique'] += (f.picnic_meat_meals * float(food_factors_map.get('picnic_meat', 0)) +
-                                           f.picnic_no_meat_meals * float(food_factors_map.get('picnic_veg', 0)))
-
-        details_data[year]['food'] = f_breakdown
-        stacked_data['food'].append(total_f)
-
-
-        # --- PURCHASE DETAILS ---
-        qs_p = PurchaseData.objects.filter(year=year)
-        p_breakdown = {} # Dynamique selon catégories
-        total_p = 0
-        
-        for p in qs_p:
-            total_p += float(p.total_co2_kg or 0)
-            cat_label = p.get_category_display()
-            p_breakdown[cat_label] = p_breakdown.get(cat_label, 0) + float(p.total_co2_kg or 0)
-            
-        details_data[year]['purchases'] = p_breakdown
-        stacked_data['purchases'].append(total_p)
-
-
-        # --- NUMERIQUE DETAILS ---
-        qs_n = EquipementNumerique.objects.filter(year=year)
-        n_breakdown = {}
-        total_n = 0
-        
-        for n in qs_n:
-            total_n += float(n.total_co2_kg or 0)
-            # Friendly Label (remove code)
-            label = n.get_type_equipement_display()
-            # If the label is "LAPTOP (250kg...)", we want simpler or full is fine?
-            # User request: "juste mettre une fois en haut". Labels in doughnut are fine.
-            # Maybe simplify "1. Hardware (Terminaux)" -> just use group? No, n.type_equipement is specific code.
-            # n.get_type_equipement_display() returns "Ordinateur Portable (250kg CO2e)".
-            # Let's simplify it by removing the impact text in parenthesis if needed, but it helps context.
-            # Source view had: label.split('(')[0].strip()
-            # Let's do that for cleaner chart.
-            label_clean = label.split('(')[0].strip() if '(' in label else label
-            n_breakdown[label_clean] = n_breakdown.get(label_clean, 0) + float(n.total_co2_kg or 0)
-            
-        details_data[year]['numerique'] = n_breakdown
-        stacked_data['numerique'].append(total_n)
 
+def _get_export_job(request, pk):
+    from django.http import Http404
+    from apps.core.models import ExportJob
+    from apps.core.services.export_jobs import get_export_scope
+
+    job = ExportJob.objects.filter(pk=pk).first()
+    if job is None:
+        raise Http404
+    # Un export étant réutilisé entre utilisateurs, l'accès est accordé au demandeur,
+    # aux administrateurs et à tout utilisateur ayant le même périmètre
+    if request.user.is_staff or request.user.is_superuser or job.requested_by_id == request.user.pk:
+        return job
+    if job.scope == get_export_scope(job.kind, request.user):
+        return job
+    raise Http404
+
+
+@login_required
+def export_job_status(request, pk):
+    """Progression d'un export en tâche de fond (scrutée par le navigateur)."""
+    from django.http import JsonResponse
+    from django.urls import reverse
+
+    job = _get_export_job(request, pk)
+    download_url = None
+    if job.status == job.STATUS_DONE and job.file:
+        download_url = reverse('export_job_download', args=[job.pk])
     return JsonResponse({
-        'years': sorted_years,
-        'stacked_data': stacked_data,
-        'details_data': details_data
+        'id': job.pk,
+        'status': job.status,
+        'progress': job.progress,
+        'download_url': download_url,
+        'error': job.error,
     })
 
 
 @login_required
-def export_statistics_view(request):
+def export_job_download(request, pk):
+    """Téléchargement du fichier produit par un export en tâche de fond."""
+    from django.http import FileResponse, Http404
+    from apps.core.services.export_jobs import EXPORT_KINDS
+
+    job = _get_export_job(request, pk)
+    if job.status != job.STATUS_DONE or not job.file:
+        raise Http404
+    filename, content_type, _mode = EXPORT_KINDS[job.kind]
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=filename, content_type=content_type)
+
+
+# Secteur -> page de liste des saisies (retour après import)
+SECTOR_LIST_URLS = {
+    'vehicles': 'vehicle_list',
+    'buildings': 'batiment_list',
+    'food': 'food_list',
+    'purchases': 'purchase_list',
+    'numerique': 'numerique_list',
+}
+
+
+@login_required
+def sector_import_view(request, sector):
+    """Import d'un fichier CSV/XLSX de saisies pour un secteur"""
+    from django.http import Http404
+    from apps.core.models import ADEMEConfiguration
+    from apps.core.services.bulk_import import BulkImportError, expected_columns, import_sector_file
+
+    if sector not in SECTOR_LIST_URLS:
+        raise Http404("Secteur inconnu")
+
+    report = None
+    if request.method == 'POST':
+        uploaded = request.FILES.get('file')
+        if not uploaded:
+            messages.error(request, 'Veuillez choisir un fichier CSV ou XLSX.')
+        else:
+            try:
+                report = import_sector_file(
+                    sector, uploaded, uploaded.name, request.user,
+                    dry_run=bool(request.POST.get('dry_run')),
+                )
+            except BulkImportError as e:
+                messages.error(request, f'❌ {e}')
+            else:
+                if report['saved']:
+                    messages.success(
+                        request,
+                        f"✅ Import terminé : {report['created']} saisie(s) créée(s), "
+                        f"{report['updated']} mise(s) à jour ({report['total_co2_kg']:.2f} kg CO₂e)"
+                    )
+                elif report['errors']:
+                    messages.error(request, f"❌ {len(report['errors'])} ligne(s) en erreur : aucune donnée n'a été enregistrée.")
+                else:
+                    messages.info(request, f"🔎 Vérification : {report['rows']} ligne(s) valide(s), rien n'a été enregistré.")
+
+    context = {
+        'sector': sector,
+        'sector_label': dict(ADEMEConfiguration.SECTORS_CHOICES)[sector],
+        'list_url': SECTOR_LIST_URLS[sector],
+        'columns': expected_columns(sector),
+        'report': report,
+        # Les 200 premières erreurs suffisent pour corriger le fichier
+        'errors': report['errors'][:200] if report else [],
+    }
+    return render(request, 'core/sector_import.html', context)
+
+
+def metrics_view(request):
     """
-    Export statistics to Excel with Native Charts.
+    Métriques d'exploitation au format texte Prometheus.
+    Réservé au personnel, ou au collecteur muni du jeton METRICS_TOKEN (Authorization: Bearer <jeton>).
     """
-    import datetime
-    from django.http import HttpResponse
-    from django.db.models import Sum
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-    from openpyxl.chart import BarChart, Reference, Series
-    
-    from apps.vehicles.models import VehicleData
-    from apps.purchases.models import PurchaseData
-    from apps.alimentation.models import FoodEntry
-    from apps.batiment.models import BuildingEnergyData
-    from apps.numerique.models import EquipementNumerique
-    
-    # 1. Fetch Years
-    years = set()
-    years.update(VehicleData.objects.values_list('year', flat=True))
-    years.update(BuildingEnergyData.objects.values_list('year', flat=True))
-    years.update(FoodEntry.objects.values_list('year', flat=True))
-    years.update(PurchaseData.objects.values_list('year', flat=True))
-    years.update(EquipementNumerique.objects.values_list('year', flat=True))
-    
-    sorted_years = sorted(list(years))
-    if not sorted_years:
-        sorted_years = [datetime.datetime.now().year]
-
-    # 2. Setup Workbook
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename="statistiques_evry.xlsx"'
-    
-    wb = Workbook()
-    
-    # --- SHEET 1: SYNTHÈSE (Graphique) ---
-    ws = wb.active
-    ws.title = "Évolution Annuelle"
-    
-    # Headers
-    headers = ["Année", "Bâtiments", "Véhicules", "Alimentation", "Achats", "Numérique", "Total (kgCO2e)"]
-    ws.append(headers)
-    
-    # Style Headers
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="2d6a4f", end_color="2d6a4f", fill_type="solid")
-    
-    for cell in ws[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center")
-        
-    # Data Rows
-    for year in sorted_years:
-        b_total = float(BuildingEnergyData.objects.filter(year=year).aggregate(s=Sum('total_co2_kg'))['s'] or 0)
-        v_total = float(VehicleData.objects.filter(year=year).aggregate(s=Sum('total_co2_kg'))['s'] or 0)
-        f_total = float(FoodEntry.objects.filter(year=year).aggregate(s=Sum('total_co2_kg'))['s'] or 0)
-        p_total = float(PurchaseData.objects.filter(year=year).aggregate(s=Sum('total_co2_kg'))['s'] or 0)
-        n_total = float(EquipementNumerique.objects.filter(year=year).aggregate(s=Sum('total_co2_kg'))['s'] or 0)
-        
-        g_total = b_total + v_total + f_total + p_total + n_total
-        
-        ws.append([
-            year,
-            round(float(b_total), 2),
-            round(float(v_total), 2),
-            round(float(f_total), 2),
-            round(float(p_total), 2),
-            round(float(n_total), 2),
-            round(float(g_total), 2)
-        ])
-
-    # Chart: Stacked Bar
-    chart = BarChart()
-    chart.type = "col"
-    chart.style = 10
-    chart.title = "Évolution des Émissions par Secteur"
-    chart.y_axis.title = "kg CO₂e"
-    chart.x_axis.title = "Année"
-    chart.grouping = "stacked"
-    chart.overlap = 100
-    
-    # Data References
-    # Data: Columns B to F (2 to 6)
-    # Categories: Column A (Year)
-    data = Reference(ws, min_col=2, min_row=1, max_row=len(sorted_years)+1, max_col=6)
-    cats = Reference(ws, min_col=1, min_row=2, max_row=len(sorted_years)+1)
-    
-    chart.add_data(data, titles_from_data=True)
-    chart.set_categories(cats)
-    
-    ws.add_chart(chart, "H2")
-    
-    # --- SHEET: Détails Bâtiments ---
-    ws_bat = wb.create_sheet(title="Détails Bâtiments")
-    ws_bat.append([
-        "Année", "Site", "Surface (m²)", "Année Constr.", 
-        "Élec (kWh)", "Facteur Élec", 
-        "Gaz (kWh)", "Facteur Gaz", 
-        "Chaleur (kWh)", "Facteur Chaleur",
-        "Clim (kWh)", "Facteur Clim",
-        "PV (kWh)", "Impact (kgCO2e)"
-    ])
-    
-    # --- SHEET: Détails Véhicules ---
-    ws_veh = wb.create_sheet(title="Détails Véhicules")
-    ws_veh.append([
-        "Année", "Service", "Type Calcul", 
-        "Essence (L)", "Gazole (L)", "Distance (km)", 
-        "Impact (kgCO2e)", "Notes"
-    ])
-
-    # --- SHEET: Détails Alimentation ---
-    ws_food = wb.create_sheet(title="Détails Alimentation")
-    ws_food.append([
-        "Année", "Service", 
-        "Boeuf", "Porc", "Volaille/Poisson", "Végé", "Pique-Nique", 
-        "Total Repas", "Impact (kgCO2e)"
-    ])
-
-    # --- SHEET: Détails Achats ---
-    ws_pur = wb.create_sheet(title="Détails Achats")
-    ws_pur.append([
-        "Année", "Catégorie", "Description", 
-        "Montant (€)", "Facteur (kgCO2e/k€)", 
-        "Impact (kgCO2e)"
-    ])
-
-    # --- SHEET: Détails Numérique ---
-    ws_num = wb.create_sheet(title="Détails Numérique")
-    ws_num.append([
-        "Année", "Nom", "Marque/Modèle", "Type", 
-        "Quantité", "Durée Vie (ans)", 
-        "Conso (kWh/an)", "Fab. (kgCO2e)", 
-        "Impact (kgCO2e)"
-    ])
-
-    # Global Header Style (Helper)
-    def style_header(ws):
-        for cell in ws[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-
-    for sheet in [ws_bat, ws_veh, ws_food, ws_pur, ws_num]:
-        style_header(sheet)
-    
-    # Fill Data
-    for year in sorted_years:
-        # Bâtiments
-        for b in BuildingEnergyData.objects.filter(year=year):
-            ws_bat.append([
-                year, b.site_name, b.surface_area, b.construction_year or "-",
-                round(b.electricity_kwh, 2), b.electricity_factor,
-                round(b.gas_kwh, 2), b.gas_factor,
-                round(b.heating_network_kwh, 2), b.heating_network_factor,
-                round(b.cooling_kwh, 2), b.cooling_factor,
-                round(b.photovoltaic_production_kwh, 2),
-                round(float(b.total_co2_kg or 0), 2)
-            ])
-        
-        # Véhicules
-        for v in VehicleData.objects.filter(year=year):
-            ws_veh.append([
-                year, v.service, v.get_calculation_method_display(),
-                v.essence_liters or 0, v.gazole_liters or 0, v.distance_km or 0,
-                round(float(v.total_co2_kg or 0), 2),
-                v.notes
-            ])
-            
-        # Alimentation
-        for f in FoodEntry.objects.filter(year=year):
-            ws_food.append([
-                year, f.service, 
-                f.beef_meals, f.pork_meals, f.poultry_fish_meals, f.vegetarian_meals, 
-                (f.picnic_meat_meals + f.picnic_no_meat_meals), f.total_meals(),
-                round(float(f.total_co2_kg or 0), 2)
-            ])
-            
-        # Achats
-        for p in PurchaseData.objects.filter(year=year):
-            ws_pur.append([
-                year, p.get_category_display(), p.description,
-                p.amount_euros, p.emission_factor,
-                round(float(p.total_co2_kg or 0), 2)
-            ])
-            
-        # Numérique
-        for n in EquipementNumerique.objects.filter(year=year):
-            ws_num.append([
-                year, n.nom, n.marque_modele or "-", n.get_type_equipement_display(), 
-                n.quantite, n.duree_vie,
-                round(n.consommation_annuelle, 2), round(n.empreinte_fabrication, 2),
-                round(float(n.total_co2_kg or 0), 2)
-            ])
-
-    # Adjust Column Widths
-    for sheet in [ws, ws_bat, ws_veh, ws_food, ws_pur, ws_num]:
-        for col in sheet.columns:
-            max_length = 0
-            column = col[0].column_letter # Get the column name
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            sheet.column_dimensions[column].width = adjusted_width
-
-    wb.save(response)
-    return response
+    from django.conf import settings
+    from django.http import HttpResponse, HttpResponseForbidden
+    from django.utils.crypto import constant_time_compare
+    from apps.core.services.metrics import CONTENT_TYPE_LATEST, render_metrics
+
+    token = settings.METRICS_TOKEN
+    authorized = request.user.is_staff or (
+        token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    )
+    if not authorized:
+        return HttpResponseForbidden("Accès réservé aux administrateurs")
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from apps.core.admin_actions import recompute_emissions_action
 from .models import EquipementNumerique, NumeriqueEmissionFactor
 
 @admin.register(NumeriqueEmissionFactor)
@@ -6,6 +7,7 @@ class NumeriqueEmissionFactorAdmin(admin.ModelAdmin):
     list_display = ('nom', 'type_equipement', 'fabrication_kg_co2', 'conso_kwh_an', 'source')
     list_editable = ('fabrication_kg_co2', 'conso_kwh_an')
     search_fields = ('nom', 'type_equipement')
+    actions = [recompute_emissions_action('numerique')]
 
 @admin.register(EquipementNumerique)
 class EquipementNumeriqueAdmin(admin.ModelAdmin):
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("numerique", "0005_equipementnumerique_factor_revision"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="equipementnumerique",
+            index=models.Index(
+                fields=["group", "year", "created_at"],
+                name="numerique_group_year_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="equipementnumerique",
+            index=models.Index(
+                fields=["year", "type_equipement"], name="numerique_year_type"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="equipementnumerique",
+            index=models.Index(
+                fields=["year", "created_at"], name="numerique_year_created"
+            ),
+        ),
+    ]
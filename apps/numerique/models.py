@@ -42,6 +42,9 @@ class EquipementNumerique(models.Model):
         )),
     ]
     
+    # Facteur Elec France par défaut (kgCO2e/kWh) si absent du module Bâtiment
+    DEFAULT_ELEC_FACTOR = 0.052
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Groupe")
     year = models.IntegerField(default=timezone.now().year, verbose_name="Année")
@@ -58,13 +61,22 @@ class EquipementNumerique(models.Model):
     consommation_annuelle = models.FloatField(default=0, editable=False, help_text="kWh par an")
     
     total_co2_kg = models.FloatField(default=0, editable=False, help_text="Empreinte annuelle amortie + Usage")
+    factor_revision = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Version des facteurs", help_text="Dernière version de l'historique des facteurs utilisée (vide = facteurs courants)")
 
-    def save(self, *args, **kwargs):
-        # Récupérer le facteur en base
-        try:
-            # On utilise le code stocké dans type_equipement pour trouver le facteur
-            factor = NumeriqueEmissionFactor.objects.get(type_equipement=self.type_equipement)
-            
+    def calculate_impact(self, snapshot=None):
+        """
+        Calcule fabrication, consommation et total annuel.
+        snapshot : instantané du registre des facteurs (imports en masse), sinon l'instantané courant
+        """
+        from apps.core.services.factor_registry import get_snapshot
+
+        snapshot = (snapshot or get_snapshot()).for_year(self.year)
+        self.factor_revision = snapshot.revision('numerique')
+
+        # Récupérer le facteur depuis le registre des facteurs
+        # On utilise le code stocké dans type_equipement pour trouver le facteur
+        factor = snapshot.get('numerique.NumeriqueEmissionFactor', self.type_equipement)
+        if factor is not None:
             # Calcul Fabrication
             # Note: factor.valeur est Decimal, on convertit en float pour calculs
             self.empreinte_fabrication = float(factor.fabrication_kg_co2) * self.quantite
@@ -72,7 +84,7 @@ class EquipementNumerique(models.Model):
             # Calcul Consommation (Usage kWh)
             self.consommation_annuelle = float(factor.conso_kwh_an) * self.quantite
             
-        except NumeriqueEmissionFactor.DoesNotExist:
+        else:
             # Sécurité : si facteur non trouvé, on met 0 (ou on pourrait logguer une erreur)
             self.empreinte_fabrication = 0
             self.consommation_annuelle = 0
@@ -82,14 +94,13 @@ class EquipementNumerique(models.Model):
         
         # Facteur Elec France (récupéré depuis le module Bâtiment ou défaut 0.052)
         try:
-            from apps.batiment.models import BuildingEmissionFactor
-            elec_factor_obj = BuildingEmissionFactor.objects.filter(type_energie='ELEC').first()
+            elec_factor_obj = snapshot.get('batiment.BuildingEmissionFactor', 'ELEC')
             if elec_factor_obj:
                 FACTEUR_ELEC = float(elec_factor_obj.facteur)
             else:
-                FACTEUR_ELEC = 0.052
+                FACTEUR_ELEC = self.DEFAULT_ELEC_FACTOR
         except Exception:
-            FACTEUR_ELEC = 0.052
+            FACTEUR_ELEC = self.DEFAULT_ELEC_FACTOR
 
         usage_co2 = self.consommation_annuelle * FACTEUR_ELEC
         
@@ -98,7 +109,10 @@ class EquipementNumerique(models.Model):
         # Si durée_vie = 1 an, alors amortissement = fabrication totale (abonnement annuel)
 
         self.total_co2_kg = amortissement + usage_co2
-        
+        return self.total_co2_kg
+
+    def save(self, *args, **kwargs):
+        self.calculate_impact()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -108,3 +122,9 @@ class EquipementNumerique(models.Model):
         verbose_name = "Équipement numérique"
         verbose_name_plural = "Données numérique"
         ordering = ['-year', '-created_at']
+        # Listes par groupe triées par année / date, répartitions par type d'une année
+        indexes = [
+            models.Index(fields=['group', 'year', 'created_at'], name='numerique_group_year_created'),
+            models.Index(fields=['year', 'type_equipement'], name='numerique_year_type'),
+            models.Index(fields=['year', 'created_at'], name='numerique_year_created'),
+        ]
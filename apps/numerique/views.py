@@ -2,7 +2,9 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Sum
-from .models import EquipementNumerique, NumeriqueEmissionFactor
+from apps.core.services.factor_registry import get_factors
+from apps.core.services.user_groups import get_group_ids, get_primary_group_id
+from .models import EquipementNumerique
 from .forms import NumeriqueForm
 import json
 
@@ -14,9 +16,9 @@ def numerique_dashboard(request):
         if form.is_valid():
             numerique = form.save(commit=False)
             numerique.user = request.user
-            user_group = request.user.groups.first()
-            if user_group:
-                numerique.group = user_group
+            group_id = get_primary_group_id(request.user)
+            if group_id:
+                numerique.group_id = group_id
             numerique.save()
             messages.success(request, '✅ Équipement ajouté avec succès !')
             return redirect('numerique_dashboard')
@@ -28,7 +30,7 @@ def numerique_dashboard(request):
     if request.user.is_staff or request.user.is_superuser:
         equipements = EquipementNumerique.objects.all().order_by('-created_at')
     else:
-        equipements = EquipementNumerique.objects.filter(group__in=request.user.groups.all()).order_by('-created_at')
+        equipements = EquipementNumerique.objects.filter(group_id__in=get_group_ids(request.user)).order_by('-created_at')
     
     # Calcul des totaux
     total_carbone = equipements.aggregate(Sum('empreinte_fabrication'))['empreinte_fabrication__sum'] or 0
@@ -67,22 +69,23 @@ def numerique_dashboard(request):
         'chart_fab_data': json.dumps(chart_fab_data),
         'chart_fab_data': json.dumps(chart_fab_data),
         'chart_conso_data': json.dumps(chart_conso_data),
-        'emission_factors': NumeriqueEmissionFactor.objects.all(),
+        'emission_factors': get_factors('numerique.NumeriqueEmissionFactor'),
     })
 
 @login_required
 def numerique_list(request):
     """Liste des équipements numériques (ancienne vue, gardée pour compatibilité)"""
-    from django.db.models import Sum
+    from apps.core.services.listing import EntryListPage
     if request.user.is_staff or request.user.is_superuser:
-        equipements = EquipementNumerique.objects.all().order_by('-year', 'nom')
+        equipements = EquipementNumerique.objects.all()
     else:
-        equipements = EquipementNumerique.objects.filter(group__in=request.user.groups.all()).order_by('-year', 'nom')
-    total_co2 = equipements.aggregate(Sum('total_co2_kg'))['total_co2_kg__sum'] or 0
+        equipements = EquipementNumerique.objects.filter(group_id__in=get_group_ids(request.user))
+    page = EntryListPage(request, equipements, search_field='nom')
     
     return render(request, 'numerique/numerique_list.html', {
-        'equipements': equipements,
-        'total_co2': total_co2
+        'equipements': page,
+        'page': page,
+        'total_co2': page.totals['total_co2_kg']
     })
 
 @login_required
@@ -96,7 +99,7 @@ def numerique_update(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         numerique = get_object_or_404(EquipementNumerique, pk=pk)
     else:
-        numerique = get_object_or_404(EquipementNumerique, pk=pk, group__in=request.user.groups.all())
+        numerique = get_object_or_404(EquipementNumerique, pk=pk, group_id__in=get_group_ids(request.user))
     
     if request.method == 'POST':
         form = NumeriqueForm(request.POST, instance=numerique)
@@ -110,7 +113,7 @@ def numerique_update(request, pk):
     return render(request, 'numerique/numerique_form.html', {
         'form': form,
         'title': 'Modifier Équipement',
-        'emission_factors': NumeriqueEmissionFactor.objects.all(),
+        'emission_factors': get_factors('numerique.NumeriqueEmissionFactor'),
     })
 
 @login_required
@@ -119,7 +122,7 @@ def numerique_detail(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         numerique = get_object_or_404(EquipementNumerique, pk=pk)
     else:
-        numerique = get_object_or_404(EquipementNumerique, pk=pk, group__in=request.user.groups.all())
+        numerique = get_object_or_404(EquipementNumerique, pk=pk, group_id__in=get_group_ids(request.user))
     
     return render(request, 'numerique/detail.html', {
         'object': numerique
@@ -131,7 +134,7 @@ def numerique_delete(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         numerique = get_object_or_404(EquipementNumerique, pk=pk)
     else:
-        numerique = get_object_or_404(EquipementNumerique, pk=pk, group__in=request.user.groups.all())
+        numerique = get_object_or_404(EquipementNumerique, pk=pk, group_id__in=get_group_ids(request.user))
     
     if request.method == 'POST':
         numerique.delete()
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from apps.core.admin_actions import recompute_emissions_action
 from .models import PurchaseData, PurchaseEmissionFactor
 
 
@@ -11,6 +12,7 @@ class PurchaseEmissionFactorAdmin(admin.ModelAdmin):
     list_editable = ('factor_kg_co2_per_keur',)
     search_fields = ('category_label', 'category_code')
     ordering = ('category_label',)
+    actions = [recompute_emissions_action('purchases')]
 
 
 @admin.register(PurchaseData)
@@ -56,6 +56,18 @@ class PurchaseData(models.Model):
         ('equipment_rental', 'Location équipements'),
     ]
     
+    # Facteurs par défaut si la catégorie n'a pas de PurchaseEmissionFactor
+    DEFAULT_FACTORS = {
+        'food_service': Decimal('100.00'),
+        'insurance': Decimal('110.00'),
+        'cleaning_maintenance': Decimal('215.00'),
+        'activities': Decimal('270.00'),
+        'laundry': Decimal('320.00'),
+        'construction': Decimal('360.00'),
+        'transport': Decimal('560.00'),
+        'equipment_rental': Decimal('600.00'),
+    }
+    
     # Métadonnées
     user = models.ForeignKey(
         User,
@@ -117,6 +129,13 @@ class PurchaseData(models.Model):
         verbose_name="Total CO₂ (kg)",
         help_text="Impact carbone total calculé"
     )
+    factor_revision = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Version des facteurs",
+        help_text="Dernière version de l'historique des facteurs utilisée par le calcul (vide = facteurs courants)"
+    )
     
     # Notes optionnelles
     notes = models.TextField(
@@ -139,37 +158,43 @@ class PurchaseData(models.Model):
         verbose_name = "Donnée d'achat"
         verbose_name_plural = "Données d'achats"
         ordering = ['-created_at']
+        # Listes par groupe triées par année / date, répartitions par catégorie d'une année
+        indexes = [
+            models.Index(fields=['group', 'year', 'created_at'], name='purchase_group_year_created'),
+            models.Index(fields=['year', 'category'], name='purchase_year_category'),
+            models.Index(fields=['year', 'created_at'], name='purchase_year_created'),
+        ]
     
     def __str__(self):
         return f"{self.get_category_display()} - {self.description[:50]} ({self.year})"
     
-    def save(self, *args, **kwargs):
+    def calculate_impact(self, snapshot=None):
         """
-        Calcul automatique du facteur d'émission et du CO₂ total.
+        Calcul du facteur d'émission et du CO₂ total.
+        snapshot : instantané du registre des facteurs (imports en masse), sinon l'instantané courant
         """
-        # Récupérer le facteur d'émission depuis la base de données
-        try:
-            factor_obj = PurchaseEmissionFactor.objects.get(category_code=self.category)
+        # Récupérer le facteur d'émission depuis le registre des facteurs
+        from apps.core.services.factor_registry import get_snapshot
+        year_factors = (snapshot or get_snapshot()).for_year(self.year)
+        self.factor_revision = year_factors.revision('purchases')
+        factor_obj = year_factors.get('purchases.PurchaseEmissionFactor', self.category)
+        if factor_obj is not None:
             self.emission_factor = factor_obj.factor_kg_co2_per_keur
-        except PurchaseEmissionFactor.DoesNotExist:
+        else:
             # Fallback sur valeurs par défaut si facteur non trouvé
-            default_factors = {
-                'food_service': Decimal('100.00'),
-                'insurance': Decimal('110.00'),
-                'cleaning_maintenance': Decimal('215.00'),
-                'activities': Decimal('270.00'),
-                'laundry': Decimal('320.00'),
-                'construction': Decimal('360.00'),
-                'transport': Decimal('560.00'),
-                'equipment_rental': Decimal('600.00'),
-            }
-            self.emission_factor = default_factors.get(self.category, Decimal('0.00'))
+            self.emission_factor = self.DEFAULT_FACTORS.get(self.category, Decimal('0.00'))
         
         # Calculer le CO₂ total : (montant / 1000) × facteur
         if self.amount_euros and self.emission_factor:
             amount_in_keuros = self.amount_euros / Decimal('1000.00')
             self.total_co2_kg = amount_in_keuros * self.emission_factor
-        
+        return self.total_co2_kg
+    
+    def save(self, *args, **kwargs):
+        """
+        Calcul automatique du facteur d'émission et du CO₂ total.
+        """
+        self.calculate_impact()
         super().save(*args, **kwargs)
     
     @property
@@ -1,7 +1,9 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .models import PurchaseData, PurchaseEmissionFactor
+from apps.core.services.factor_registry import get_factors
+from apps.core.services.user_groups import get_group_ids, get_primary_group_id
+from .models import PurchaseData
 from .forms import PurchaseDataForm
 
 
@@ -13,9 +15,9 @@ def purchase_form(request):
         if form.is_valid():
             purchase = form.save(commit=False)
             purchase.user = request.user
-            user_group = request.user.groups.first()
-            if user_group:
-                purchase.group = user_group
+            group_id = get_primary_group_id(request.user)
+            if group_id:
+                purchase.group_id = group_id
             purchase.save()
             
             messages.success(
@@ -26,8 +28,8 @@ def purchase_form(request):
     else:
         form = PurchaseDataForm(initial={'year': 2026})
     
-    # Récupérer les facteurs d'émission depuis la base de données
-    emission_factors_qs = PurchaseEmissionFactor.objects.all().order_by('category_label')
+    # Récupérer les facteurs d'émission depuis le registre des facteurs
+    emission_factors_qs = get_factors('purchases.PurchaseEmissionFactor')
     emission_factors = {
         ef.category_code: float(ef.factor_kg_co2_per_keur) 
         for ef in emission_factors_qs
@@ -43,21 +45,23 @@ def purchase_form(request):
 
 @login_required
 def purchase_list(request):
-    """Vue listant toutes les données d'achats de l'utilisateur."""
+    """Vue listant les données d'achats (filtrées, paginées par clé)."""
+    from apps.core.services.listing import EntryListPage
+
     if request.user.is_staff or request.user.is_superuser:
         purchases = PurchaseData.objects.all()
     else:
-        purchases = PurchaseData.objects.filter(group__in=request.user.groups.all())
+        purchases = PurchaseData.objects.filter(group_id__in=get_group_ids(request.user))
     
-    # Statistiques
-    total_co2 = sum(p.total_co2_kg for p in purchases)
-    total_amount = sum(p.amount_euros for p in purchases)
+    # Statistiques du filtre courant, calculées en base (une requête)
+    page = EntryListPage(request, purchases, search_field='service', sum_fields=('total_co2_kg', 'amount_euros'))
     
     return render(request, 'purchases/purchase_list.html', {
-        'purchases': purchases,
-        'total_co2': total_co2,
-        'total_amount': total_amount,
-        'purchase_count': purchases.count()
+        'purchases': page,
+        'page': page,
+        'total_co2': page.totals['total_co2_kg'],
+        'total_amount': page.totals['amount_euros'],
+        'purchase_count': page.count
     })
 
 
@@ -67,7 +71,7 @@ def purchase_detail(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         purchase = get_object_or_404(PurchaseData, pk=pk)
     else:
-        purchase = get_object_or_404(PurchaseData, pk=pk, group__in=request.user.groups.all())
+        purchase = get_object_or_404(PurchaseData, pk=pk, group_id__in=get_group_ids(request.user))
     
     return render(request, 'purchases/purchase_detail.html', {
         'object': purchase
@@ -80,7 +84,7 @@ def purchase_update(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         purchase = get_object_or_404(PurchaseData, pk=pk)
     else:
-        purchase = get_object_or_404(PurchaseData, pk=pk, group__in=request.user.groups.all())
+        purchase = get_object_or_404(PurchaseData, pk=pk, group_id__in=get_group_ids(request.user))
     
     if request.method == 'POST':
         form = PurchaseDataForm(request.POST, instance=purchase)
@@ -94,7 +98,7 @@ def purchase_update(request, pk):
         form = PurchaseDataForm(instance=purchase)
     
     # Récupérer les facteurs d'émission
-    emission_factors_qs = PurchaseEmissionFactor.objects.all().order_by('category_label')
+    emission_factors_qs = get_factors('purchases.PurchaseEmissionFactor')
     emission_factors = {
         ef.category_code: float(ef.factor_kg_co2_per_keur) 
         for ef in emission_factors_qs
@@ -112,7 +116,7 @@ def purchase_delete(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         purchase = get_object_or_404(PurchaseData, pk=pk)
     else:
-        purchase = get_object_or_404(PurchaseData, pk=pk, group__in=request.user.groups.all())
+        purchase = get_object_or_404(PurchaseData, pk=pk, group_id__in=get_group_ids(request.user))
     
     if request.method == 'POST':
         purchase.delete()
@@ -1,3 +1,30 @@
+from django.contrib.auth.models import Group, User
 from django.test import TestCase
 
-# Create your tests here.
+from apps.purchases.models import PurchaseData
+from .views import get_module_totals
+
+
+class ModuleTotalsTests(TestCase):
+    """Totaux de la page Sensibilisation : saisies de l'agent, ou vue globale pour l'administration."""
+
+    @classmethod
+    def setUpTestData(cls):
+        group = Group.objects.create(name='Direction commune')
+        cls.agent = User.objects.create_user('agent_sensib', password='x')
+        cls.colleague = User.objects.create_user('collegue_sensib', password='x')
+        cls.staff = User.objects.create_user('staff_sensib', password='x', is_staff=True)
+        cls.mine = PurchaseData.objects.create(user=cls.agent, group=group, year=2026, service='A',
+                                               category='insurance', description='Mien', amount_euros=1000)
+        cls.theirs = PurchaseData.objects.create(user=cls.colleague, group=group, year=2026, service='B',
+                                                 category='insurance', description='Autre', amount_euros=3000)
+
+    def test_agent_sees_own_entries(self):
+        self.assertGreater(self.theirs.total_co2_kg, 0)
+        totals = get_module_totals(2026, self.agent)
+        self.assertAlmostEqual(totals['purchases'], float(self.mine.total_co2_kg), places=2)
+        self.assertAlmostEqual(totals['total'], float(self.mine.total_co2_kg), places=2)
+
+    def test_staff_sees_all_entries(self):
+        expected = float(self.mine.total_co2_kg + self.theirs.total_co2_kg)
+        self.assertAlmostEqual(get_module_totals(2026, self.staff)['purchases'], expected, places=2)
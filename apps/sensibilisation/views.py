@@ -5,11 +5,7 @@ from django.contrib import messages
 from django.db.models import Sum
 from datetime import datetime
 
-from apps.vehicles.models import VehicleData
-from apps.purchases.models import PurchaseData
-from apps.alimentation.models import FoodEntry
-from apps.batiment.models import BuildingEnergyData
-from apps.numerique.models import EquipementNumerique
+from apps.core.services.rollups import SECTORS, get_sector_model, get_sector_totals
 from .models import MessageSensibilisation
 from .services import SensibilisationService
 from .forms import MessageSensibilisationForm
@@ -17,21 +13,24 @@ from .forms import MessageSensibilisationForm
 
 def get_module_totals(year, user=None):
     """Calcule les totaux CO2 par module pour une année donnée, filtré par utilisateur si spécifié"""
-    
-    # Helper pour filtrer
-    def get_qs(model):
-        qs = model.objects.filter(year=year)
-        if user and not user.is_staff:
-            # Si l'utilisateur appartient à un groupe, on peut aussi filtrer par groupe si le modèle le supporte
-            # Pour l'instant on filtre par user (créateur)
-             qs = qs.filter(user=user)
-        return qs
-
-    vehicles = float(get_qs(VehicleData).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    purchases = float(get_qs(PurchaseData).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    alimentation = float(get_qs(FoodEntry).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    batiment = float(get_qs(BuildingEnergyData).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
-    numerique = float(get_qs(EquipementNumerique).aggregate(total=Sum('total_co2_kg'))['total'] or 0)
+    if user and not user.is_staff:
+        # Un agent voit ses propres saisies (créateur) : les agrégats étant tenus
+        # par groupe, ces totaux sont lus dans les tables sources
+        totals = {
+            sector: float(
+                get_sector_model(sector).objects.filter(year=year, user=user)
+                .aggregate(total=Sum('total_co2_kg'))['total'] or 0
+            )
+            for sector in SECTORS
+        }
+    else:
+        # Vue globale : table d'agrégats, une requête quel que soit le volume de saisies
+        totals = get_sector_totals(year)
+    vehicles = totals['vehicles']
+    purchases = totals['purchases']
+    alimentation = totals['food']
+    batiment = totals['buildings']
+    numerique = totals['numerique']
     
     return {
         'vehicles': vehicles,
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from apps.core.admin_actions import recompute_emissions_action
 from .models import EmissionFactor, VehicleData
 
 
@@ -9,6 +10,7 @@ class EmissionFactorAdmin(admin.ModelAdmin):
     list_filter = ['category', 'is_active']
     search_fields = ['name', 'subcategory']
     ordering = ['category', 'name']
+    actions = [recompute_emissions_action('vehicles')]
     
     fieldsets = (
         ('Informations principales', {
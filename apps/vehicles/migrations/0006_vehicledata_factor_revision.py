@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vehicles", "0005_alter_emissionfactor_source"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="vehicledata",
+            name="factor_revision",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                help_text="Dernière version de l'historique des facteurs utilisée par le calcul (vide = facteurs courants)",
+                null=True,
+                verbose_name="Version des facteurs",
+            ),
+        ),
+    ]
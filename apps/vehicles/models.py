@@ -80,6 +80,13 @@ class VehicleData(models.Model):
         ('distance', 'Par distance'),
     ]
     
+    # Valeurs par défaut (au cas où la base est vide ou erreur), par nom de facteur
+    DEFAULT_FACTORS = {
+        'Essence': Decimal('2.79'),
+        'Gazole': Decimal('3.16'),
+        'Voiture thermique moyenne': Decimal('0.192'),
+    }
+    
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -162,6 +169,13 @@ class VehicleData(models.Model):
         blank=True,
         verbose_name="CO₂ Gazole (kg)"
     )
+    factor_revision = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Version des facteurs",
+        help_text="Dernière version de l'historique des facteurs utilisée par le calcul (vide = facteurs courants)"
+    )
     
     # Métadonnées
     notes = models.TextField(
@@ -182,32 +196,44 @@ class VehicleData(models.Model):
         verbose_name_plural = "Données véhicules"
         ordering = ['-created_at']
         unique_together = [['user', 'year', 'service']]
+        # Listes par groupe triées par année / date, statistiques et agrégats par année
+        indexes = [
+            models.Index(fields=['group', 'year', 'created_at'], name='vehicle_group_year_created'),
+            models.Index(fields=['year', 'created_at'], name='vehicle_year_created'),
+        ]
     
     def __str__(self):
         return f"{self.service or 'Service'} - {self.year} ({self.user.username})"
     
-    def calculate_impact(self):
-        """Calcule l'impact carbone total en utilisant les facteurs en base"""
-        from .models import EmissionFactor  # Import local
+    def calculate_impact(self, snapshot=None):
+        """
+        Calcule l'impact carbone total en utilisant les facteurs en base.
+        snapshot : instantané du registre des facteurs (imports en masse), sinon l'instantané courant ;
+        les facteurs utilisés sont ceux en vigueur pour l'année de la saisie
+        """
+        from apps.core.services.factor_registry import get_snapshot  # Import local
 
         # Valeurs par défaut (au cas où la base est vide ou erreur)
-        default_essence = Decimal('2.79')
-        default_gazole = Decimal('3.16')
-        default_km = Decimal('0.192')
+        default_essence = self.DEFAULT_FACTORS['Essence']
+        default_gazole = self.DEFAULT_FACTORS['Gazole']
+        default_km = self.DEFAULT_FACTORS['Voiture thermique moyenne']
 
         # Récupération dynamique
         # On essaie de trouver par nom exact (créé par migration)
         # Note: Dans un vrai projet on utiliserait des codes/slugs immuables plutôt que des noms
         try:
-            f_essence = EmissionFactor.objects.filter(name='Essence').first()
+            snapshot = (snapshot or get_snapshot()).for_year(self.year)
+            self.factor_revision = snapshot.revision('vehicles')
+            f_essence = snapshot.get('vehicles.EmissionFactor', 'Essence')
             val_essence = f_essence.factor_value if f_essence else default_essence
             
-            f_gazole = EmissionFactor.objects.filter(name='Gazole').first()
+            f_gazole = snapshot.get('vehicles.EmissionFactor', 'Gazole')
             val_gazole = f_gazole.factor_value if f_gazole else default_gazole
             
-            f_km = EmissionFactor.objects.filter(name='Voiture thermique moyenne').first()
+            f_km = snapshot.get('vehicles.EmissionFactor', 'Voiture thermique moyenne')
             val_km = f_km.factor_value if f_km else default_km
         except Exception:
+            self.factor_revision = None
             val_essence = default_essence
             val_gazole = default_gazole
             val_km = default_km
@@ -1,7 +1,9 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .models import VehicleData, EmissionFactor
+from apps.core.services.factor_registry import get_factors
+from apps.core.services.user_groups import get_group_ids, get_primary_group_id
+from .models import VehicleData
 from .forms import VehicleFuelForm, VehicleDistanceForm
 
 
@@ -23,9 +25,9 @@ def vehicle_form_view(request):
             vehicle_data.user = request.user
             
             # Assign Group
-            user_group = request.user.groups.first()
-            if user_group:
-                vehicle_data.group = user_group
+            group_id = get_primary_group_id(request.user)
+            if group_id:
+                vehicle_data.group_id = group_id
             elif not request.user.is_superuser:
                  messages.error(request, "Attention: aucun groupe associé.")
 
@@ -44,7 +46,7 @@ def vehicle_form_view(request):
             form = VehicleDistanceForm()
     
     # Récupérer les facteurs d'émission pour affichage
-    emission_factors = EmissionFactor.objects.filter(is_active=True)
+    emission_factors = [f for f in get_factors('vehicles.EmissionFactor') if f.is_active]
     
     context = {
         'form': form,
@@ -56,19 +58,22 @@ def vehicle_form_view(request):
 
 @login_required
 def vehicle_list_view(request):
-    """Vue de la liste des données véhicules"""
+    """Vue de la liste des données véhicules (filtrée, paginée par clé)"""
+    from apps.core.services.listing import EntryListPage
+
     if request.user.is_staff or request.user.is_superuser:
-        vehicle_data = VehicleData.objects.all().order_by('-year', '-created_at')
+        vehicle_data = VehicleData.objects.all()
     else:
-        vehicle_data = VehicleData.objects.filter(group__in=request.user.groups.all()).order_by('-year', '-created_at')
-    
-    # Calculer le total
-    total_co2 = sum(vd.total_co2_kg or 0 for vd in vehicle_data)
-    
+        vehicle_data = VehicleData.objects.filter(group_id__in=get_group_ids(request.user))
+
+    # Totaux calculés en base sur le filtre courant
+    page = EntryListPage(request, vehicle_data, search_field='service')
+
     context = {
-        'vehicle_data': vehicle_data,
-        'total_co2': total_co2,
-        'count': vehicle_data.count(),
+        'vehicle_data': page,
+        'page': page,
+        'total_co2': page.totals['total_co2_kg'],
+        'count': page.count,
     }
     return render(request, 'vehicles/list.html', context)
 
@@ -79,7 +84,7 @@ def vehicle_form_update(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         vehicle_data = get_object_or_404(VehicleData, pk=pk)
     else:
-        vehicle_data = get_object_or_404(VehicleData, pk=pk, group__in=request.user.groups.all())
+        vehicle_data = get_object_or_404(VehicleData, pk=pk, group_id__in=get_group_ids(request.user))
     method = vehicle_data.calculation_method
     
     if request.method == 'POST':
@@ -101,7 +106,7 @@ def vehicle_form_update(request, pk):
         else:
             form = VehicleDistanceForm(instance=vehicle_data)
     
-    emission_factors = EmissionFactor.objects.filter(is_active=True)
+    emission_factors = [f for f in get_factors('vehicles.EmissionFactor') if f.is_active]
     return render(request, 'vehicles/form.html', {
         'form': form,
         'method': method,
@@ -115,7 +120,7 @@ def vehicle_detail_view(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         vehicle_data = get_object_or_404(VehicleData, pk=pk)
     else:
-        vehicle_data = get_object_or_404(VehicleData, pk=pk, group__in=request.user.groups.all())
+        vehicle_data = get_object_or_404(VehicleData, pk=pk, group_id__in=get_group_ids(request.user))
     
     return render(request, 'vehicles/detail.html', {'object': vehicle_data})
 
@@ -126,7 +131,7 @@ def vehicle_delete_view(request, pk):
     if request.user.is_staff or request.user.is_superuser:
         vehicle_data = get_object_or_404(VehicleData, pk=pk)
     else:
-        vehicle_data = get_object_or_404(VehicleData, pk=pk, group__in=request.user.groups.all())
+        vehicle_data = get_object_or_404(VehicleData, pk=pk, group_id__in=get_group_ids(request.user))
     
     if request.method == 'POST':
         vehicle_data.delete()
@@ -0,0 +1,21 @@
+"""
+Configuration gunicorn : métriques Prometheus partagées entre les workers.
+Usage: PROMETHEUS_MULTIPROC_DIR=/var/tmp/evry_metrics gunicorn config.wsgi:application -c config/gunicorn.conf.py
+"""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    # Les fichiers d'une exécution précédente fausseraient les compteurs
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Fichiers statiques
+    'apps.core.middleware.RequestMetricsMiddleware',  # Mesures SQL / gabarits, en-tête Server-Timing
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,7 +65,8 @@ ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates dont les rendus sont chronométrés (RequestMetricsMiddleware)
+        'BACKEND': 'apps.core.services.instrumentation.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -73,6 +75,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'apps.core.context_processors.user_groups',
             ],
         },
     },
@@ -92,17 +95,74 @@ DATABASES = {
     }
 }
 
-# PostgreSQL configuration (use when ready)
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': config('DB_NAME', default='evry_bilan_carbone'),
-#         'USER': config('DB_USER', default='evry_user'),
-#         'PASSWORD': config('DB_PASSWORD', default=''),
-#         'HOST': config('DB_HOST', default='localhost'),
-#         'PORT': config('DB_PORT', default='5432'),
-#     }
-# }
+# PostgreSQL configuration (DB_ENGINE=postgresql, ex: tests des plans de requêtes)
+if config('DB_ENGINE', default='sqlite') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='evry_bilan_carbone'),
+            'USER': config('DB_USER', default='evry_user'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Cache fichier par défaut : partagé par tous les processus de la machine (workers
+# gunicorn, commandes comme update_ademe_factors ou send_reminders), ce qu'exigent
+# le jeton de version des facteurs (apps.core.services.factor_registry), les
+# groupes mémorisés et les sessions. Serveurs multiples : cache commun (Redis,
+# DatabaseCache) via CACHE_BACKEND / CACHE_LOCATION.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache' / 'django')),
+        'OPTIONS': {
+            # Une entrée par agent connecté (groupes) : au-delà, le cache fichier
+            # supprime une partie des entrées à chaque écriture
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int),
+        },
+    }
+}
+
+
+# Sessions lues dans le cache (base de données en secours) : pas de requête
+# django_session à chaque requête authentifiée. Avec un LocMemCache, une session
+# fermée resterait valide dans le cache des autres workers : sessions en base.
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.db'
+    if CACHES['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache'
+    else 'django.contrib.sessions.backends.cached_db'
+)
+
+# Durée de conservation des groupes d'un utilisateur dans le cache (secondes) ;
+# invalidés à chaque changement d'appartenance (apps.core.services.user_groups),
+# jamais mis en cache avec un LocMemCache
+USER_GROUPS_CACHE_TIMEOUT = config('USER_GROUPS_CACHE_TIMEOUT', default=3600, cast=int)
+
+
+# Mesures par requête (apps.core.middleware.RequestMetricsMiddleware) :
+# part des requêtes mesurées (SQL, gabarits, en-tête Server-Timing), seuil de requête
+# lente (journalisée en WARNING) et nombre d'exécutions d'une même requête SQL
+# signalé comme N+1
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=True, cast=bool)
+REQUEST_METRICS_SAMPLE_RATE = config('REQUEST_METRICS_SAMPLE_RATE', default=1.0 if DEBUG else 0.1, cast=float)
+REQUEST_METRICS_SLOW_MS = config('REQUEST_METRICS_SLOW_MS', default=1000, cast=int)
+REQUEST_METRICS_DUPLICATE_THRESHOLD = config('REQUEST_METRICS_DUPLICATE_THRESHOLD', default=5, cast=int)
+REQUEST_METRICS_SERVER_TIMING = config('REQUEST_METRICS_SERVER_TIMING', default=True, cast=bool)
+
+# Jeton du collecteur Prometheus pour /metrics/ (en-tête Authorization: Bearer <jeton>) ;
+# vide = URL réservée aux comptes du personnel. En multi-workers, définir aussi la
+# variable d'environnement PROMETHEUS_MULTIPROC_DIR (voir config/gunicorn.conf.py)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+
+# Cache local des fichiers Base Carbone téléchargés (update_ademe_factors)
+ADEME_CACHE_DIR = config('ADEME_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'ademe'))
 
 
 # Password validation
@@ -148,6 +208,10 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Durée maximale (secondes) d'un export en tâche de fond : au-delà, un export resté
+# 'running' (worker arrêté) est repris par run_export_jobs
+EXPORT_JOB_TIMEOUT = config('EXPORT_JOB_TIMEOUT', default=1800, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -172,6 +236,14 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@evry.fr')
 
+# Envoi des rappels par la commande send_reminders : taille des lots et débit
+# maximum (messages/seconde, 0 = illimité)
+REMINDER_EMAIL_BATCH_SIZE = config('REMINDER_EMAIL_BATCH_SIZE', default=50, cast=int)
+REMINDER_EMAIL_RATE_LIMIT = config('REMINDER_EMAIL_RATE_LIMIT', default=5, cast=float)
+# Délai (secondes) au-delà duquel une campagne restée 'running' est considérée
+# abandonnée (processus arrêté) et reprise par le prochain envoi
+REMINDER_CAMPAIGN_TIMEOUT = config('REMINDER_CAMPAIGN_TIMEOUT', default=3600, cast=int)
+
 # Login configuration
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'